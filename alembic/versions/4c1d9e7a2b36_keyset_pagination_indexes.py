@@ -0,0 +1,46 @@
+"""keyset_pagination_indexes
+
+Revision ID: 4c1d9e7a2b36
+Revises: b200dbcd8fed
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d9e7a2b36'
+down_revision: Union[str, Sequence[str], None] = 'b200dbcd8fed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('inventory_logs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('product_id', sa.Uuid(), nullable=False),
+    sa.Column('old_quantity', sa.Integer(), nullable=False),
+    sa.Column('new_quantity', sa.Integer(), nullable=False),
+    sa.Column('quantity_change', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_inventory_logs_created_at_id', 'inventory_logs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index('ix_products_created_at_id', table_name='products')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_inventory_logs_created_at_id', table_name='inventory_logs')
+    op.drop_table('inventory_logs')
@@ -0,0 +1,90 @@
+"""user_search_indexes
+
+Revision ID: 9a3f5c1e8d42
+Revises: 4c1d9e7a2b36
+Create Date: 2026-10-19 13:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3f5c1e8d42'
+down_revision: Union[str, Sequence[str], None] = '4c1d9e7a2b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_users_username_trgm ON users USING gin (username gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_users_email_trgm ON users USING gin (email gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_users_description_trgm ON users USING gin (description gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_users_username_prefix ON users (lower(username) text_pattern_ops)")
+        return
+
+    # FTS5 ссылается на явный INTEGER-ключ: rowid таблицы с UUID-ключом
+    # может измениться при VACUUM
+    op.execute(
+        "CREATE TABLE users_fts_keys ("
+        "key_id INTEGER PRIMARY KEY, user_id CHAR(32) NOT NULL UNIQUE)"
+    )
+    op.execute(
+        "CREATE VIEW users_fts_content AS "
+        "SELECT k.key_id, u.username, u.email, u.description "
+        "FROM users_fts_keys k JOIN users u ON u.id = k.user_id"
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5("
+        "username, email, description, "
+        "content='users_fts_content', content_rowid='key_id', tokenize='trigram')"
+    )
+    op.execute("CREATE INDEX ix_users_username_lower ON users (lower(username))")
+    op.execute(
+        "CREATE TRIGGER users_fts_insert AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts_keys(user_id) VALUES (new.id); "
+        "INSERT INTO users_fts(rowid, username, email, description) "
+        "SELECT key_id, new.username, new.email, new.description "
+        "FROM users_fts_keys WHERE user_id = new.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_delete AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, email, description) "
+        "SELECT 'delete', key_id, old.username, old.email, old.description "
+        "FROM users_fts_keys WHERE user_id = old.id; "
+        "DELETE FROM users_fts_keys WHERE user_id = old.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_update AFTER UPDATE ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, email, description) "
+        "SELECT 'delete', key_id, old.username, old.email, old.description "
+        "FROM users_fts_keys WHERE user_id = old.id; "
+        "UPDATE users_fts_keys SET user_id = new.id WHERE user_id = old.id; "
+        "INSERT INTO users_fts(rowid, username, email, description) "
+        "SELECT key_id, new.username, new.email, new.description "
+        "FROM users_fts_keys WHERE user_id = new.id; END"
+    )
+    op.execute("INSERT INTO users_fts_keys(user_id) SELECT id FROM users")
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_users_username_prefix")
+        op.execute("DROP INDEX IF EXISTS ix_users_description_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_users_username_trgm")
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS users_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_insert")
+    op.execute("DROP TABLE IF EXISTS users_fts")
+    op.execute("DROP INDEX IF EXISTS ix_users_username_lower")
+    op.execute("DROP VIEW IF EXISTS users_fts_content")
+    op.execute("DROP TABLE IF EXISTS users_fts_keys")
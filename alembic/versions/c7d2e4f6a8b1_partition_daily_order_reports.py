@@ -0,0 +1,117 @@
+"""partition_daily_order_reports
+
+Revision ID: c7d2e4f6a8b1
+Revises: 9a3f5c1e8d42
+Create Date: 2026-10-19 15:10:00.000000
+
+Только PostgreSQL: daily_order_reports становится таблицей, секционированной
+по report_at помесячно. Секции создаются с месяца самого старого отчета по
+три месяца вперед, плюс DEFAULT-секция; дальше их ведет
+scripts/manage_partitions.py. Первичный ключ секционированной таблицы
+обязан включать ключ секционирования, поэтому он становится (id, report_at).
+
+Данные копируются одним INSERT ... SELECT под блокировкой таблицы; для
+больших таблиц миграцию нужно запускать в окно обслуживания.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e4f6a8b1'
+down_revision: Union[str, Sequence[str], None] = '9a3f5c1e8d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("LOCK TABLE daily_order_reports IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE daily_order_reports RENAME TO daily_order_reports_legacy")
+    op.execute(
+        "ALTER TABLE daily_order_reports_legacy "
+        "RENAME CONSTRAINT daily_order_reports_pkey TO daily_order_reports_legacy_pkey"
+    )
+    op.execute("ALTER INDEX ix_daily_order_reports_report_at RENAME TO ix_daily_order_reports_legacy_report_at")
+
+    op.execute(
+        """
+        CREATE TABLE daily_order_reports (
+            id UUID NOT NULL,
+            report_at DATE NOT NULL,
+            order_id UUID NOT NULL,
+            count_product INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT daily_order_reports_order_id_fkey FOREIGN KEY (order_id) REFERENCES orders (id),
+            CONSTRAINT daily_order_reports_pkey PRIMARY KEY (id, report_at)
+        ) PARTITION BY RANGE (report_at)
+        """
+    )
+    op.execute("CREATE INDEX ix_daily_order_reports_report_at ON daily_order_reports (report_at)")
+    op.execute("CREATE TABLE daily_order_reports_default PARTITION OF daily_order_reports DEFAULT")
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month_start DATE;
+            last_month DATE := (date_trunc('month', current_date) + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(report_at), current_date))::date
+              INTO month_start
+              FROM daily_order_reports_legacy;
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF daily_order_reports FOR VALUES FROM (%L) TO (%L)',
+                    'daily_order_reports_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(
+        "INSERT INTO daily_order_reports (id, report_at, order_id, count_product, created_at) "
+        "SELECT id, report_at, order_id, count_product, created_at FROM daily_order_reports_legacy"
+    )
+    op.execute("DROP TABLE daily_order_reports_legacy")
+    op.execute("ANALYZE daily_order_reports")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("LOCK TABLE daily_order_reports IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        """
+        CREATE TABLE daily_order_reports_plain (
+            id UUID NOT NULL,
+            report_at DATE NOT NULL,
+            order_id UUID NOT NULL,
+            count_product INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT daily_order_reports_order_id_fkey FOREIGN KEY (order_id) REFERENCES orders (id)
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO daily_order_reports_plain (id, report_at, order_id, count_product, created_at) "
+        "SELECT id, report_at, order_id, count_product, created_at FROM daily_order_reports"
+    )
+    # секции удаляются вместе с родительской таблицей
+    op.execute("DROP TABLE daily_order_reports")
+    op.execute("ALTER TABLE daily_order_reports_plain RENAME TO daily_order_reports")
+    op.execute(
+        "ALTER TABLE daily_order_reports "
+        "ADD CONSTRAINT daily_order_reports_pkey PRIMARY KEY (id)"
+    )
+    op.execute("CREATE INDEX ix_daily_order_reports_report_at ON daily_order_reports (report_at)")
@@ -6,7 +6,7 @@ from litestar.params import Parameter
 from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_404_NOT_FOUND
 from typing import Dict, Any, Optional
 
-from app.services.cache_service import cache_service
+from app.services.cache_service import PRODUCT_CACHE_TTL, USER_CACHE_TTL, cache_service
 
 
 class UserCacheController(Controller):
@@ -62,9 +62,9 @@ class UserCacheController(Controller):
         if success:
             return {
                 "status": "success",
-                "message": f"Данные пользователя {user_id} закэшированы на 1 час",
+                "message": f"Данные пользователя {user_id} закэшированы",
                 "user_id": user_id,
-                "ttl_seconds": 3600
+                "ttl_seconds": USER_CACHE_TTL
             }
         else:
             return {
@@ -114,7 +114,7 @@ class ProductCacheController(Controller):
                 "source": "cache",
                 "data": cached_data,
                 "message": "Данные получены из кэша",
-                "ttl_seconds": 600  # Фиксированное значение для MockRedis
+                "ttl_seconds": PRODUCT_CACHE_TTL
             }
         else:
             # Здесь можно получить данные из БД
@@ -135,8 +135,8 @@ class ProductCacheController(Controller):
                 "status": "success",
                 "source": "database",
                 "data": product_data,
-                "message": "Данные получены из БД и закэшированы на 10 минут",
-                "ttl_seconds": 600
+                "message": "Данные получены из БД и закэшированы",
+                "ttl_seconds": PRODUCT_CACHE_TTL
             }
     
     @post("/{product_id:str}", status_code=HTTP_201_CREATED)
@@ -153,9 +153,9 @@ class ProductCacheController(Controller):
         if success:
             return {
                 "status": "success",
-                "message": f"Данные продукции {product_id} закэшированы на 10 минут",
+                "message": f"Данные продукции {product_id} закэшированы",
                 "product_id": product_id,
-                "ttl_seconds": 600
+                "ttl_seconds": PRODUCT_CACHE_TTL
             }
         else:
             return {
@@ -179,7 +179,7 @@ class ProductCacheController(Controller):
                 "status": "success",
                 "message": f"Кэш продукции {product_id} обновлен",
                 "product_id": product_id,
-                "ttl_seconds": 600
+                "ttl_seconds": PRODUCT_CACHE_TTL
             }
         else:
             return {
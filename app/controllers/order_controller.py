@@ -2,58 +2,59 @@
 from typing import Optional, List
 from litestar import Controller, get, post, put, delete
 from litestar.params import Parameter
-from litestar.exceptions import NotFoundException
+from litestar.exceptions import NotFoundException, ValidationException
 from uuid import UUID
 
-try:
-    from app.services.order_processor import OrderProcessor
-except ImportError:
-    OrderProcessor = None
+from app.repositories.pagination import InvalidCursorError, encode_cursor
+from app.services.order_processor import OrderProcessor
 
 
 class OrderController(Controller):
+    """Заказы OrderProcessor; в app.main.create_app пока не подключен"""
+
     path = "/api/v1/orders"
     
     @get("/")
     async def get_orders(
         self,
+        order_processor: OrderProcessor,
         limit: int = Parameter(query="limit", default=10, ge=1, le=100),
-        offset: int = Parameter(query="offset", default=0, ge=0)
+        offset: int = Parameter(query="offset", default=0, ge=0),
+        cursor: str = Parameter(query="cursor", default="")
     ) -> dict:
-        """Получить список заказов"""
-        # Создаем экземпляр OrderProcessor
-        order_processor = OrderProcessor()
-        await order_processor.initialize()
-        
-        # Получаем все заказы из памяти (временное решение)
-        orders = []
-        if hasattr(order_processor, 'orders'):
-            for order_id, order in order_processor.orders.items():
-                orders.append({
-                    "order_id": str(order_id),
-                    "user_id": str(order.get("user_id")),
-                    "status": order.get("status"),
-                    "total_amount": order.get("total_amount"),
-                    "created_at": order.get("created_at").isoformat() if order.get("created_at") else None
-                })
+        """Получить список заказов (offset или keyset-курсор)"""
+        # заказы пока хранятся в памяти процессора
+        try:
+            page = await order_processor.list_orders(limit, offset=offset, cursor=cursor or None)
+        except InvalidCursorError as e:
+            raise ValidationException(detail=str(e))
         
-        # Пагинация
-        start = offset
-        end = offset + limit
-        paginated_orders = orders[start:end]
+        orders = [
+            {
+                "order_id": str(order["id"]),
+                "user_id": str(order.get("user_id")),
+                "status": order.get("status"),
+                "total_amount": order.get("total_amount"),
+                "created_at": order["created_at"].isoformat()
+            }
+            for order in page
+        ]
+        last = page[-1] if len(page) == limit else None
         
         return {
             "success": True,
-            "orders": paginated_orders,
-            "total": len(orders),
+            "orders": orders,
+            "total": len(order_processor.orders),
             "limit": limit,
-            "offset": offset
+            "offset": None if cursor else offset,
+            "next_cursor": encode_cursor(last["created_at"], last["id"]) if last else None
         }
     
     @get("/{order_id:str}")
     async def get_order(
         self,
         order_id: str,
+        order_processor: OrderProcessor,
     ) -> dict:
         """Получить заказ по ID"""
         try:
@@ -61,10 +62,6 @@ class OrderController(Controller):
         except ValueError:
             raise NotFoundException(detail=f"Invalid order ID format: {order_id}")
         
-        # Создаем экземпляр OrderProcessor
-        order_processor = OrderProcessor()
-        await order_processor.initialize()
-        
         order = await order_processor.get_order(order_uuid)
         if not order:
             raise NotFoundException(detail=f"Order {order_id} not found")
@@ -72,9 +69,8 @@ class OrderController(Controller):
         return {"success": True, "data": order}
     
     @post("/")
-    async def create_order(self, data: dict) -> dict:
+    async def create_order(self, data: dict, order_processor: OrderProcessor) -> dict:
         """Создать новый заказ через RabbitMQ"""
-        from app.services.order_processor import OrderProcessor
         from app.models.message_models import OrderMessage, OrderItem
         from uuid import UUID
         
@@ -97,8 +93,6 @@ class OrderController(Controller):
                 notes=data.get("notes")
             )
             
-            order_processor = OrderProcessor()
-            await order_processor.initialize()
             result = await order_processor.create_order(order_data)
             
             return result
@@ -115,6 +109,7 @@ class OrderController(Controller):
         self,
         order_id: str,
         status: str,
+        order_processor: OrderProcessor,
         tracking_number: Optional[str] = None,
         notes: Optional[str] = None
     ) -> dict:
@@ -124,13 +119,9 @@ class OrderController(Controller):
         except ValueError:
             raise NotFoundException(detail=f"Invalid order ID format: {order_id}")
         
-        from app.services.order_processor import OrderProcessor
         from app.models.message_models import OrderStatus
         
         try:
-            order_processor = OrderProcessor()
-            await order_processor.initialize()
-            
             result = await order_processor.update_order_status(
                 order_id=order_uuid,
                 new_status=OrderStatus(status),
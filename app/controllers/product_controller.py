@@ -1,11 +1,17 @@
 # app/controllers/product_controller.py
 from typing import Optional, List
-from litestar import Controller, get, post, put, delete
+from litestar import Controller, Request, Response, get, post, put, delete
 from litestar.params import Parameter
-from litestar.exceptions import NotFoundException
+from litestar.exceptions import NotFoundException, ValidationException
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.services.product_processor import ProductProcessor
+from app.endpoints.conditional import conditional_response, table_validator
+from app.models.database_models import Product, ProductCreate, ProductResponse, ProductUpdate
+from app.repositories.pagination import InvalidCursorError, next_cursor
+from app.repositories.product_repository import ProductRepository
+from app.services.cache_service import PRODUCT_CACHE_TTL, cache_service
+from app.services.inventory_service import InventoryService
 
 
 class ProductController(Controller):
@@ -14,7 +20,8 @@ class ProductController(Controller):
     @get("/{product_id:str}")
     async def get_product(
         self,
-        product_id: str
+        product_id: str,
+        session: AsyncSession
     ) -> dict:
         """Получить продукт по ID"""
         try:
@@ -22,78 +29,105 @@ class ProductController(Controller):
         except ValueError:
             raise NotFoundException(detail=f"Invalid product ID format: {product_id}")
         
-        product_processor = ProductProcessor()
-        await product_processor.initialize()
-        
-        product = await product_processor.get_product(product_uuid)
+        product = await ProductRepository().get_by_id(session, product_uuid)
         if not product:
             raise NotFoundException(detail=f"Product {product_id} not found")
         
-        return {"success": True, "data": product}
+        return {
+            "success": True,
+            "data": ProductResponse.model_validate(product).model_dump(mode="json")
+        }
     
     @get("/")
     async def get_products(
         self,
+        request: Request,
+        session: AsyncSession,
         category: Optional[str] = Parameter(query="category", default=None),
         available_only: bool = Parameter(query="available_only", default=False),
         limit: int = Parameter(query="limit", default=50, ge=1, le=100),
-        offset: int = Parameter(query="offset", default=0, ge=0)
-    ) -> dict:
-        """Получить список продуктов"""
-        product_processor = ProductProcessor()
-        await product_processor.initialize()
+        offset: int = Parameter(query="offset", default=0, ge=0),
+        cursor: str = Parameter(query="cursor", default="")
+    ) -> Response:
+        """Получить список продуктов (ETag / Last-Modified по Product.updated_at)"""
+        if category:
+            # в таблице products нет колонки категории
+            raise ValidationException(detail="Filtering by category is not supported")
         
-        products = await product_processor.get_products(
-            category=category,
-            available_only=available_only,
-            limit=limit,
-            offset=offset
+        filters = [Product.quantity > 0] if available_only else []
+        validator = await table_validator(
+            session, Product.updated_at, *filters,
+            tag="products", params=(available_only, limit, offset, cursor),
         )
         
-        return {
-            "success": True,
-            "data": products,
-            "total": len(products),
-            "filters": {
-                "category": category,
-                "available_only": available_only
+        async def build() -> dict:
+            try:
+                products = await ProductRepository().get_all(
+                    session, available_only=available_only, limit=limit, offset=offset,
+                    cursor=cursor or None
+                )
+            except InvalidCursorError as e:
+                raise ValidationException(detail=str(e))
+            return {
+                "success": True,
+                "data": [
+                    ProductResponse.model_validate(product).model_dump(mode="json")
+                    for product in products
+                ],
+                "total": len(products),
+                "next_cursor": next_cursor(products, limit),
+                "filters": {
+                    "category": category,
+                    "available_only": available_only
+                }
             }
-        }
+        
+        return await conditional_response(request, validator, build)
     
     @post("/")
-    async def create_product(self, data: dict) -> dict:
+    async def create_product(self, data: ProductCreate, session: AsyncSession) -> dict:
         """Создать новый продукт"""
-        from app.services.product_processor import ProductProcessor
-        from app.models.message_models import ProductMessage
+        product = await ProductRepository().create(session, data)
+        await session.commit()
         
+        return {
+            "success": True,
+            "product_id": str(product.id),
+            "name": product.name,
+            "price": product.price,
+            "quantity": product.quantity,
+            "is_available": product.quantity > 0,
+            "message": "Product created successfully"
+        }
+    
+    @put("/{product_id:str}")
+    async def update_product(
+        self,
+        product_id: str,
+        data: ProductUpdate,
+        session: AsyncSession
+    ) -> dict:
+        """Обновить продукт и перезаписать его запись в кэше"""
         try:
-            product_data = ProductMessage(
-                name=data["name"],
-                description=data["description"],
-                price=data["price"],
-                quantity=data["quantity"],
-                category=data.get("category"),
-                sku=data.get("sku")
-            )
-            
-            product_processor = ProductProcessor()
-            await product_processor.initialize()
-            result = await product_processor.create_product(product_data)
-            
-            return result
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Failed to create product"
-            }
+            product_uuid = UUID(product_id)
+        except ValueError:
+            raise NotFoundException(detail=f"Invalid product ID format: {product_id}")
+        
+        product = await ProductRepository().update(session, product_uuid, data)
+        if not product:
+            raise NotFoundException(detail=f"Product {product_id} not found")
+        await session.commit()
+        
+        snapshot = ProductResponse.model_validate(product).model_dump(mode="json")
+        cache_service.refresh_many("product", {product_id: snapshot}, PRODUCT_CACHE_TTL)
+        return {"success": True, "data": snapshot}
     
     @put("/{product_id:str}/stock")
     async def update_stock(
         self,
         product_id: str,
         quantity_change: int,
+        inventory_service: InventoryService,
         reason: str = "adjustment"
     ) -> dict:
         """Обновить количество на складе"""
@@ -102,12 +136,7 @@ class ProductController(Controller):
         except ValueError:
             raise NotFoundException(detail=f"Invalid product ID format: {product_id}")
         
-        from app.services.inventory_service import InventoryService
-        
         try:
-            inventory_service = InventoryService()
-            await inventory_service.initialize()
-            
             result = await inventory_service.update_quantity(
                 product_id=product_uuid,
                 quantity_change=quantity_change,
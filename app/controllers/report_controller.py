@@ -1,9 +1,13 @@
 from datetime import date, timedelta
 from typing import Optional
-from litestar import Controller, get, post
+from litestar import Controller, Request, Response, get, post
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_200_OK
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.endpoints.conditional import conditional_response, table_validator
+from app.models.database_models import DailyOrderReport
+from app.services.analytics_service import AnalyticsService
 from app.services.report_service import ReportService
 
 class ReportRequest(BaseModel):
@@ -12,6 +16,16 @@ class ReportRequest(BaseModel):
 class CronTaskRequest(BaseModel):
     task: str = "daily"
 
+def _default_period(start_date: Optional[date], end_date: Optional[date]):
+    """По умолчанию - последние 7 дней"""
+    end_date = end_date or date.today()
+    return start_date or end_date - timedelta(days=7), end_date
+
+async def _reports_validator(session: AsyncSession, tag: str, *where, params=()):
+    return await table_validator(
+        session, DailyOrderReport.created_at, *where, tag=tag, params=params
+    )
+
 class ReportController(Controller):
     path = "/api/v1/reports"
     
@@ -21,18 +35,57 @@ class ReportController(Controller):
         return result
     
     @get("/daily/{report_date:date}", status_code=HTTP_200_OK)
-    async def get_daily_report(self, report_date: date) -> dict:
-        result = await ReportService.get_daily_report(report_date)
-        return result
+    async def get_daily_report(
+        self, request: Request, session: AsyncSession, report_date: date
+    ) -> Response:
+        validator = await _reports_validator(
+            session, "daily", DailyOrderReport.report_at == report_date, params=(report_date,)
+        )
+        return await conditional_response(
+            request, validator, lambda: ReportService.get_daily_report(report_date)
+        )
     
     @get("/summary", status_code=HTTP_200_OK)
     async def get_summary_report(
         self,
-        start_date: date = Parameter(default_factory=lambda: date.today() - timedelta(days=7)),
-        end_date: date = Parameter(default_factory=date.today)
-    ) -> dict:
-        result = await ReportService.generate_summary_report(start_date, end_date)
-        return result
+        request: Request,
+        session: AsyncSession,
+        start_date: Optional[date] = Parameter(default=None),
+        end_date: Optional[date] = Parameter(default=None)
+    ) -> Response:
+        start_date, end_date = _default_period(start_date, end_date)
+        validator = await _reports_validator(
+            session, "summary",
+            DailyOrderReport.report_at.between(start_date, end_date),
+            params=(start_date, end_date),
+        )
+        return await conditional_response(
+            request,
+            validator,
+            lambda: ReportService.generate_summary_report(start_date, end_date),
+        )
+    
+    @get("/stats", status_code=HTTP_200_OK)
+    async def get_stats_report(
+        self,
+        request: Request,
+        session: AsyncSession,
+        start_date: Optional[date] = Parameter(default=None),
+        end_date: Optional[date] = Parameter(default=None),
+        bins: int = Parameter(default=10, ge=1, le=100),
+        top_n: int = Parameter(default=10, ge=0, le=1000)
+    ) -> Response:
+        start_date, end_date = _default_period(start_date, end_date)
+        validator = await _reports_validator(
+            session, "stats",
+            DailyOrderReport.report_at.between(start_date, end_date),
+            params=(start_date, end_date, bins, top_n),
+        )
+        return await conditional_response(
+            request,
+            validator,
+            lambda: AnalyticsService.report_stats(start_date, end_date, bins, top_n),
+        )
     
     @get("/cron-test", status_code=HTTP_200_OK)
     async def test_cron_endpoint(self) -> dict:
@@ -1,12 +1,29 @@
 from litestar import Controller, get, post, put, delete
 from litestar.params import Parameter
-from litestar.exceptions import NotFoundException
+from litestar.exceptions import NotFoundException, ValidationException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 from datetime import datetime
 
-from app.models.database_models import User, UserCreate, UserUpdate, UserResponse, user_to_response
+from app.models.database_models import (
+    AddressResponse,
+    OrderResponse,
+    User,
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    user_to_response,
+)
+from app.repositories.loaders import LOAD_PROFILES
+from app.repositories.pagination import InvalidCursorError, next_cursor
+from app.repositories.user_repository import UserRepository
+from app.repositories.user_search_repository import UserSearchRepository
+from app.services.cache_invalidation import cache_invalidator
+from app.services.cache_service import cache_service
+
+INCLUDE_PATTERN = "^(|" + "|".join(LOAD_PROFILES[User]) + ")$"
+
 
 class UserController(Controller):
     path = "/api/users"
@@ -17,45 +34,111 @@ class UserController(Controller):
         session: AsyncSession,
         page: int = Parameter(query="page", default=1, ge=1),
         per_page: int = Parameter(query="per_page", default=10, ge=1, le=100),
-        search: str = Parameter(query="search", default="")
+        search: str = Parameter(query="search", default=""),
+        cursor: str = Parameter(query="cursor", default=""),
+        count_mode: str = Parameter(
+            query="count_mode",
+            default="exact",
+            pattern="^(exact|estimated|cached|window)$",
+        ),
+        include: str = Parameter(query="include", default="", pattern=INCLUDE_PATTERN)
     ) -> dict:
-        offset = (page - 1) * per_page
-        
-        query = select(User)
-        if search:
-            query = query.where(User.username.ilike(f"%{search}%"))
-        
-        result = await session.execute(query.offset(offset).limit(per_page))
-        users = result.scalars().all()
-        
-        total_query = select(User)
-        if search:
-            total_query = total_query.where(User.username.ilike(f"%{search}%"))
-        
-        total_result = await session.execute(select(User.id))
-        total_count = len(total_result.scalars().all())
+        repository = UserRepository()
+        filters = {"search": search} if search else {}
+        
+        try:
+            if count_mode == "window":
+                users, total_count = await repository.get_page_with_count(
+                    session, per_page, page, cursor or None, load=include or None, **filters
+                )
+            else:
+                users = await repository.get_by_filter(
+                    session, per_page, page, cursor or None, load=include or None, **filters
+                )
+                total_count = await self._count_users(
+                    session, repository, count_mode, search
+                )
+        except InvalidCursorError as e:
+            raise ValidationException(detail=str(e))
         
         return {
-            "users": [user_to_response(user) for user in users],
+            "users": [self._serialize_user(user, include) for user in users],
             "total_count": total_count,
-            "page": page,
+            "page": None if cursor else page,
             "per_page": per_page,
-            "total_pages": (total_count + per_page - 1) // per_page
+            "total_pages": (total_count + per_page - 1) // per_page,
+            "next_cursor": next_cursor(users, per_page)
         }
     
+    @staticmethod
+    def _serialize_user(user: User, include: str):
+        """Ответ с теми связями, которые загрузил выбранный профиль"""
+        if not include:
+            return user_to_response(user)
+        data = user_to_response(user).model_dump()
+        if include in ("addresses", "details"):
+            data["addresses"] = [AddressResponse.model_validate(a) for a in user.addresses]
+        if include in ("orders", "details"):
+            data["orders"] = [OrderResponse.model_validate(o) for o in user.orders]
+        return data
+    
+    @staticmethod
+    async def _count_users(
+        session: AsyncSession,
+        repository: UserRepository,
+        count_mode: str,
+        search: str
+    ) -> int:
+        """Подсчет пользователей: точный, по статистике БД или из кэша"""
+        if count_mode == "estimated" and not search:
+            return await repository.get_estimated_count(session)
+        
+        if count_mode == "cached":
+            name = f"users:{search}"
+            cached = cache_service.get_cached_count(name)
+            if cached is not None:
+                return cached
+            total_count = await repository.get_total_count(session, search=search)
+            cache_service.cache_count(name, total_count)
+            return total_count
+        
+        return await repository.get_total_count(session, search=search)
+    
+    @get("/search")
+    async def search_users(
+        self,
+        session: AsyncSession,
+        q: str = Parameter(query="q", min_length=1),
+        prefix: bool = Parameter(query="prefix", default=False),
+        limit: int = Parameter(query="limit", default=20, ge=1, le=100)
+    ) -> dict:
+        repository = UserSearchRepository()
+        
+        if prefix:
+            users = await repository.search_prefix(session, q, limit)
+            results = [{"user": user_to_response(user), "rank": None} for user in users]
+        else:
+            ranked = await repository.search(session, q, limit)
+            results = [
+                {"user": user_to_response(user), "rank": round(rank, 4)}
+                for user, rank in ranked
+            ]
+        
+        return {"query": q, "prefix": prefix, "results": results}
+    
     @get("/{user_id:uuid}")
     async def get_user(
         self,
         session: AsyncSession,
-        user_id: UUID
+        user_id: UUID,
+        include: str = Parameter(query="include", default="", pattern=INCLUDE_PATTERN)
     ) -> dict:
-        result = await session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await UserRepository().get_by_id(session, user_id, load=include or None)
         
         if not user:
             raise NotFoundException(detail=f"User with ID {user_id} not found")
         
-        return {"user": user_to_response(user)}
+        return {"user": self._serialize_user(user, include)}
     
     @post("/")
     async def create_user(
@@ -100,13 +183,17 @@ class UserController(Controller):
         
         await session.commit()
         await session.refresh(user)
+        # сбрасываем кэш сразу, не дожидаясь события user.updated
+        await cache_invalidator.handle_user_events(
+            [{"event_type": "user.updated", "user_id": str(user_id)}]
+        )
         
         return {
             "message": "User updated successfully",
             "user": user_to_response(user)
         }
     
-    @delete("/{user_id:uuid}")
+    @delete("/{user_id:uuid}", status_code=200)
     async def delete_user(
         self,
         session: AsyncSession,
@@ -120,5 +207,8 @@ class UserController(Controller):
         
         await session.delete(user)
         await session.commit()
+        await cache_invalidator.handle_user_events(
+            [{"event_type": "user.deleted", "user_id": str(user_id)}]
+        )
         
         return {"message": f"User with ID {user_id} deleted successfully"}
@@ -0,0 +1,103 @@
+"""Метрики, журнал медленных запросов и сбор SQL через события SQLAlchemy.
+
+before_cursor_execute запоминает время старта в контексте выполнения,
+after_cursor_execute:
+
+- пишет количество и длительность запроса в метрики с меткой операции
+  (SELECT, INSERT, ...);
+- при SLOW_QUERY_MS > 0 пишет запросы дольше порога в журнал
+  app.db.slow_query - только текст SQL: параметры могут содержать
+  персональные данные и пишутся отдельной DEBUG-записью лишь при
+  SLOW_QUERY_LOG_PARAMS=1;
+- если для текущего запроса включен сбор (capture_queries), добавляет SQL
+  и его длительность в список - так профилировщик запросов показывает,
+  какие запросы выполнил обработчик.
+
+Слушатели вешаются на движок один раз при старте приложения. Когда
+журнал и сбор выключены, к каждому запросу добавляются только чтение
+contextvar и сравнение чисел.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Union
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.monitoring.metrics import DB_QUERIES, DB_QUERY_SECONDS
+
+# порог журнала медленных запросов, мс; 0 - журнал выключен
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+# писать параметры медленных запросов (только для отладки)
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "0") == "1"
+
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+_START_KEY = "_query_started"
+
+# движок -> имя в метках метрик
+_engine_names: "WeakKeyDictionary[Engine, str]" = WeakKeyDictionary()
+
+# SQL, собранный для текущего запроса (None - сбор выключен)
+_captured: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("captured_queries", default=None)
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+@contextmanager
+def capture_queries() -> Iterator[List[Dict[str, Any]]]:
+    """Собрать SQL, выполненный в текущем контексте: [{sql, ms, engine}]"""
+    queries: List[Dict[str, Any]] = []
+    token = _captured.set(queries)
+    try:
+        yield queries
+    finally:
+        _captured.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        setattr(context, _START_KEY, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    name = _engine_names.get(conn.engine, "primary")
+    operation = _operation(statement)
+    DB_QUERIES.labels(name, operation).inc()
+    started = getattr(context, _START_KEY, None)
+    if started is None:
+        return
+
+    elapsed = time.perf_counter() - started
+    DB_QUERY_SECONDS.labels(name, operation).observe(elapsed)
+
+    elapsed_ms = elapsed * 1000
+    if SLOW_QUERY_MS and elapsed_ms >= SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "slow query %.1f ms [%s]: %s", elapsed_ms, name, " ".join(statement.split())
+        )
+        if SLOW_QUERY_LOG_PARAMS:
+            slow_query_logger.debug("slow query params: %r", parameters)
+
+    captured = _captured.get()
+    if captured is not None:
+        captured.append({"sql": statement, "ms": round(elapsed_ms, 3), "engine": name})
+
+
+def instrument_engine(engine: Union[Engine, AsyncEngine], name: str = "primary") -> None:
+    """Подключить метрики запросов к движку (повторный вызов ничего не делает)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine in _engine_names:
+        return
+    _engine_names[sync_engine] = name
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
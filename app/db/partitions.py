@@ -0,0 +1,217 @@
+"""Секции таблиц, разбитых по диапазону дат (PostgreSQL, PARTITION BY RANGE).
+
+Список секций и их границы читаются из каталога pg_inherits/pg_class.
+На других СУБД таблица считается неразбитой и список секций пуст.
+
+Секции месячные: <таблица>_YYYY_MM с границами [1-е число месяца,
+1-е число следующего). Строки вне всех секций попадают в секцию
+<таблица>_default. Если при создании новой секции в DEFAULT-секции уже
+есть строки ее месяца, они переносятся в новую секцию (см.
+create_partition).
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+_BOUND_PATTERN = re.compile(r"FROM \('([\d-]+)[^']*'\) TO \('([\d-]+)[^']*'\)")
+_KEY_PATTERN = re.compile(r"RANGE \((\w+)\)")
+
+logger = logging.getLogger(__name__)
+
+PARTITIONS_QUERY = text(
+    """
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :parent
+    ORDER BY child.relname
+    """
+)
+
+
+@dataclass(frozen=True)
+class RangePartition:
+    name: str
+    # границы [start, end); у DEFAULT-секции границ нет
+    start: Optional[date]
+    end: Optional[date]
+
+    @property
+    def is_default(self) -> bool:
+        return self.start is None
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, start: date) -> str:
+    return f"{parent}_{start:%Y_%m}"
+
+
+def default_partition_name(parent: str) -> str:
+    return f"{parent}_default"
+
+
+def plan_partitions(
+    partitions: List[RangePartition],
+    today: date,
+    months_ahead: int,
+    cutoff: Optional[date],
+) -> Tuple[List[date], List[RangePartition]]:
+    """Какие месячные секции создать и какие секции истекли.
+
+    Создаются секции с текущего месяца по months_ahead месяцев вперед,
+    которых еще нет. Истекшими считаются секции, целиком лежащие до cutoff.
+    """
+    existing = {p.start for p in partitions if not p.is_default}
+    current = month_start(today)
+    to_create = [
+        start
+        for start in (add_months(current, i) for i in range(months_ahead + 1))
+        if start not in existing
+    ]
+    expired = (
+        [p for p in partitions if not p.is_default and p.end <= cutoff]
+        if cutoff is not None
+        else []
+    )
+    return to_create, expired
+
+
+def is_postgresql(conn: Union[AsyncConnection, AsyncSession]) -> bool:
+    bind = conn.get_bind() if isinstance(conn, AsyncSession) else conn
+    return bind.dialect.name == "postgresql"
+
+
+def parse_bound(name: str, bound: str) -> RangePartition:
+    match = _BOUND_PATTERN.search(bound or "")
+    if not match:
+        return RangePartition(name=name, start=None, end=None)
+    return RangePartition(
+        name=name,
+        start=date.fromisoformat(match.group(1)),
+        end=date.fromisoformat(match.group(2)),
+    )
+
+
+async def list_partitions(
+    conn: Union[AsyncConnection, AsyncSession], parent: str
+) -> List[RangePartition]:
+    """Секции таблицы parent по возрастанию границ"""
+    if not is_postgresql(conn):
+        return []
+    rows = (await conn.execute(PARTITIONS_QUERY, {"parent": parent})).all()
+    partitions = [parse_bound(name, bound) for name, bound in rows]
+    return sorted(partitions, key=lambda p: (p.start is None, p.start or date.min))
+
+
+async def is_partitioned(conn: Union[AsyncConnection, AsyncSession], table: str) -> bool:
+    if not is_postgresql(conn):
+        return False
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table "
+            "JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid "
+            "WHERE pg_class.relname = :table"
+        ),
+        {"table": table},
+    )
+    return result.first() is not None
+
+
+async def expired_partitions(
+    conn: Union[AsyncConnection, AsyncSession], parent: str, cutoff: date
+) -> List[RangePartition]:
+    """Секции, все строки которых старше cutoff"""
+    return [p for p in await list_partitions(conn, parent) if not p.is_default and p.end <= cutoff]
+
+
+async def partition_key(conn: Union[AsyncConnection, AsyncSession], parent: str) -> str:
+    """Столбец, по которому секционирована таблица parent"""
+    definition = (
+        await conn.execute(
+            text("SELECT pg_get_partkeydef(CAST(:parent AS regclass))"), {"parent": parent}
+        )
+    ).scalar_one()
+    match = _KEY_PATTERN.search(definition or "")
+    if not match:
+        raise ValueError(f"Таблица {parent} не секционирована по диапазону одного столбца")
+    return match.group(1)
+
+
+async def _table_exists(conn: Union[AsyncConnection, AsyncSession], name: str) -> bool:
+    result = await conn.execute(text("SELECT to_regclass(:name)"), {"name": f'"{name}"'})
+    return result.scalar() is not None
+
+
+async def create_partition(
+    conn: Union[AsyncConnection, AsyncSession], parent: str, start: date
+) -> str:
+    """Месячная секция [start, start + 1 месяц).
+
+    PostgreSQL не создает секцию, если в DEFAULT-секции уже есть строки ее
+    диапазона. Тогда DEFAULT-секция отсоединяется, создается новая секция,
+    строки месяца переносятся в нее и DEFAULT-секция присоединяется обратно.
+    Все шаги выполняются в транзакции вызывающего кода.
+    """
+    name = partition_name(parent, start)
+    if await _table_exists(conn, name):
+        return name
+
+    end = add_months(start, 1)
+    bounds = {"start": start, "end": end}
+    create = text(
+        f'CREATE TABLE "{name}" PARTITION OF "{parent}" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    default = default_partition_name(parent)
+    if not await _table_exists(conn, default):
+        await conn.execute(create)
+        return name
+
+    key = await partition_key(conn, parent)
+    in_range = f'"{key}" >= :start AND "{key}" < :end'
+    stranded = await conn.execute(
+        text(f'SELECT 1 FROM "{default}" WHERE {in_range} LIMIT 1'), bounds
+    )
+    if stranded.first() is None:
+        await conn.execute(create)
+        return name
+
+    await conn.execute(text(f'ALTER TABLE "{parent}" DETACH PARTITION "{default}"'))
+    await conn.execute(create)
+    moved = await conn.execute(
+        text(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {in_range}'), bounds
+    )
+    await conn.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'), bounds)
+    await conn.execute(text(f'ALTER TABLE "{parent}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.warning("%s rows moved from %s to %s", moved.rowcount, default, name)
+    return name
+
+
+async def detach_partition(
+    conn: Union[AsyncConnection, AsyncSession], parent: str, partition: RangePartition
+) -> None:
+    """Отсоединение секции: данные остаются в отдельной таблице (архив)"""
+    await conn.execute(text(f'ALTER TABLE "{parent}" DETACH PARTITION "{partition.name}"'))
+
+
+async def drop_partition(
+    conn: Union[AsyncConnection, AsyncSession], parent: str, partition: RangePartition
+) -> None:
+    """Отсоединение и удаление секции - без построчного DELETE и WAL на каждую строку"""
+    await detach_partition(conn, parent, partition)
+    await conn.execute(text(f'DROP TABLE "{partition.name}"'))
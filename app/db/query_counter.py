@@ -0,0 +1,48 @@
+"""Подсчет SQL-запросов, отправленных в БД"""
+
+from typing import List, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """Контекстный менеджер, собирающий SQL, выполненный через движок.
+
+    Пример:
+        with QueryCounter(engine) as counter:
+            await repository.update(session, product_id, data)
+        assert counter.count == 1
+
+    С max_queries выход из блока падает с AssertionError, если запросов
+    оказалось больше - так тесты ловят регрессии N+1.
+    """
+
+    def __init__(
+        self, engine: Union[Engine, AsyncEngine], max_queries: Optional[int] = None
+    ):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.max_queries = max_queries
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        if exc_type is None and self.max_queries is not None:
+            if self.count > self.max_queries:
+                executed = "\n".join(f"  {sql}" for sql in self.statements)
+                raise AssertionError(
+                    f"Expected at most {self.max_queries} queries, "
+                    f"got {self.count}:\n{executed}"
+                )
@@ -1,19 +1,92 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import os
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import Delete, Insert, Select, Update, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, declarative_base
 
 # SQLite с асинхронным драйвером
-DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+# Реплика для чтения; если не задана, чтение идет в основную БД
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
 
 engine = create_async_engine(DATABASE_URL, echo=True)
-AsyncSessionLocal = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
+replica_engine = (
+    create_async_engine(REPLICA_DATABASE_URL, echo=True)
+    if REPLICA_DATABASE_URL
+    else engine
 )
 
+
+class RoutingSession(Session):
+    """Сессия, отправляющая чтение на реплику, а запись на основную БД.
+
+    После первой записи (flush или DML) сессия закрепляется за основной БД
+    до конца своей жизни, чтобы читать только что записанные данные.
+    SELECT ... FOR UPDATE всегда идет в основную БД и тоже закрепляет сессию.
+    """
+
+    primary: Optional[Engine] = None
+    replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("use_primary"):
+            return self.primary
+        if isinstance(clause, (Insert, Update, Delete)) or (
+            isinstance(clause, Select) and clause._for_update_arg is not None
+        ):
+            self.info["use_primary"] = True
+            return self.primary
+        if isinstance(clause, Select):
+            return self.replica
+        return self.primary
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _pin_on_flush(session, flush_context, instances):
+    """Flush вызывается только при наличии изменений - закрепляем сессию"""
+    session.info["use_primary"] = True
+
+
+def make_routing_sessionmaker(
+    primary: AsyncEngine, replica: Optional[AsyncEngine] = None
+) -> async_sessionmaker:
+    """Фабрика асинхронных сессий с маршрутизацией чтения на реплику"""
+    routing_class = type(
+        "BoundRoutingSession",
+        (RoutingSession,),
+        {
+            "primary": primary.sync_engine,
+            "replica": (replica or primary).sync_engine,
+        },
+    )
+    return async_sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=routing_class,
+        expire_on_commit=False,
+    )
+
+
+def use_primary(session: AsyncSession) -> AsyncSession:
+    """Закрепить сессию за основной БД (read-your-writes).
+
+    Нужно для сценариев «проверить, затем записать»: чтение перед записью
+    не должно видеть отстающую реплику.
+    """
+    session.info["use_primary"] = True
+    return session
+
+
+AsyncSessionLocal = make_routing_sessionmaker(engine, replica_engine)
+
 Base = declarative_base()
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
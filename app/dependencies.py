@@ -0,0 +1,24 @@
+"""Зависимости обработчиков Litestar.
+
+Сессия БД открывается на запрос из общего пула движка; сервисы
+создаются один раз на воркер в app.lifecycle.init_resources и берутся
+из app.state.
+"""
+
+from typing import Dict
+
+from litestar.datastructures import State
+from litestar.di import Provide
+
+from app.db.session import get_async_session
+from app.services.inventory_service import InventoryService
+
+
+def provide_inventory_service(state: State) -> InventoryService:
+    return state.inventory_service
+
+
+DEPENDENCIES: Dict[str, Provide] = {
+    "session": Provide(get_async_session),
+    "inventory_service": Provide(provide_inventory_service, sync_to_thread=False),
+}
@@ -0,0 +1,139 @@
+"""Условные HTTP-запросы: ETag / Last-Modified и ответ 304.
+
+Валидатор ответа строится дешевым запросом (COUNT и MAX метки времени по
+индексированному фильтру) до основного запроса. Если клиент прислал
+совпадающий If-None-Match или If-Modified-Since, обработчик отвечает 304
+без выборки строк и сериализации тела.
+
+Пример:
+    validator = await table_validator(
+        db, DailyOrderReport.created_at, DailyOrderReport.report_at == day,
+        tag="report", params=(day, fmt),
+    )
+    return await conditional_response(request, validator, build_body)
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from litestar import Request, Response
+from litestar.status_codes import HTTP_304_NOT_MODIFIED
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class Validator:
+    etag: str
+    last_modified: Optional[datetime]
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _as_utc(value: datetime) -> datetime:
+    # метки времени в БД хранятся без зоны в локальном времени сервера
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_validator(
+    tag: str,
+    params: Iterable[Any],
+    *state: Any,
+    last_modified: Optional[datetime] = None,
+) -> Validator:
+    """Слабый ETag из параметров запроса и состояния данных"""
+    digest = hashlib.blake2b(
+        "|".join(map(str, (tag, *params, *state))).encode(), digest_size=12
+    ).hexdigest()
+    return Validator(
+        etag=f'W/"{digest}"',
+        last_modified=_as_utc(last_modified) if last_modified else None,
+    )
+
+
+async def table_validator(
+    session: AsyncSession,
+    timestamp_column,
+    *where,
+    tag: str,
+    params: Iterable[Any] = (),
+) -> Validator:
+    """Валидатор по COUNT(*) и MAX(timestamp_column) строк под фильтром.
+
+    COUNT ловит удаления, MAX - вставки и обновления.
+    """
+    query = select(func.count(), func.max(timestamp_column)).select_from(
+        timestamp_column.table
+    )
+    if where:
+        query = query.where(*where)
+    count, last_modified = (await session.execute(query)).one()
+    if isinstance(last_modified, str):
+        last_modified = datetime.fromisoformat(last_modified)
+    return make_validator(
+        tag,
+        params,
+        count,
+        last_modified.isoformat() if last_modified else None,
+        last_modified=last_modified,
+    )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # слабое сравнение: W/ не учитывается
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match имеет приоритет над If-Modified-Since (RFC 9110)
+        return _etag_matches(if_none_match, validator.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validator.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validator.last_modified <= since
+    return False
+
+
+def not_modified(validator: Validator) -> Response:
+    return Response(content=None, status_code=HTTP_304_NOT_MODIFIED, headers=validator.headers())
+
+
+def with_validator(content: Any, validator: Validator) -> Response:
+    return Response(content=content, headers=validator.headers())
+
+
+async def conditional_response(
+    request: Request,
+    validator: Validator,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """304 при совпадении валидатора, иначе тело из build() с заголовками"""
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    content = await build()
+    if isinstance(content, Response):
+        content.headers.update(validator.headers())
+        return content
+    return with_validator(content, validator)
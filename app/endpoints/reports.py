@@ -1,12 +1,15 @@
-from litestar import Controller, get, post
+from litestar import Controller, Request, Response, get, post
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_404_NOT_FOUND
 from litestar.exceptions import HTTPException
 from datetime import date
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.db.session import AsyncSessionLocal
+from app.endpoints.conditional import conditional_response, table_validator
+from app.endpoints.streaming import FORMAT_PATTERN, daily_report_response
+from app.services.report_cache import report_cache
 from app.models.database_models import DailyOrderReport, Order
 
 class ReportController(Controller):
@@ -15,9 +18,18 @@ class ReportController(Controller):
     @get("/daily")
     async def get_daily_report(
         self,
+        request: Request,
+        session: AsyncSession,
         report_date: str = Parameter(title="Дата отчета", description="Формат YYYY-MM-DD"),
-        db: AsyncSession = AsyncSessionLocal()
-    ) -> dict:
+        format: str = Parameter(
+            query="format",
+            default="json",
+            pattern=FORMAT_PATTERN,
+            description="json - страница списком, ndjson/csv - потоковая выгрузка всех строк",
+        ),
+        offset: int = Parameter(query="offset", default=0, ge=0),
+        limit: Optional[int] = Parameter(query="limit", default=None, ge=1, le=1000)
+    ) -> Response:
         try:
             date_obj = date.fromisoformat(report_date)
         except ValueError:
@@ -26,39 +38,23 @@ class ReportController(Controller):
                 status_code=400
             )
         
-        async with db:
-            result = await db.execute(
-                select(DailyOrderReport)
-                .where(DailyOrderReport.report_at == date_obj)
-                .order_by(DailyOrderReport.created_at.desc())
-            )
-            reports = result.scalars().all()
-            
-            if not reports:
-                raise HTTPException(
-                    detail=f"Отчеты за дату {report_date} не найдены",
-                    status_code=HTTP_404_NOT_FOUND
-                )
-            
-            return {
-                "date": report_date,
-                "reports": [
-                    {
-                        "id": str(report.id),
-                        "order_id": str(report.order_id),
-                        "count_product": report.count_product,
-                        "created_at": report.created_at.isoformat()
-                    }
-                    for report in reports
-                ]
-            }
+        validator = await table_validator(
+            session, DailyOrderReport.created_at, DailyOrderReport.report_at == date_obj,
+            tag="report", params=(date_obj, format, offset, limit),
+        )
+        return await conditional_response(
+            request,
+            validator,
+            lambda: daily_report_response(session, date_obj, report_date, format, offset, limit),
+        )
     
     @get("/daily/summary")
     async def get_daily_summary(
         self,
-        report_date: str = Parameter(title="Дата отчета", description="Формат YYYY-MM-DD"),
-        db: AsyncSession = AsyncSessionLocal()
-    ) -> dict:
+        request: Request,
+        session: AsyncSession,
+        report_date: str = Parameter(title="Дата отчета", description="Формат YYYY-MM-DD")
+    ) -> Response:
         try:
             date_obj = date.fromisoformat(report_date)
         except ValueError:
@@ -67,8 +63,8 @@ class ReportController(Controller):
                 status_code=400
             )
         
-        async with db:
-            count_result = await db.execute(
+        async def compute() -> dict:
+            count_result = await session.execute(
                 select(func.count(DailyOrderReport.id))
                 .where(DailyOrderReport.report_at == date_obj)
             )
@@ -80,7 +76,7 @@ class ReportController(Controller):
                     status_code=HTTP_404_NOT_FOUND
                 )
             
-            sum_result = await db.execute(
+            sum_result = await session.execute(
                 select(func.sum(DailyOrderReport.count_product))
                 .where(DailyOrderReport.report_at == date_obj)
             )
@@ -92,12 +88,22 @@ class ReportController(Controller):
                 "total_products": total_products,
                 "average_products_per_order": round(total_products / total_reports, 2)
             }
+        
+        validator = await table_validator(
+            session, DailyOrderReport.created_at, DailyOrderReport.report_at == date_obj,
+            tag="summary", params=(date_obj,),
+        )
+        return await conditional_response(
+            request,
+            validator,
+            lambda: report_cache.get_or_compute("summary", date_obj, compute),
+        )
     
     @post("/daily/generate")
     async def generate_report(
         self,
-        report_date: str = Parameter(title="Дата для генерации", description="Формат YYYY-MM-DD"),
-        db: AsyncSession = AsyncSessionLocal()
+        session: AsyncSession,
+        report_date: str = Parameter(title="Дата для генерации", description="Формат YYYY-MM-DD")
     ) -> dict:
         try:
             date_obj = date.fromisoformat(report_date)
@@ -107,55 +113,54 @@ class ReportController(Controller):
                 status_code=400
             )
         
-        async with db:
-            existing_result = await db.execute(
-                select(func.count(DailyOrderReport.id))
-                .where(DailyOrderReport.report_at == date_obj)
-            )
-            existing_count = existing_result.scalar()
-            
-            if existing_count > 0:
-                return {
-                    "status": "already_exists",
-                    "message": f"Отчет за {report_date} уже существует ({existing_count} записей)",
-                    "date": report_date
-                }
-            
-            orders_result = await db.execute(
-                select(Order)
-                .where(func.date(Order.created_at) == date_obj)
-            )
-            orders = orders_result.scalars().all()
-            
-            if not orders:
-                return {
-                    "status": "no_orders",
-                    "message": f"Нет заказов за дату {report_date}",
-                    "date": report_date
-                }
-            
-            reports_created = 0
-            for order in orders:
-                report = DailyOrderReport(
-                    report_at=date_obj,
-                    order_id=order.id,
-                    count_product=order.quantity or 1
-                )
-                db.add(report)
-                reports_created += 1
-            
-            await db.commit()
-            
+        existing_result = await session.execute(
+            select(func.count(DailyOrderReport.id))
+            .where(DailyOrderReport.report_at == date_obj)
+        )
+        existing_count = existing_result.scalar()
+        
+        if existing_count > 0:
             return {
-                "status": "success",
-                "message": f"Создано {reports_created} отчетов за {report_date}",
-                "date": report_date,
-                "reports_created": reports_created
+                "status": "already_exists",
+                "message": f"Отчет за {report_date} уже существует ({existing_count} записей)",
+                "date": report_date
+            }
+        
+        orders_result = await session.execute(
+            select(Order)
+            .where(func.date(Order.created_at) == date_obj)
+        )
+        orders = orders_result.scalars().all()
+        
+        if not orders:
+            return {
+                "status": "no_orders",
+                "message": f"Нет заказов за дату {report_date}",
+                "date": report_date
             }
+        
+        reports_created = 0
+        for order in orders:
+            report = DailyOrderReport(
+                report_at=date_obj,
+                order_id=order.id,
+                count_product=order.quantity or 1
+            )
+            session.add(report)
+            reports_created += 1
+        
+        await session.commit()
+        report_cache.bump(date_obj)
+        
+        return {
+            "status": "success",
+            "message": f"Создано {reports_created} отчетов за {report_date}",
+            "date": report_date,
+            "reports_created": reports_created
+        }
     
     @get("/count")
-    async def get_total_reports(self, db: AsyncSession = AsyncSessionLocal()) -> dict:
-        async with db:
-            result = await db.execute(select(func.count(DailyOrderReport.id)))
-            count = result.scalar()
-            return {"total_reports": count}
\ No newline at end of file
+    async def get_total_reports(self, session: AsyncSession) -> dict:
+        result = await session.execute(select(func.count(DailyOrderReport.id)))
+        count = result.scalar()
+        return {"total_reports": count}
\ No newline at end of file
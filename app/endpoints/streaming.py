@@ -0,0 +1,152 @@
+"""Потоковая выдача отчетов в формате NDJSON или CSV.
+
+Строки читаются серверным курсором (session.stream + yield_per) и
+отправляются клиенту пачками, поэтому память не зависит от числа строк.
+Сессия открывается внутри генератора: она должна жить, пока ответ
+передается, а не только пока работает обработчик.
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import AsyncIterator, Callable, Optional, Union
+
+from litestar.exceptions import HTTPException
+from litestar.response import Stream
+from litestar.status_codes import HTTP_404_NOT_FOUND
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.models.database_models import DailyOrderReport
+
+STREAM_CHUNK_ROWS = 1000
+
+REPORT_COLUMNS = ("id", "order_id", "count_product", "created_at")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+FORMAT_PATTERN = "^(json|ndjson|csv)$"
+
+
+def daily_reports_query(report_date: date) -> Select:
+    """Колонки отчетов за дату без ORM-объектов (не копятся в identity map)"""
+    return (
+        select(*(getattr(DailyOrderReport, name) for name in REPORT_COLUMNS))
+        .where(DailyOrderReport.report_at == report_date)
+        .order_by(DailyOrderReport.created_at.desc(), DailyOrderReport.id.desc())
+    )
+
+
+def report_row_to_dict(row) -> dict:
+    return {
+        "id": str(row.id),
+        "order_id": str(row.order_id),
+        "count_product": row.count_product,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def _encode_ndjson(rows) -> bytes:
+    return "".join(
+        json.dumps(report_row_to_dict(row), ensure_ascii=False) + "\n" for row in rows
+    ).encode()
+
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(report_row_to_dict(row).values())
+    return buffer.getvalue().encode()
+
+
+async def iter_rows(
+    query: Select,
+    fmt: str,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """Генератор байтов ответа: одна порция на chunk_rows строк"""
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    if fmt == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(REPORT_COLUMNS)
+        yield header.getvalue().encode()
+
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=chunk_rows))
+        async for partition in result.partitions():
+            yield encode(partition)
+
+
+def stream_response(
+    query: Select,
+    fmt: str,
+    filename: str,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+) -> Stream:
+    # Stream в Litestar 2.7 отдает приоритет media_type обработчика (json),
+    # поэтому Content-Type задается заголовком явно
+    headers = {"Content-Type": MEDIA_TYPES[fmt]}
+    if fmt == "csv":
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return Stream(
+        iter_rows(query, fmt, session_factory),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
+
+
+async def daily_report_response(
+    db: AsyncSession,
+    report_date: date,
+    label: str,
+    fmt: str = "json",
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Union[dict, Stream]:
+    """Отчеты за дату: страница списком (json) или поток всех строк (ndjson/csv)"""
+    not_found = HTTPException(
+        detail=f"Отчеты за дату {label} не найдены",
+        status_code=HTTP_404_NOT_FOUND
+    )
+
+    if fmt != "json":
+        exists = await db.execute(
+            select(DailyOrderReport.id)
+            .where(DailyOrderReport.report_at == report_date)
+            .limit(1)
+        )
+        if exists.first() is None:
+            raise not_found
+        return stream_response(daily_reports_query(report_date), fmt, f"report_{label}")
+
+    query = daily_reports_query(report_date).offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = (await db.execute(query)).all()
+
+    if offset or limit is not None:
+        total_result = await db.execute(
+            select(func.count(DailyOrderReport.id))
+            .where(DailyOrderReport.report_at == report_date)
+        )
+        total_reports = total_result.scalar()
+    else:
+        total_reports = len(rows)
+
+    if not total_reports:
+        raise not_found
+
+    return {
+        "date": label,
+        "total_reports": total_reports,
+        "offset": offset,
+        "limit": limit,
+        "reports": [report_row_to_dict(row) for row in rows]
+    }
@@ -0,0 +1,84 @@
+"""Ресурсы приложения на время жизни воркера.
+
+Каждый воркер uvicorn/gunicorn при старте один раз готовит пулы БД и
+Redis, соединение RabbitMQ и сервисы (в app.state), а при остановке
+закрывает их. Там же работает фоновый перенос журнала остатков из
+Redis в БД (app.services.inventory_sync). Обработчики получают ресурсы
+через зависимости (app.dependencies), а не создают их на каждый запрос.
+
+При gunicorn --preload движки создаются в мастере до fork, поэтому
+init_resources отбрасывает унаследованные пулы (dispose(close=False)):
+воркеры открывают свои соединения и не делят сокеты родителя.
+"""
+
+import asyncio
+import contextlib
+
+from litestar import Litestar
+
+from app.db.instrumentation import instrument_engine
+from app.db.session import engine, replica_engine
+from app.redis.client import close_redis, get_redis
+from app.repositories.user_search_repository import UserSearchRepository
+from app.services import cache_warmer
+from app.services.inventory_service import InventoryService
+from app.services.inventory_sync import INVENTORY_SYNC_ON_STARTUP, InventorySyncer
+from app.services.rabbitmq_service import RabbitMQService
+
+
+def _engines():
+    return [engine] if replica_engine is engine else [engine, replica_engine]
+
+
+async def init_resources(app: Litestar) -> None:
+    for current in _engines():
+        await current.dispose(close=False)
+    instrument_engine(engine, "primary")
+    if replica_engine is not engine:
+        instrument_engine(replica_engine, "replica")
+
+    # на PostgreSQL индексы поиска создает миграция, SQLite-базу могли
+    # создать через create_all - без FTS5-таблицы users_fts
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await UserSearchRepository.ensure_index(conn)
+
+    get_redis()
+
+    # недоступный брокер не мешает старту: publish_event переподключится
+    rabbitmq = RabbitMQService()
+    await rabbitmq.connect()
+    app.state.rabbitmq = rabbitmq
+
+    app.state.inventory_service = await InventoryService().initialize()
+
+    app.state.inventory_syncer = InventorySyncer()
+    if INVENTORY_SYNC_ON_STARTUP:
+        app.state.inventory_sync_task = asyncio.create_task(app.state.inventory_syncer.run())
+
+
+async def close_resources(app: Litestar) -> None:
+    task = cache_warmer._startup_task
+    if task is not None and not task.done():
+        task.cancel()
+
+    sync_task = app.state.get("inventory_sync_task")
+    if sync_task is not None:
+        sync_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await sync_task
+    syncer = app.state.get("inventory_syncer")
+    if syncer is not None:
+        try:
+            await syncer.sync_all()
+        except Exception as e:
+            print(f"[InventorySync] Final sync failed: {e}")
+
+    rabbitmq = app.state.get("rabbitmq")
+    if rabbitmq is not None:
+        await rabbitmq.disconnect()
+
+    close_redis()
+    for current in _engines():
+        await current.dispose()
+    print("[App] Resources closed")
@@ -2,7 +2,8 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from litestar import Litestar, get, post
+from typing import Optional
+from litestar import Litestar, Request, Response, get, post
 from litestar.openapi import OpenAPIConfig
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_404_NOT_FOUND
@@ -11,14 +12,31 @@ from litestar.exceptions import HTTPException
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.endpoints import reports
-from app.db.session import AsyncSessionLocal
+from app.controllers.cache_controller import (
+    CacheManagementController,
+    ProductCacheController,
+    UserCacheController,
+)
+from app.controllers.product_controller import ProductController
+from app.controllers.report_controller import ReportController
+from app.controllers.user_controller import UserController
+from app.db.session import use_primary
+from app.dependencies import DEPENDENCIES
+from app.endpoints.reports import ReportController as DailyReportController
+from app.endpoints.conditional import conditional_response, table_validator
+from app.endpoints.streaming import FORMAT_PATTERN, daily_report_response
+from app.monitoring.metrics import MetricsMiddleware, metrics_handler
+from app.monitoring.profiling import profiling_middleware
+from app.lifecycle import close_resources, init_resources
+from app.services.cache_warmer import warm_cache_on_startup
+from app.services.report_cache import report_cache
 from app.models.database_models import DailyOrderReport, Order
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
+WORKERS = int(os.getenv("WORKERS", "1"))
 
 @get("/")
 async def root() -> dict:
@@ -26,19 +44,34 @@ async def root() -> dict:
         "message": "Report System API",
         "endpoints": {
             "docs": "/schema",
-            "get_report": "GET /report?report_date=YYYY-MM-DD",
+            "get_report": "GET /report?report_date=YYYY-MM-DD[&offset=0&limit=100]",
+            "stream_report": "GET /report?report_date=YYYY-MM-DD&format=ndjson|csv",
             "summary": "GET /report/summary?report_date=YYYY-MM-DD",
             "detailed": "GET /report/detailed?report_date=YYYY-MM-DD",
             "generate": "POST /report/generate?report_date=YYYY-MM-DD",
-            "count": "GET /report/count"
+            "count": "GET /report/count",
+            "users": "/api/users",
+            "products": "/api/v1/products",
+            "cache": "/api/v1/cache",
+            "reports": "/api/v1/reports, /reports",
+            "metrics": "GET /metrics"
         }
     }
 
 @get("/report")
 async def get_daily_report(
+    request: Request,
+    session: AsyncSession,
     report_date: str = Parameter(title="Дата отчета", description="Формат YYYY-MM-DD"),
-    db: AsyncSession = AsyncSessionLocal()
-) -> dict:
+    format: str = Parameter(
+        query="format",
+        default="json",
+        pattern=FORMAT_PATTERN,
+        description="json - страница списком, ndjson/csv - потоковая выгрузка всех строк",
+    ),
+    offset: int = Parameter(query="offset", default=0, ge=0),
+    limit: Optional[int] = Parameter(query="limit", default=None, ge=1, le=1000)
+) -> Response:
     try:
         from datetime import date
         date_obj = date.fromisoformat(report_date)
@@ -48,39 +81,22 @@ async def get_daily_report(
             status_code=400
         )
     
-    async with db:
-        result = await db.execute(
-            select(DailyOrderReport)
-            .where(DailyOrderReport.report_at == date_obj)
-            .order_by(DailyOrderReport.created_at.desc())
-        )
-        reports_list = result.scalars().all()
-        
-        if not reports_list:
-            raise HTTPException(
-                detail=f"Отчеты за дату {report_date} не найдены",
-                status_code=HTTP_404_NOT_FOUND
-            )
-        
-        return {
-            "date": report_date,
-            "total_reports": len(reports_list),
-            "reports": [
-                {
-                    "id": str(report.id),
-                    "order_id": str(report.order_id),
-                    "count_product": report.count_product,
-                    "created_at": report.created_at.isoformat()
-                }
-                for report in reports_list
-            ]
-        }
+    validator = await table_validator(
+        session, DailyOrderReport.created_at, DailyOrderReport.report_at == date_obj,
+        tag="report", params=(date_obj, format, offset, limit),
+    )
+    return await conditional_response(
+        request,
+        validator,
+        lambda: daily_report_response(session, date_obj, report_date, format, offset, limit),
+    )
 
 @get("/report/summary")
 async def get_daily_summary(
-    report_date: str = Parameter(title="Дата отчета", description="Формат YYYY-MM-DD"),
-    db: AsyncSession = AsyncSessionLocal()
-) -> dict:
+    request: Request,
+    session: AsyncSession,
+    report_date: str = Parameter(title="Дата отчета", description="Формат YYYY-MM-DD")
+) -> Response:
     try:
         from datetime import date
         date_obj = date.fromisoformat(report_date)
@@ -90,8 +106,8 @@ async def get_daily_summary(
             status_code=400
         )
     
-    async with db:
-        count_result = await db.execute(
+    async def compute() -> dict:
+        count_result = await session.execute(
             select(func.count(DailyOrderReport.id))
             .where(DailyOrderReport.report_at == date_obj)
         )
@@ -103,7 +119,7 @@ async def get_daily_summary(
                 status_code=HTTP_404_NOT_FOUND
             )
         
-        sum_result = await db.execute(
+        sum_result = await session.execute(
             select(func.sum(DailyOrderReport.count_product))
             .where(DailyOrderReport.report_at == date_obj)
         )
@@ -116,10 +132,20 @@ async def get_daily_summary(
             "average_products_per_order": round(total_products / total_reports, 2) if total_reports > 0 else 0
         }
 
+    validator = await table_validator(
+        session, DailyOrderReport.created_at, DailyOrderReport.report_at == date_obj,
+        tag="summary", params=(date_obj,),
+    )
+    return await conditional_response(
+        request,
+        validator,
+        lambda: report_cache.get_or_compute("summary", date_obj, compute),
+    )
+
 @post("/report/generate")
 async def generate_report(
-    report_date: str = Parameter(title="Дата для генерации", description="Формат YYYY-MM-DD"),
-    db: AsyncSession = AsyncSessionLocal()
+    session: AsyncSession,
+    report_date: str = Parameter(title="Дата для генерации", description="Формат YYYY-MM-DD")
 ) -> dict:
     try:
         from datetime import date
@@ -130,58 +156,59 @@ async def generate_report(
             status_code=400
         )
     
-    async with db:
-        existing_result = await db.execute(
-            select(func.count(DailyOrderReport.id))
-            .where(DailyOrderReport.report_at == date_obj)
-        )
-        existing_count = existing_result.scalar()
-        
-        if existing_count > 0:
-            return {
-                "status": "already_exists",
-                "message": f"Отчет за {report_date} уже существует ({existing_count} записей)",
-                "date": report_date
-            }
-        
-        orders_result = await db.execute(
-            select(Order)
-            .where(func.date(Order.created_at) == date_obj)
-        )
-        orders = orders_result.scalars().all()
-        
-        if not orders:
-            return {
-                "status": "no_orders",
-                "message": f"Нет заказов за дату {report_date}",
-                "date": report_date
-            }
-        
-        reports_created = 0
-        for order in orders:
-            report = DailyOrderReport(
-                report_at=date_obj,
-                order_id=order.id,
-                count_product=order.quantity or 1
-            )
-            db.add(report)
-            reports_created += 1
-        
-        await db.commit()
-        
+    # Проверка перед записью - читаем из основной БД, а не с реплики
+    use_primary(session)
+    existing_result = await session.execute(
+        select(func.count(DailyOrderReport.id))
+        .where(DailyOrderReport.report_at == date_obj)
+    )
+    existing_count = existing_result.scalar()
+    
+    if existing_count > 0:
         return {
-            "status": "success",
-            "message": f"Создано {reports_created} отчетов за {report_date}",
-            "date": report_date,
-            "reports_created": reports_created
+            "status": "already_exists",
+            "message": f"Отчет за {report_date} уже существует ({existing_count} записей)",
+            "date": report_date
+        }
+    
+    orders_result = await session.execute(
+        select(Order)
+        .where(func.date(Order.created_at) == date_obj)
+    )
+    orders = orders_result.scalars().all()
+    
+    if not orders:
+        return {
+            "status": "no_orders",
+            "message": f"Нет заказов за дату {report_date}",
+            "date": report_date
         }
+    
+    reports_created = 0
+    for order in orders:
+        report = DailyOrderReport(
+            report_at=date_obj,
+            order_id=order.id,
+            count_product=order.quantity or 1
+        )
+        session.add(report)
+        reports_created += 1
+    
+    await session.commit()
+    report_cache.bump(date_obj)
+    
+    return {
+        "status": "success",
+        "message": f"Создано {reports_created} отчетов за {report_date}",
+        "date": report_date,
+        "reports_created": reports_created
+    }
 
 @get("/report/count")
-async def get_total_reports(db: AsyncSession = AsyncSessionLocal()) -> dict:
-    async with db:
-        result = await db.execute(select(func.count(DailyOrderReport.id)))
-        count = result.scalar()
-        return {"total_reports": count}
+async def get_total_reports(session: AsyncSession) -> dict:
+    result = await session.execute(select(func.count(DailyOrderReport.id)))
+    count = result.scalar()
+    return {"total_reports": count}
 
 @get("/health")
 async def health_check() -> dict:
@@ -191,23 +218,52 @@ async def health_check() -> dict:
         "service": "Report System API"
     }
 
-app = Litestar(
-    route_handlers=[
-        root,
-        get_daily_report,
-        get_daily_summary,
-        generate_report,
-        get_total_reports,
-        health_check
-    ],
-    debug=True,
-    cors_config={"allow_origins": ["*"]},
-    openapi_config=OpenAPIConfig(
-        title="Report System API",
-        version="1.0.0",
-        description="API для работы с отчетами по заказам"
+def create_app() -> Litestar:
+    """Приложение с контроллерами, зависимостями и жизненным циклом.
+
+    Пулы БД и Redis, соединение RabbitMQ и сервисы создаются в каждом
+    воркере при старте (app.lifecycle). Пользователи, продукты, отчеты, кэш
+    и остатки хранятся в общих БД и Redis, и эти маршруты можно обслуживать
+    несколькими процессами:
+        uvicorn app.main:create_app --factory --workers 4
+        gunicorn app.main:app -k uvicorn.workers.UvicornWorker -w 4
+    OrderController (/api/v1/orders) не подключен: OrderProcessor хранит
+    заказы в памяти процесса, а резервы остатков общие, и резерв, снятый
+    в одном воркере, нельзя было бы вернуть через другой. Он будет
+    подключен, когда заказы переедут в таблицу orders (OrderRepository).
+    Для общих метрик воркеров задайте PROMETHEUS_MULTIPROC_DIR.
+    """
+    return Litestar(
+        route_handlers=[
+            root,
+            get_daily_report,
+            get_daily_summary,
+            generate_report,
+            get_total_reports,
+            health_check,
+            metrics_handler,
+            UserController,
+            ProductController,
+            UserCacheController,
+            ProductCacheController,
+            CacheManagementController,
+            ReportController,
+            DailyReportController
+        ],
+        dependencies=DEPENDENCIES,
+        middleware=[MetricsMiddleware, *profiling_middleware()],
+        on_startup=[init_resources, warm_cache_on_startup],
+        on_shutdown=[close_resources],
+        debug=True,
+        cors_config={"allow_origins": ["*"]},
+        openapi_config=OpenAPIConfig(
+            title="Report System API",
+            version="1.0.0",
+            description="API для работы с отчетами по заказам"
+        )
     )
-)
+
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
@@ -217,8 +273,10 @@ if __name__ == "__main__":
     print(f"OpenAPI schema: http://{HOST}:{PORT}/schema/openapi.json")
     
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host=HOST,
         port=PORT,
-        reload=True
+        workers=WORKERS,
+        reload=WORKERS == 1
     )  
\ No newline at end of file
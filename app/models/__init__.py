@@ -5,10 +5,12 @@ from .database_models import (
     Address, 
     Order, 
     Product,
+    InventoryLog,
     UserCreate,
     UserUpdate,
     UserResponse,
     UsersListResponse,
+    AddressResponse,
     ProductCreate,
     ProductUpdate,
     ProductResponse,
@@ -41,10 +43,12 @@ __all__ = [
     'Address', 
     'Order', 
     'Product',
+    'InventoryLog',
     'UserCreate',
     'UserUpdate',
     'UserResponse', 
     'UsersListResponse',
+    'AddressResponse',
     'ProductCreate',
     'ProductUpdate',
     'ProductResponse',
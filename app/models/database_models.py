@@ -3,7 +3,7 @@ from typing import List, Optional
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from datetime import date 
 
@@ -14,6 +14,7 @@ class Base(DeclarativeBase):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     username: Mapped[str] = mapped_column(nullable=False, unique=True)
     description: Mapped[Optional[str]] = mapped_column(nullable=True)
@@ -43,6 +44,7 @@ class Address(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (Index("ix_products_created_at_id", "created_at", "id"),)
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     name: Mapped[str] = mapped_column(nullable=False)
@@ -55,10 +57,12 @@ class Product(Base):
     )
 
     orders = relationship("Order", back_populates="product")
+    inventory_logs = relationship("InventoryLog", back_populates="product")
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (Index("ix_orders_created_at_id", "created_at", "id"),)
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -77,6 +81,36 @@ class Order(Base):
     address = relationship("Address", back_populates="orders")
     product = relationship("Product", back_populates="orders")
     daily_reports = relationship("DailyOrderReport", back_populates="order", cascade="all, delete-orphan")
+    items = relationship("OrderItem", back_populates="order")
+
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    order_id: Mapped[UUID] = mapped_column(ForeignKey("orders.id"), nullable=False)
+    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id"), nullable=False)
+    quantity: Mapped[int] = mapped_column(nullable=False)
+    price_at_time: Mapped[Optional[float]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+
+    order = relationship("Order", back_populates="items")
+
+
+class InventoryLog(Base):
+    __tablename__ = "inventory_logs"
+    __table_args__ = (Index("ix_inventory_logs_created_at_id", "created_at", "id"),)
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id"), nullable=False)
+    old_quantity: Mapped[int] = mapped_column(default=0)
+    new_quantity: Mapped[int] = mapped_column(default=0)
+    quantity_change: Mapped[int] = mapped_column(nullable=False)
+    reason: Mapped[str] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+
+    product = relationship("Product", back_populates="inventory_logs")
+
 
 class DailyOrderReport(Base):
     __tablename__ = "daily_order_reports"
@@ -115,6 +149,18 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AddressResponse(BaseModel):
+    id: UUID
+    street: str
+    city: str
+    province: str
+    zip_code: str
+    country: str
+    is_primary: bool
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 def user_to_response(user: User) -> UserResponse:
     return UserResponse(
         id=user.id,
@@ -133,6 +179,7 @@ class UsersListResponse(BaseModel):
     page: int
     per_page: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
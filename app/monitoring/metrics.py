@@ -0,0 +1,171 @@
+"""Метрики Prometheus для API, БД, кэша и потребителей очередей.
+
+Метрики регистрируются в реестре prometheus_client по умолчанию и
+отдаются эндпоинтом /metrics (metrics_handler). Процессы потребителей
+поднимают собственный HTTP-сервер метрик (start_metrics_server).
+
+Для нескольких воркеров uvicorn/gunicorn задайте PROMETHEUS_MULTIPROC_DIR:
+тогда /metrics собирает значения всех процессов.
+
+Обновление метрики - это инкремент под локом внутри prometheus_client,
+поэтому на горячем пути остаются только вызовы perf_counter и observe.
+"""
+
+import os
+import time
+from typing import Optional
+
+from litestar import Response, get
+from litestar.middleware import AbstractMiddleware
+from litestar.types import Message, Receive, Scope, Send
+from litestar.utils.path import join_paths
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+# границы корзин гистограмм, секунды
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SLOW_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP-запросы", ["method", "route", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Длительность HTTP-запроса", ["method", "route"],
+    buckets=SLOW_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP-запросы в обработке", ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES = Counter("db_queries_total", "SQL-запросы", ["engine", "operation"])
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Длительность SQL-запроса", ["engine", "operation"],
+    buckets=FAST_BUCKETS,
+)
+
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Чтения кэша", ["kind", "result"])
+CACHE_LOOKUP_SECONDS = Histogram(
+    "cache_lookup_duration_seconds", "Длительность чтения кэша", ["kind"],
+    buckets=FAST_BUCKETS,
+)
+
+EVENTS_CONSUMED = Counter(
+    "queue_messages_total", "Обработанные сообщения очередей", ["queue", "outcome"]
+)
+EVENT_HANDLE_SECONDS = Histogram(
+    "queue_handle_duration_seconds", "Длительность обработки сообщения (пачки)", ["queue"],
+    buckets=SLOW_BUCKETS,
+)
+EVENTS_IN_FLIGHT = Gauge(
+    "queue_messages_in_flight", "Сообщения в обработке", ["queue"],
+    multiprocess_mode="livesum",
+)
+
+
+def record_cache_lookup(kind: str, hit: bool, started: float) -> None:
+    """Учесть чтение кэша; started - значение time.perf_counter() до чтения"""
+    CACHE_LOOKUP_SECONDS.labels(kind).observe(time.perf_counter() - started)
+    CACHE_LOOKUPS.labels(kind, "hit" if hit else "miss").inc()
+
+
+class track_consume:
+    """Контекстный менеджер вокруг обработки сообщения (или пачки) очереди"""
+
+    def __init__(self, queue: str, messages: int = 1):
+        self.queue = queue
+        self.messages = messages
+
+    def __enter__(self) -> "track_consume":
+        self.started = time.perf_counter()
+        EVENTS_IN_FLIGHT.labels(self.queue).inc(self.messages)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        EVENTS_IN_FLIGHT.labels(self.queue).dec(self.messages)
+        EVENT_HANDLE_SECONDS.labels(self.queue).observe(time.perf_counter() - self.started)
+        outcome = "error" if exc_type is not None else "success"
+        EVENTS_CONSUMED.labels(self.queue, outcome).inc(self.messages)
+
+
+def route_template(scope: Scope) -> str:
+    """Шаблон пути обработчика (/users/{user_id}), а не сам путь - чтобы не плодить метки"""
+    route_handler = scope.get("route_handler")
+    paths = getattr(route_handler, "paths", None) or ()
+    if len(paths) == 1:
+        # пути обработчика заданы относительно контроллера и роутеров
+        prefixes = [layer.path for layer in route_handler.ownership_layers[:-1]]
+        return join_paths([*prefixes, next(iter(paths))])
+
+    # обработчик на нескольких путях: подставляем имена параметров в путь
+    values = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    return "/".join(
+        f"{{{values[part]}}}" if part in values else part
+        for part in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware(AbstractMiddleware):
+    """Счетчик и гистограмма длительности HTTP-запросов по маршрутам"""
+
+    scopes = {"http"}
+    exclude = [METRICS_PATH]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # ответ на исключение отправит обработчик исключений снаружи
+            status["code"] = getattr(e, "status_code", 500)
+            raise
+        finally:
+            HTTP_IN_PROGRESS.labels(method).dec()
+            route = route_template(scope)
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, status["code"]).inc()
+
+
+def _registry() -> CollectorRegistry:
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+@get(METRICS_PATH, include_in_schema=False, sync_to_thread=False)
+def metrics_handler() -> Response:
+    # заголовок целиком: иначе Litestar допишет к нему второй charset
+    return Response(generate_latest(_registry()), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def start_metrics_server(port: Optional[int] = None) -> None:
+    """HTTP-сервер метрик для процессов без Litestar (потребители очередей)"""
+    try:
+        start_http_server(port or METRICS_PORT)
+        print(f"[Metrics] Serving on :{port or METRICS_PORT}")
+    except OSError as e:
+        print(f"[Metrics] Metrics server not started: {e}")
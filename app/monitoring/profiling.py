@@ -0,0 +1,184 @@
+"""Профилирование отдельных HTTP-запросов по заголовку или выборке.
+
+Выключено по умолчанию: при PROFILING_ENABLED=0 middleware вообще не
+подключается к приложению. Когда включено, профилируется запрос с
+заголовком X-Profile, значение которого совпадает с PROFILING_TOKEN, или
+случайная доля PROFILING_SAMPLE_RATE запросов. Без PROFILING_TOKEN
+заголовок игнорируется: иначе любой клиент мог бы профилировать запросы
+и заполнять диск профилями.
+
+Для запроса сохраняются в PROFILING_DIR:
+- профиль pyinstrument (.html) или, если pyinstrument не установлен,
+  cProfile (.prof, открывается snakeviz/pstats);
+- <id>.json: маршрут, статус, длительность и выполненный SQL с временем
+  каждого запроса (см. app.db.instrumentation.capture_queries).
+В ответ добавляются X-Profile-Id, X-Query-Count и X-Query-Time-Ms.
+
+Профилировщик один на процесс: пока профилируется один запрос, остальные
+выполняются без профиля. cProfile в асинхронном коде видит и чужие
+корутины, выполнявшиеся в это время; pyinstrument (async_mode) - нет.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from litestar.middleware import AbstractMiddleware
+from litestar.types import Message, Receive, Scope, Send
+
+from app.db.instrumentation import capture_queries
+from app.monitoring.metrics import METRICS_PATH, route_template
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # pragma: no cover - зависит от окружения
+    PyinstrumentProfiler = None
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "x-profile").lower()
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "./profiles")
+# auto | pyinstrument | cprofile
+PROFILER = os.getenv("PROFILER", "auto")
+
+
+class _CProfileRunner:
+    extension = ".prof"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path: str) -> str:
+        self.profile.dump_stats(path)
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(25)
+        return stream.getvalue()
+
+
+class _PyinstrumentRunner:
+    extension = ".html"
+
+    def __init__(self):
+        self.profiler = PyinstrumentProfiler(async_mode="enabled")
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def save(self, path: str) -> str:
+        with open(path, "w") as f:
+            f.write(self.profiler.output_html())
+        return self.profiler.output_text()
+
+
+def make_profiler(kind: str = PROFILER):
+    if kind == "pyinstrument" or (kind == "auto" and PyinstrumentProfiler is not None):
+        if PyinstrumentProfiler is None:
+            raise RuntimeError("pyinstrument is not installed")
+        return _PyinstrumentRunner()
+    return _CProfileRunner()
+
+
+class ProfilingMiddleware(AbstractMiddleware):
+    """Профиль и список SQL для запросов, выбранных заголовком или выборкой"""
+
+    scopes = {"http"}
+    exclude = [METRICS_PATH]
+
+    # параметры задаются атрибутами класса (как scopes/exclude), для тестов - подклассом
+    header = PROFILING_HEADER
+    token = PROFILING_TOKEN
+    sample_rate = PROFILING_SAMPLE_RATE
+    output_dir = PROFILING_DIR
+    profiler = PROFILER
+
+    _active = False
+
+    def should_profile(self, scope: Scope) -> bool:
+        header = self.header.encode()
+        for name, value in scope["headers"]:
+            if name == header and self.token:
+                return hmac.compare_digest(value, self.token.encode())
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if ProfilingMiddleware._active or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid4().hex[:8]}"
+        status = {"code": 500}
+
+        with capture_queries() as queries:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-profile-id", profile_id.encode()),
+                        (b"x-query-count", str(len(queries)).encode()),
+                        (b"x-query-time-ms", f"{sum(q['ms'] for q in queries):.3f}".encode()),
+                    ]
+                await send(message)
+
+            runner = make_profiler(self.profiler)
+            ProfilingMiddleware._active = True
+            started = time.perf_counter()
+            runner.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                runner.stop()
+                ProfilingMiddleware._active = False
+                duration_ms = (time.perf_counter() - started) * 1000
+                self._save(profile_id, runner, scope, status["code"], duration_ms, list(queries))
+
+    def _save(self, profile_id, runner, scope, status, duration_ms, queries: List[Dict[str, Any]]):
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            profile_path = os.path.join(self.output_dir, profile_id + runner.extension)
+            summary = runner.save(profile_path)
+            report = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status": status,
+                "duration_ms": round(duration_ms, 3),
+                "profile": profile_path,
+                "query_count": len(queries),
+                "query_ms": round(sum(q["ms"] for q in queries), 3),
+                "queries": queries,
+                "summary": summary,
+            }
+            with open(os.path.join(self.output_dir, f"{profile_id}.json"), "w") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(
+                f"[Profiling] {scope['method']} {scope['path']} {duration_ms:.1f} ms, "
+                f"{len(queries)} queries -> {profile_path}"
+            )
+        except Exception as e:
+            print(f"[Profiling] Failed to save profile {profile_id}: {e}")
+
+
+def profiling_middleware() -> List[type]:
+    """Middleware профилирования, если оно включено (для списка middleware приложения)"""
+    return [ProfilingMiddleware] if PROFILING_ENABLED else []
@@ -112,11 +112,6 @@ async def check_system_status():
                 if response.status == 200:
                     products_data = await response.json()
                     print(f"Продуктов: {products_data.get('total', 0)}")
-            
-            async with session.get("http://localhost:8000/api/v1/orders") as response:
-                if response.status == 200:
-                    orders_data = await response.json()
-                    print(f"Заказов: {orders_data.get('total', 0)}")
     
     except Exception as e:
         print(f"Не удалось проверить статус: {e}")
@@ -1,10 +1,12 @@
 from faststream import FastStream, Logger
+from faststream.broker.middlewares import BaseMiddleware
 from faststream.rabbit import RabbitBroker
 import asyncio
 import os
 import json
 import sys
 from pathlib import Path
+from uuid import uuid4
 
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
@@ -16,6 +18,7 @@ from app.models.message_models import (
     OrderStatusUpdateMessage,
     OrderStatus
 )
+from app.monitoring.metrics import start_metrics_server, track_consume
 from app.services.order_processor import OrderProcessor
 from app.services.product_processor import ProductProcessor
 from app.services.inventory_service import InventoryService
@@ -26,7 +29,21 @@ RABBITMQ_USER = os.getenv("RABBITMQ_USER", "guest")
 RABBITMQ_PASS = os.getenv("RABBITMQ_PASS", "guest")
 
 rabbitmq_url = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASS}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/"
-broker = RabbitBroker(rabbitmq_url)
+
+
+class ConsumeMetricsMiddleware(BaseMiddleware):
+    """Метрики обработки сообщения: длительность, число в обработке, ошибки"""
+
+    async def on_receive(self) -> None:
+        self._tracker = track_consume(getattr(self.msg, "routing_key", None) or "unknown")
+        self._tracker.__enter__()
+
+    async def after_processed(self, exc_type=None, exc_val=None, exec_tb=None):
+        self._tracker.__exit__(exc_type, exc_val, exec_tb)
+        return False
+
+
+broker = RabbitBroker(rabbitmq_url, middlewares=[ConsumeMetricsMiddleware])
 app = FastStream(broker)
 
 _order_processor = None
@@ -70,36 +87,48 @@ async def handle_order_queue(
         order_processor = await get_order_processor()
         inventory_service = await get_inventory_service()
         
-        unavailable_items = []
-        for item in order_data.items:
-            is_available = await inventory_service.check_availability(
-                product_id=item.product_id,
-                requested_quantity=item.quantity
-            )
-            if not is_available:
-                unavailable_items.append(str(item.product_id))
-        
-        if unavailable_items:
-            error_msg = f"Products out of stock: {', '.join(unavailable_items)}"
-            logger.error(error_msg)
-            return {
-                "success": False,
-                "error": error_msg,
-                "order_id": str(order_data.order_id) if order_data.order_id else None
-            }
+        items = [(item.product_id, item.quantity) for item in order_data.items]
         
         if order_data.order_id:
+            existing = await order_processor.get_order(order_data.order_id)
+            if not existing:
+                return await order_processor.update_order(order_data)
+            
+            # отмененный заказ резерва не держит
+            held = [
+                (item["product_id"], item["quantity"]) for item in existing["items"]
+            ] if existing["status"] != OrderStatus.CANCELLED.value else []
+            needed = items if order_data.status != OrderStatus.CANCELLED else []
+            
+            reservation = await inventory_service.change_reservation(held, needed, order_data.order_id)
+            if not reservation["success"]:
+                logger.error(f"Products out of stock: {reservation['error']}")
+                return {
+                    "success": False,
+                    "error": reservation["error"],
+                    "order_id": str(order_data.order_id)
+                }
+            
             result = await order_processor.update_order(order_data)
+            if not result["success"]:
+                await inventory_service.change_reservation(needed, held, order_data.order_id)
         else:
-            result = await order_processor.create_order(order_data)
+            # резерв всех позиций одним атомарным скриптом до создания заказа
+            order_id = uuid4()
+            reservation = await inventory_service.reserve_items(items, order_id)
+            if not reservation["success"]:
+                logger.error(f"Products out of stock: {reservation['error']}")
+                return {
+                    "success": False,
+                    "error": reservation["error"],
+                    "order_id": None
+                }
             
-            if result["success"]:
-                for item in order_data.items:
-                    await inventory_service.reserve_product(
-                        product_id=item.product_id,
-                        quantity=item.quantity,
-                        order_id=result["order_id"]
-                    )
+            result = await order_processor.create_order(order_data, order_id=order_id)
+            if not result["success"]:
+                await inventory_service.release_items(
+                    items, reason=f"order_creation_failed_{order_id}"
+                )
         
         logger.info(f"Order processed: {result}")
         return result
@@ -181,6 +210,9 @@ async def handle_order_status_queue(
         status_data = OrderStatusUpdateMessage(**message)
         order_processor = await get_order_processor()
         inventory_service = await get_inventory_service()
+        # резерв уже отмененного заказа второй раз не возвращаем
+        before = await order_processor.get_order(status_data.order_id)
+        was_cancelled = bool(before) and before["status"] == OrderStatus.CANCELLED.value
         
         result = await order_processor.update_order_status(
             order_id=status_data.order_id,
@@ -189,15 +221,12 @@ async def handle_order_status_queue(
             notes=status_data.notes
         )
         
-        if status_data.new_status == OrderStatus.CANCELLED and result["success"]:
-            order_details = await order_processor.get_order(status_data.order_id)
-            if order_details and order_details.get("items"):
-                for item in order_details["items"]:
-                    await inventory_service.update_quantity(
-                        product_id=item["product_id"],
-                        quantity_change=item["quantity"],
-                        reason="order_cancellation"
-                    )
+        if status_data.new_status == OrderStatus.CANCELLED and result["success"] and not was_cancelled:
+            if before.get("items"):
+                await inventory_service.release_items(
+                    [(item["product_id"], item["quantity"]) for item in before["items"]],
+                    reason=f"order_cancellation_{status_data.order_id}"
+                )
         
         logger.info(f"Order status updated: {result}")
         return result
@@ -211,6 +240,11 @@ async def handle_order_status_queue(
         }
 
 
+@app.on_startup
+async def start_metrics():
+    start_metrics_server()
+
+
 @app.after_startup
 async def test_publish():
     from uuid import uuid4
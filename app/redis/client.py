@@ -25,6 +25,12 @@ def get_redis():
             _redis_client = MockRedis()
     return _redis_client
 
+def close_redis():
+    """Закрыть соединения пула; клиент переподключится при следующей команде"""
+    if _redis_client is not None and hasattr(_redis_client, "close"):
+        _redis_client.close()
+        print("[Redis] Connection pool closed")
+
 class MockRedis:
     def __init__(self):
         self._data = {}
@@ -62,4 +68,45 @@ class MockRedis:
     def incr(self, key):
         current = int(self._data.get(key, 0))
         self._data[key] = current + 1
-        return current + 1
\ No newline at end of file
+        return current + 1
+    
+    def incrby(self, key, amount=1):
+        current = int(self._data.get(key, 0))
+        self._data[key] = current + amount
+        return current + amount
+    
+    def expire(self, key, time):
+        return key in self._data
+    
+    def mget(self, keys, *args):
+        keys = list(keys) if isinstance(keys, (list, tuple)) else [keys]
+        return [self._data.get(key) for key in keys + list(args)]
+    
+    def pipeline(self, transaction=True):
+        return MockPipeline(self)
+
+
+class MockPipeline:
+    """Конвейер MockRedis: команды копятся и выполняются в execute()"""
+    
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+    
+    def __getattr__(self, name):
+        method = getattr(self._redis, name)
+        
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+    
+    def execute(self):
+        commands, self._commands = self._commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self._commands = []
@@ -0,0 +1,109 @@
+"""Распределенная блокировка-аренда (lease) в Redis.
+
+Захват - SET key token NX PX ttl: ключ создается, только если его нет, и
+сам истекает через ttl, поэтому упавший владелец не держит блокировку
+вечно. Освобождение и продление выполняются Lua-скриптом, который
+проверяет токен владельца: чужую (перехваченную после истечения)
+блокировку удалить или продлить нельзя.
+
+Если вместо Redis используется MockRedis, блокировки хранятся в памяти
+процесса и защищают только от параллельных задач внутри него.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from app.redis.client import get_redis
+
+LOCK_TTL_SECONDS = int(os.getenv("LOCK_TTL_SECONDS", "600"))
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class _LocalLeaseStore:
+    """Аренды в памяти процесса: ключ -> (токен, момент истечения)"""
+
+    def __init__(self):
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._mutex = threading.Lock()
+
+    def _owner(self, key: str) -> Optional[str]:
+        lease = self._leases.get(key)
+        if lease is None or lease[1] <= time.monotonic():
+            self._leases.pop(key, None)
+            return None
+        return lease[0]
+
+    def acquire(self, key: str, token: str, ttl_ms: int) -> bool:
+        with self._mutex:
+            if self._owner(key) is not None:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl_ms / 1000)
+            return True
+
+    def release(self, key: str, token: str) -> bool:
+        with self._mutex:
+            if self._owner(key) != token:
+                return False
+            del self._leases[key]
+            return True
+
+    def extend(self, key: str, token: str, ttl_ms: int) -> bool:
+        with self._mutex:
+            if self._owner(key) != token:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl_ms / 1000)
+            return True
+
+
+_local_leases = _LocalLeaseStore()
+
+
+class LeaseLock:
+    """Блокировка name на ttl секунд с продлением владельцем"""
+
+    def __init__(self, name: str, ttl: int = LOCK_TTL_SECONDS, redis=None):
+        self.key = f"lock:{name}"
+        self.ttl_ms = ttl * 1000
+        self.token = uuid.uuid4().hex
+        self.redis = redis if redis is not None else get_redis()
+        # MockRedis не умеет NX/PX и Lua - используем аренды в памяти
+        self._local = not hasattr(self.redis, "register_script")
+        if not self._local:
+            self._release_script = self.redis.register_script(RELEASE_SCRIPT)
+            self._extend_script = self.redis.register_script(EXTEND_SCRIPT)
+
+    @property
+    def ttl(self) -> float:
+        return self.ttl_ms / 1000
+
+    def acquire(self) -> bool:
+        if self._local:
+            return _local_leases.acquire(self.key, self.token, self.ttl_ms)
+        return bool(self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    def release(self) -> bool:
+        if self._local:
+            return _local_leases.release(self.key, self.token)
+        return bool(self._release_script(keys=[self.key], args=[self.token]))
+
+    def extend(self) -> bool:
+        """Продлить аренду на полный ttl; False - блокировка уже не наша"""
+        if self._local:
+            return _local_leases.extend(self.key, self.token, self.ttl_ms)
+        return bool(self._extend_script(keys=[self.key], args=[self.token, self.ttl_ms]))
@@ -0,0 +1,45 @@
+"""Хранилище результатов taskiq в Redis.
+
+Результат задачи сериализуется в JSON и живет ttl секунд, после чего
+удаляется самим Redis. Работает и с MockRedis (результаты в памяти).
+"""
+
+from typing import Any, Optional
+
+from taskiq.abc.result_backend import AsyncResultBackend
+from taskiq.exceptions import ResultGetError
+from taskiq.result import TaskiqResult
+
+from app.redis.client import get_redis
+
+
+class RedisResultBackend(AsyncResultBackend[Any]):
+    def __init__(self, ttl: int = 3600, prefix: str = "taskiq:result", redis=None):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = redis
+
+    @property
+    def redis(self):
+        # клиент берется лениво, чтобы импорт модуля задач не ходил в Redis
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.prefix}:{task_id}"
+
+    async def set_result(self, task_id: str, result: TaskiqResult[Any]) -> None:
+        self.redis.setex(self._key(task_id), self.ttl, result.model_dump_json())
+
+    async def is_result_ready(self, task_id: str) -> bool:
+        return bool(self.redis.exists(self._key(task_id)))
+
+    async def get_result(self, task_id: str, with_logs: bool = False) -> TaskiqResult[Any]:
+        raw: Optional[str] = self.redis.get(self._key(task_id))
+        if raw is None:
+            raise ResultGetError()
+        result = TaskiqResult.model_validate_json(raw)
+        if not with_logs:
+            result.log = None
+        return result
@@ -0,0 +1,331 @@
+"""Остатки товаров в Redis с атомарными изменениями через Lua-скрипты.
+
+Остаток продукта - целое в ключе stock:<product_id>. Любое изменение
+выполняется одним скриптом, поэтому проверка и списание атомарны для всех
+воркеров и потребителей:
+
+- RESERVE_SCRIPT списывает несколько позиций по принципу "все или
+  ничего": сначала проверяет остатки всех позиций, затем уменьшает их;
+- ADJUST_SCRIPT меняет остаток одной позиции на знаковую величину
+  (пополнение, возврат, ручная корректировка), не уводя его в минус.
+
+Тем же скриптом каждое изменение дописывается в список stock:log (запись
+журнала инвентаря с id, старым и новым остатком). Журнал переносится в БД
+асинхронно (app.services.inventory_sync): DRAIN_SCRIPT перекладывает
+пачку записей в stock:log:processing, а после коммита в БД пачка
+удаляется (ack_log). Если синхронизатор упал до ack, та же пачка
+обрабатывается повторно - записи идемпотентны по id. Записи, которые БД
+не принимает (ошибка в данных, а не сбой соединения), откладываются в
+stock:log:dead и не блокируют журнал.
+
+Ключа остатка нет - скрипт ничего не меняет и сообщает об этом, а
+InventoryService загружает остаток из БД (seed, SET NX) и повторяет
+операцию. Скрипты работают с несколькими ключами, поэтому рассчитаны на
+один узел Redis (не кластер) без вытеснения ключей (noeviction).
+
+Если вместо Redis используется MockRedis, остатки и журнал хранятся в
+памяти процесса под мьютексом с той же семантикой.
+"""
+
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from app.redis.client import get_redis
+
+STOCK_LOG_KEY = os.getenv("STOCK_LOG_KEY", "stock:log")
+STOCK_LOG_PROCESSING_KEY = STOCK_LOG_KEY + ":processing"
+STOCK_LOG_DEAD_KEY = STOCK_LOG_KEY + ":dead"
+
+# KEYS: остатки позиций..., журнал; ARGV: причина, время, затем тройки
+# (product_id, количество, id записи журнала) для каждой позиции
+RESERVE_SCRIPT = """
+local log = KEYS[#KEYS]
+local current = {}
+for i = 1, #KEYS - 1 do
+    local value = redis.call('get', KEYS[i])
+    if not value then
+        return {-1, i}
+    end
+    value = tonumber(value)
+    if value < tonumber(ARGV[3 * i + 1]) then
+        return {0, i, value}
+    end
+    current[i] = value
+end
+local result = {1}
+for i = 1, #KEYS - 1 do
+    local quantity = tonumber(ARGV[3 * i + 1])
+    local new = redis.call('decrby', KEYS[i], quantity)
+    redis.call('rpush', log, cjson.encode({
+        id = ARGV[3 * i + 2], product_id = ARGV[3 * i],
+        old_quantity = current[i], new_quantity = new,
+        quantity_change = -quantity, reason = ARGV[1], created_at = ARGV[2]
+    }))
+    result[#result + 1] = new
+end
+return result
+"""
+
+# KEYS: остаток, журнал; ARGV: product_id, изменение, id записи, причина, время
+ADJUST_SCRIPT = """
+local value = redis.call('get', KEYS[1])
+if not value then
+    return {-1}
+end
+value = tonumber(value)
+local change = tonumber(ARGV[2])
+if value + change < 0 then
+    return {0, value}
+end
+local new = redis.call('incrby', KEYS[1], change)
+redis.call('rpush', KEYS[2], cjson.encode({
+    id = ARGV[3], product_id = ARGV[1],
+    old_quantity = value, new_quantity = new,
+    quantity_change = change, reason = ARGV[4], created_at = ARGV[5]
+}))
+return {1, value, new}
+"""
+
+# KEYS: журнал, пачка в обработке; ARGV: размер пачки.
+# Необработанная (не подтвержденная) пачка возвращается повторно.
+DRAIN_SCRIPT = """
+if redis.call('llen', KEYS[2]) > 0 then
+    return redis.call('lrange', KEYS[2], 0, -1)
+end
+local items = redis.call('lrange', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call('rpush', KEYS[2], unpack(items))
+    redis.call('ltrim', KEYS[1], #items, -1)
+end
+return items
+"""
+
+
+def stock_key(product_id) -> str:
+    return f"stock:{product_id}"
+
+
+@dataclass
+class StockResult:
+    """Результат изменения остатков.
+
+    status: ok - изменено; insufficient - не хватает product_id (есть
+    available); missing - остаток product_id еще не загружен в Redis.
+    """
+
+    status: str
+    product_id: Optional[UUID] = None
+    available: Optional[int] = None
+    old_quantities: Dict[UUID, int] = field(default_factory=dict)
+    quantities: Dict[UUID, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def _log_entry(product_id, old, new, change, entry_id, reason, created_at) -> str:
+    return json.dumps({
+        "id": entry_id,
+        "product_id": str(product_id),
+        "old_quantity": old,
+        "new_quantity": new,
+        "quantity_change": change,
+        "reason": reason,
+        "created_at": created_at,
+    })
+
+
+class _LocalStockStore:
+    """Остатки и журнал в памяти процесса (вместо скриптов для MockRedis)"""
+
+    def __init__(self):
+        self.stock: Dict[str, int] = {}
+        self.log: List[str] = []
+        self.processing: List[str] = []
+        self.dead: List[str] = []
+        self._mutex = threading.Lock()
+
+    def seed(self, key: str, quantity: int) -> bool:
+        with self._mutex:
+            if key in self.stock:
+                return False
+            self.stock[key] = quantity
+            return True
+
+    def reserve(self, keys, items, entry_ids, reason, created_at) -> list:
+        with self._mutex:
+            for index, (key, (_, quantity)) in enumerate(zip(keys, items), 1):
+                if key not in self.stock:
+                    return [-1, index]
+                if self.stock[key] < quantity:
+                    return [0, index, self.stock[key]]
+            result = [1]
+            for key, (product_id, quantity), entry_id in zip(keys, items, entry_ids):
+                old = self.stock[key]
+                self.stock[key] = old - quantity
+                self.log.append(_log_entry(
+                    product_id, old, old - quantity, -quantity, entry_id, reason, created_at
+                ))
+                result.append(old - quantity)
+            return result
+
+    def adjust(self, key, product_id, change, entry_id, reason, created_at) -> list:
+        with self._mutex:
+            if key not in self.stock:
+                return [-1]
+            old = self.stock[key]
+            if old + change < 0:
+                return [0, old]
+            self.stock[key] = old + change
+            self.log.append(_log_entry(
+                product_id, old, old + change, change, entry_id, reason, created_at
+            ))
+            return [1, old, old + change]
+
+    def drain(self, limit: int) -> List[str]:
+        with self._mutex:
+            if not self.processing:
+                self.processing, self.log = self.log[:limit], self.log[limit:]
+            return list(self.processing)
+
+    def ack(self) -> None:
+        with self._mutex:
+            self.processing = []
+
+
+_local_stock = _LocalStockStore()
+
+
+class StockStore:
+    """Общие для всех процессов остатки товаров"""
+
+    def __init__(self, redis=None):
+        self.redis = redis if redis is not None else get_redis()
+        # MockRedis не умеет Lua - используем остатки в памяти
+        self._local = not hasattr(self.redis, "register_script")
+        if not self._local:
+            self._reserve_script = self.redis.register_script(RESERVE_SCRIPT)
+            self._adjust_script = self.redis.register_script(ADJUST_SCRIPT)
+            self._drain_script = self.redis.register_script(DRAIN_SCRIPT)
+
+    def get(self, product_id: UUID) -> Optional[int]:
+        if self._local:
+            return _local_stock.stock.get(stock_key(product_id))
+        value = self.redis.get(stock_key(product_id))
+        return int(value) if value is not None else None
+
+    def get_many(self, product_ids: List[UUID]) -> Dict[UUID, Optional[int]]:
+        if self._local:
+            return {pid: _local_stock.stock.get(stock_key(pid)) for pid in product_ids}
+        values = self.redis.mget([stock_key(pid) for pid in product_ids])
+        return {
+            pid: int(value) if value is not None else None
+            for pid, value in zip(product_ids, values)
+        }
+
+    def seed(self, product_id: UUID, quantity: int) -> bool:
+        """Загрузить остаток, если его еще нет (параллельная загрузка не перезапишет)"""
+        if self._local:
+            return _local_stock.seed(stock_key(product_id), quantity)
+        return bool(self.redis.set(stock_key(product_id), quantity, nx=True))
+
+    def reserve(self, items: Dict[UUID, int], reason: str) -> StockResult:
+        """Списать все позиции {product_id: количество} или ни одной"""
+        ordered = list(items.items())
+        keys = [stock_key(product_id) for product_id, _ in ordered]
+        entry_ids = [str(uuid.uuid4()) for _ in ordered]
+        created_at = datetime.now().isoformat()
+
+        if self._local:
+            raw = _local_stock.reserve(keys, ordered, entry_ids, reason, created_at)
+        else:
+            args = [reason, created_at]
+            for (product_id, quantity), entry_id in zip(ordered, entry_ids):
+                args += [str(product_id), quantity, entry_id]
+            raw = self._reserve_script(keys=keys + [STOCK_LOG_KEY], args=args)
+
+        if raw[0] == -1:
+            return StockResult("missing", product_id=ordered[raw[1] - 1][0])
+        if raw[0] == 0:
+            return StockResult(
+                "insufficient", product_id=ordered[raw[1] - 1][0], available=int(raw[2])
+            )
+        return StockResult(
+            "ok",
+            old_quantities={pid: int(new) + qty for (pid, qty), new in zip(ordered, raw[1:])},
+            quantities={pid: int(new) for (pid, _), new in zip(ordered, raw[1:])},
+        )
+
+    def adjust(self, product_id: UUID, change: int, reason: str) -> StockResult:
+        """Изменить остаток на change (может быть отрицательным, но не ниже нуля)"""
+        key = stock_key(product_id)
+        entry_id = str(uuid.uuid4())
+        created_at = datetime.now().isoformat()
+
+        if self._local:
+            raw = _local_stock.adjust(key, product_id, change, entry_id, reason, created_at)
+        else:
+            raw = self._adjust_script(
+                keys=[key, STOCK_LOG_KEY],
+                args=[str(product_id), change, entry_id, reason, created_at],
+            )
+
+        if raw[0] == -1:
+            return StockResult("missing", product_id=product_id)
+        if raw[0] == 0:
+            return StockResult("insufficient", product_id=product_id, available=int(raw[1]))
+        return StockResult(
+            "ok",
+            old_quantities={product_id: int(raw[1])},
+            quantities={product_id: int(raw[2])},
+        )
+
+    def drain_log(self, limit: int) -> List[dict]:
+        """Пачка записей журнала для переноса в БД (до ack_log выдается повторно)"""
+        if self._local:
+            raw = _local_stock.drain(limit)
+        else:
+            raw = self._drain_script(
+                keys=[STOCK_LOG_KEY, STOCK_LOG_PROCESSING_KEY], args=[limit]
+            )
+        return [json.loads(item) for item in raw]
+
+    def ack_log(self) -> None:
+        """Пачка из drain_log сохранена в БД"""
+        if self._local:
+            _local_stock.ack()
+        else:
+            self.redis.delete(STOCK_LOG_PROCESSING_KEY)
+
+    def dead_letter(self, entry: dict, error: str) -> None:
+        """Отложить запись журнала, которую не удалось сохранить в БД"""
+        item = json.dumps({"entry": entry, "error": error, "failed_at": datetime.now().isoformat()})
+        if self._local:
+            with _local_stock._mutex:
+                _local_stock.dead.append(item)
+        else:
+            self.redis.rpush(STOCK_LOG_DEAD_KEY, item)
+
+    def dead_letters(self, limit: int = 100) -> List[dict]:
+        if self._local:
+            raw = _local_stock.dead[:limit]
+        else:
+            raw = self.redis.lrange(STOCK_LOG_DEAD_KEY, 0, limit - 1)
+        return [json.loads(item) for item in raw]
+
+    def dead_letter_length(self) -> int:
+        if self._local:
+            return len(_local_stock.dead)
+        return self.redis.llen(STOCK_LOG_DEAD_KEY)
+
+    def log_length(self) -> int:
+        if self._local:
+            return len(_local_stock.log) + len(_local_stock.processing)
+        return self.redis.llen(STOCK_LOG_KEY) + self.redis.llen(STOCK_LOG_PROCESSING_KEY)
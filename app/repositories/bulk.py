@@ -0,0 +1,82 @@
+"""Массовая вставка строк: INSERT с executemany пачками или COPY в PostgreSQL"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Type
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.returning import as_values
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _chunks(rows: Iterable[Any], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(as_values(row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _with_defaults(table, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Заполнение Python-значений по умолчанию (для COPY их никто не вычислит)"""
+    filled = dict(row)
+    for column in table.columns:
+        if column.key in filled or column.default is None:
+            continue
+        default = column.default
+        filled[column.key] = default.arg(None) if default.is_callable else default.arg
+    return filled
+
+
+async def _copy_chunk(session: AsyncSession, table, rows: List[Dict[str, Any]]):
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    columns = [column.key for column in table.columns]
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(row.get(name) for name in columns) for row in rows],
+        columns=columns,
+        schema_name=table.schema,
+    )
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: Type[Any],
+    rows: Iterable[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    returning: bool = False,
+    use_copy: bool = False,
+) -> List[UUID]:
+    """Вставка строк пачками по chunk_size.
+
+    rows - dict или Pydantic-модели с полями модели. Значения по умолчанию
+    (id, created_at) вычисляются как при обычном INSERT. При returning=True
+    возвращаются id вставленных строк в порядке rows. use_copy включает
+    COPY для PostgreSQL с драйвером asyncpg; для других СУБД игнорируется.
+    """
+    table = model.__table__
+    bind = session.get_bind()
+    copy_supported = use_copy and bind.dialect.driver == "asyncpg"
+
+    ids: List[UUID] = []
+    for chunk in _chunks(rows, chunk_size):
+        if copy_supported:
+            chunk = [_with_defaults(table, row) for row in chunk]
+            await _copy_chunk(session, table, chunk)
+            if returning:
+                ids.extend(row["id"] for row in chunk)
+        elif returning:
+            result = await session.execute(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                chunk,
+            )
+            ids.extend(result.scalars().all())
+        else:
+            await session.execute(insert(model), chunk)
+    return ids
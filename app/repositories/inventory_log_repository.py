@@ -1,8 +1,10 @@
-from typing import Optional, List
+from typing import Optional, List, Set
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.database_models import InventoryLog
+from app.repositories.bulk import bulk_insert
+from app.repositories.pagination import apply_keyset
 
 
 class InventoryLogRepository:
@@ -13,20 +15,39 @@ class InventoryLogRepository:
         await session.flush()
         return log
     
+    async def bulk_create(
+        self, session: AsyncSession, logs_data: List[dict], returning: bool = False, **kwargs
+    ) -> List[UUID]:
+        """Массовое создание логов инвентаря пачками (executemany или COPY)"""
+        return await bulk_insert(session, InventoryLog, logs_data, returning=returning, **kwargs)
+    
+    async def get_existing_ids(self, session: AsyncSession, log_ids: List[UUID]) -> Set[UUID]:
+        """ID из списка, которые уже сохранены (для идемпотентной записи журнала)"""
+        if not log_ids:
+            return set()
+        result = await session.execute(
+            select(InventoryLog.id).where(InventoryLog.id.in_(log_ids))
+        )
+        return set(result.scalars().all())
+    
     async def get_all(
         self, 
         session: AsyncSession,
         product_id: Optional[UUID] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[InventoryLog]:
-        """Получение всех логов с фильтрами"""
+        """Получение всех логов с фильтрами (offset или курсор)"""
         query = select(InventoryLog)
         
         if product_id:
             query = query.where(InventoryLog.product_id == product_id)
         
-        query = query.limit(limit).offset(offset).order_by(InventoryLog.created_at.desc())
+        query = apply_keyset(query, InventoryLog, cursor)
+        if not cursor:
+            query = query.offset(offset)
+        query = query.limit(limit)
         
         result = await session.execute(query)
         return result.scalars().all()
\ No newline at end of file
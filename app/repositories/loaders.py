@@ -0,0 +1,60 @@
+"""Профили загрузки связей для запросов репозиториев.
+
+Эндпоинт выбирает профиль по имени, репозиторий добавляет к запросу
+соответствующие опции: коллекции грузятся selectinload (один IN-запрос на
+связь), ссылки многие-к-одному - joinedload в том же запросе. Остальные
+связи в профиле закрыты raiseload: обращение к незагруженной связи сразу
+падает, а не превращается в запрос на каждую строку (в async-сессии
+ленивая загрузка все равно невозможна).
+"""
+
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from app.models.database_models import DailyOrderReport, Order, User
+
+
+class UnknownLoadProfileError(ValueError):
+    pass
+
+
+LOAD_PROFILES: Dict[type, Dict[str, Tuple]] = {
+    User: {
+        "addresses": (selectinload(User.addresses),),
+        "orders": (selectinload(User.orders),),
+        "details": (selectinload(User.addresses), selectinload(User.orders)),
+    },
+    Order: {
+        "summary": (joinedload(Order.product), joinedload(Order.address)),
+        "details": (
+            joinedload(Order.user),
+            joinedload(Order.product),
+            joinedload(Order.address),
+            selectinload(Order.daily_reports),
+        ),
+    },
+    DailyOrderReport: {
+        "order": (joinedload(DailyOrderReport.order).joinedload(Order.product),),
+    },
+}
+
+
+def load_options(model: type, profile: Optional[str]) -> Tuple:
+    """Опции загрузки для профиля; без профиля связи не загружаются"""
+    if not profile:
+        return ()
+    try:
+        options = LOAD_PROFILES[model][profile]
+    except KeyError:
+        available = ", ".join(sorted(LOAD_PROFILES.get(model, {})))
+        raise UnknownLoadProfileError(
+            f"Unknown load profile {profile!r} for {model.__name__} (available: {available})"
+        )
+    return options + (raiseload("*"),)
+
+
+def apply_load(query: Select, model: type, profile: Optional[str]) -> Select:
+    options = load_options(model, profile)
+    return query.options(*options) if options else query
@@ -1,34 +1,68 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import func, select
 from app.models.database_models import Order, OrderItem
+from app.repositories.bulk import bulk_insert
+from app.repositories.loaders import apply_load
+from app.repositories.pagination import apply_keyset
+from app.repositories.returning import as_values, delete_returning, update_returning
 
 
 class OrderRepository:
     async def create(self, session: AsyncSession, order_data: dict):
         """Создание нового заказа"""
-        order = Order(**order_data)
+        order = Order(**as_values(order_data))
         session.add(order)
         await session.flush()
         return order
     
-    async def get_by_id(self, session: AsyncSession, order_id: UUID) -> Optional[Order]:
-        """Получение заказа по ID"""
+    async def get_by_id(
+        self, session: AsyncSession, order_id: UUID, load: Optional[str] = None
+    ) -> Optional[Order]:
+        """Получение заказа по ID (load - профиль загрузки связей)"""
         result = await session.execute(
-            select(Order).where(Order.id == order_id)
+            apply_load(select(Order).where(Order.id == order_id), Order, load)
         )
         return result.scalar_one_or_none()
     
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        load: Optional[str] = None,
+        **kwargs
+    ) -> List[Order]:
+        """Получение заказов с фильтрами (offset или курсор)"""
+        query = select(Order)
+        if "user_id" in kwargs:
+            query = query.where(Order.user_id == kwargs["user_id"])
+        if "product_id" in kwargs:
+            query = query.where(Order.product_id == kwargs["product_id"])
+        if "status" in kwargs:
+            query = query.where(Order.status == kwargs["status"])
+
+        query = apply_keyset(query, Order, cursor)
+        if not cursor:
+            query = query.offset((page - 1) * count)
+        query = apply_load(query.limit(count), Order, load)
+
+        result = await session.execute(query)
+        return list(result.scalars().all())
+    
     async def update(self, session: AsyncSession, order_id: UUID, update_data: dict) -> Optional[Order]:
-        """Обновление заказа"""
-        await session.execute(
-            update(Order)
-            .where(Order.id == order_id)
-            .values(**update_data)
-        )
-        await session.flush()
-        return await self.get_by_id(session, order_id)
+        """Обновление заказа (UPDATE ... RETURNING)"""
+        values = as_values(update_data)
+        if not values:
+            return await self.get_by_id(session, order_id)
+        return await update_returning(session, Order, order_id, values)
+    
+    async def delete(self, session: AsyncSession, order_id: UUID) -> bool:
+        """Удаление заказа (DELETE ... RETURNING)"""
+        return await delete_returning(session, Order, order_id)
     
     async def get_order_items(self, session: AsyncSession, order_id: UUID) -> List[OrderItem]:
         """Получение позиций заказа"""
@@ -37,9 +71,45 @@ class OrderRepository:
         )
         return result.scalars().all()
     
-    async def create_items(self, session: AsyncSession, items_data: List[dict]):
-        """Создание позиций заказа"""
-        for item_data in items_data:
-            item = OrderItem(**item_data)
-            session.add(item)
-        await session.flush()
\ No newline at end of file
+    async def bulk_create(
+        self, session: AsyncSession, orders_data: List[dict], returning: bool = False, **kwargs
+    ) -> List[UUID]:
+        """Массовое создание заказов пачками (executemany или COPY)"""
+        return await bulk_insert(session, Order, orders_data, returning=returning, **kwargs)
+    
+    async def create_items(self, session: AsyncSession, items_data: List[dict]) -> List[UUID]:
+        """Создание позиций заказа одним INSERT на пачку"""
+        return await bulk_insert(session, OrderItem, items_data, returning=True)
+    
+    async def get_top_products(
+        self, session: AsyncSession, limit: int, since: Optional[datetime] = None
+    ) -> List[Tuple[UUID, int]]:
+        """Самые заказываемые продукты: (product_id, число заказов) по убыванию"""
+        orders = func.count(Order.id).label("orders")
+        query = select(Order.product_id, orders).group_by(Order.product_id)
+        if since is not None:
+            query = query.where(Order.created_at >= since)
+        result = await session.execute(query.order_by(orders.desc()).limit(limit))
+        return [(product_id, count) for product_id, count in result.all()]
+    
+    async def get_recent_user_ids(
+        self, session: AsyncSession, since: datetime, limit: int
+    ) -> List[UUID]:
+        """Пользователи с заказами после since, начиная с недавних"""
+        last_order = func.max(Order.created_at)
+        result = await session.execute(
+            select(Order.user_id)
+            .where(Order.created_at >= since)
+            .group_by(Order.user_id)
+            .order_by(last_order.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def count_since(self, session: AsyncSession, since: Optional[datetime] = None) -> int:
+        """Количество заказов (с момента since)"""
+        query = select(func.count(Order.id))
+        if since is not None:
+            query = query.where(Order.created_at >= since)
+        result = await session.execute(query)
+        return result.scalar_one()
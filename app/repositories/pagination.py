@@ -0,0 +1,54 @@
+"""Keyset-пагинация по (created_at, id) с непрозрачными курсорами"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Курсор поврежден или получен не от этого API"""
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Упаковка позиции (created_at, id) в строку для клиента"""
+    payload = json.dumps([created_at.isoformat(), str(item_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Распаковка курсора в (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def apply_keyset(query: Select, model: Any, cursor: Optional[str]) -> Select:
+    """Сортировка по (created_at, id) по убыванию и отсечение по курсору.
+
+    Вместо OFFSET используется условие по составному индексу, поэтому
+    стоимость страницы не зависит от ее номера.
+    """
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < item_id),
+            )
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def next_cursor(items: Sequence[Any], limit: int) -> Optional[str]:
+    """Курсор следующей страницы или None, если страница неполная"""
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,18 +1,28 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Dict, Optional, List
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, update
 from app.models.database_models import Product
+from app.repositories.bulk import bulk_insert
+from app.repositories.pagination import apply_keyset
+from app.repositories.returning import as_values, delete_returning, update_returning
 
 
 class ProductRepository:
     async def create(self, session: AsyncSession, product_data: dict):
         """Создание нового продукта"""
-        product = Product(**product_data)
+        product = Product(**as_values(product_data))
         session.add(product)
         await session.flush()
         return product
     
+    async def bulk_create(
+        self, session: AsyncSession, products_data: List[dict], returning: bool = False, **kwargs
+    ) -> List[UUID]:
+        """Массовое создание продуктов пачками (executemany или COPY)"""
+        return await bulk_insert(session, Product, products_data, returning=returning, **kwargs)
+    
     async def get_by_id(self, session: AsyncSession, product_id: UUID) -> Optional[Product]:
         """Получение продукта по ID"""
         result = await session.execute(
@@ -20,34 +30,57 @@ class ProductRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_by_ids(self, session: AsyncSession, product_ids: List[UUID]) -> List[Product]:
+        """Получение продуктов по списку ID одним запросом"""
+        if not product_ids:
+            return []
+        result = await session.execute(
+            select(Product).where(Product.id.in_(product_ids))
+        )
+        return list(result.scalars().all())
+    
     async def update(self, session: AsyncSession, product_id: UUID, update_data: dict) -> Optional[Product]:
-        """Обновление продукта"""
+        """Обновление продукта (UPDATE ... RETURNING)"""
+        values = as_values(update_data)
+        if not values:
+            return await self.get_by_id(session, product_id)
+        return await update_returning(session, Product, product_id, values)
+    
+    async def set_quantities(self, session: AsyncSession, quantities: Dict[UUID, int]) -> None:
+        """Записать остатки {product_id: quantity} одним UPDATE по первичному ключу (executemany)"""
+        if not quantities:
+            return
+        now = datetime.now()
         await session.execute(
-            update(Product)
-            .where(Product.id == product_id)
-            .values(**update_data)
+            update(Product),
+            [
+                {"id": product_id, "quantity": quantity, "updated_at": now}
+                for product_id, quantity in quantities.items()
+            ],
         )
-        await session.flush()
-        return await self.get_by_id(session, product_id)
+    
+    async def delete(self, session: AsyncSession, product_id: UUID) -> bool:
+        """Удаление продукта (DELETE ... RETURNING)"""
+        return await delete_returning(session, Product, product_id)
     
     async def get_all(
         self, 
         session: AsyncSession,
-        category: Optional[str] = None,
         available_only: bool = False,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Product]:
-        """Получение всех продуктов с фильтрами"""
+        """Получение всех продуктов с фильтрами (offset или курсор)"""
         query = select(Product)
         
-        if category:
-            query = query.where(Product.category == category)
-        
         if available_only:
-            query = query.where(and_(Product.is_available == True, Product.quantity > 0))
+            query = query.where(Product.quantity > 0)
         
-        query = query.limit(limit).offset(offset)
+        query = apply_keyset(query, Product, cursor)
+        if not cursor:
+            query = query.offset(offset)
+        query = query.limit(limit)
         
         result = await session.execute(query)
         return result.scalars().all()
@@ -1,9 +1,12 @@
-from datetime import date
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, delete
 from app.models.database_models import DailyOrderReport, Order
+from app.db.session import use_primary
+from app.repositories.bulk import bulk_insert
+from app.repositories.loaders import apply_load
 
 class ReportRepository:
     
@@ -24,14 +27,30 @@ class ReportRepository:
         await session.refresh(report)
         return report
     
+    @staticmethod
+    async def bulk_create(
+        session: AsyncSession,
+        reports_data: List[dict],
+        returning: bool = False,
+        **kwargs
+    ) -> List[UUID]:
+        """Массовое создание отчетов пачками; commit - на вызывающем"""
+        return await bulk_insert(
+            session, DailyOrderReport, reports_data, returning=returning, **kwargs
+        )
+    
     @staticmethod
     async def get_daily_reports(
         session: AsyncSession,
-        report_date: date
+        report_date: date,
+        load: Optional[str] = None
     ) -> List[DailyOrderReport]:
         result = await session.execute(
-            select(DailyOrderReport)
-            .where(DailyOrderReport.report_at == report_date)
+            apply_load(
+                select(DailyOrderReport).where(DailyOrderReport.report_at == report_date),
+                DailyOrderReport,
+                load,
+            )
         )
         return result.scalars().all()
     
@@ -52,14 +71,85 @@ class ReportRepository:
         return result.scalars().all()
     
     @staticmethod
-    async def delete_old_reports(session: AsyncSession, days_old: int = 30):
-        from datetime import timedelta
-        old_date = date.today() - timedelta(days=days_old)
-        
+    async def get_order_rows_by_date(session: AsyncSession, order_date: date) -> List[dict]:
+        """Строки отчета за дату одним запросом (id и количество заказа)"""
+        day_start = datetime.combine(order_date, datetime.min.time())
         result = await session.execute(
-            delete(DailyOrderReport)
-            .where(DailyOrderReport.report_at < old_date)
+            select(Order.id, Order.quantity)
+            .where(Order.created_at >= day_start, Order.created_at < day_start + timedelta(days=1))
         )
-        
+        return [
+            {"report_at": order_date, "order_id": order_id, "count_product": quantity or 0}
+            for order_id, quantity in result.all()
+        ]
+    
+    @staticmethod
+    async def write_daily_reports(
+        session: AsyncSession,
+        report_date: date,
+        replace: bool = False,
+        chunk_size: int = 1000,
+    ) -> int:
+        """Отчеты за дату пачками INSERT в одной транзакции.
+
+        С replace=True прежние строки за дату удаляются в той же транзакции,
+        поэтому повторный запуск не создает дублей. Заказы читаются из
+        основной БД, чтобы отчет не строился по отстающей реплике.
+        """
+        rows = await ReportRepository.get_order_rows_by_date(
+            use_primary(session), report_date
+        )
+        if replace:
+            await session.execute(
+                delete(DailyOrderReport).where(DailyOrderReport.report_at == report_date)
+            )
+        await bulk_insert(session, DailyOrderReport, rows, chunk_size=chunk_size)
         await session.commit()
-        return result.rowcount
\ No newline at end of file
+        return len(rows)
+    
+    @staticmethod
+    async def delete_batch(
+        session: AsyncSession,
+        cutoff: date,
+        after_id: Optional[UUID] = None,
+        batch_size: int = 5000,
+    ) -> Tuple[int, Optional[UUID]]:
+        """Удаление следующей пачки отчетов старше cutoff по диапазону id.
+
+        Границы пачки берутся из индекса первичного ключа, поэтому DELETE
+        затрагивает не больше batch_size строк и держит блокировки недолго.
+        Возвращает число удаленных строк и верхнюю границу диапазона.
+        """
+        query = select(DailyOrderReport.id).where(DailyOrderReport.report_at < cutoff)
+        if after_id is not None:
+            query = query.where(DailyOrderReport.id > after_id)
+        ids = (
+            await session.execute(query.order_by(DailyOrderReport.id).limit(batch_size))
+        ).scalars().all()
+        if not ids:
+            return 0, None
+
+        statement = delete(DailyOrderReport).where(
+            DailyOrderReport.report_at < cutoff,
+            DailyOrderReport.id >= ids[0],
+            DailyOrderReport.id <= ids[-1],
+        )
+        result = await session.execute(statement)
+        return result.rowcount, ids[-1]
+    
+    @staticmethod
+    async def delete_old_reports(session: AsyncSession, days_old: int = 30, batch_size: int = 5000):
+        from datetime import timedelta
+        old_date = date.today() - timedelta(days=days_old)
+        
+        deleted, last_id = 0, None
+        while True:
+            count, last_id = await ReportRepository.delete_batch(
+                session, old_date, last_id, batch_size
+            )
+            # каждая пачка - отдельная короткая транзакция
+            await session.commit()
+            deleted += count
+            if last_id is None:
+                break
+        return deleted
\ No newline at end of file
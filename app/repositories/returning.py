@@ -0,0 +1,52 @@
+"""Запись с UPDATE/DELETE ... RETURNING за один запрос к БД.
+
+Если СУБД не поддерживает RETURNING (SQLite до 3.35), поведение
+эмулируется отдельным запросом после записи.
+"""
+
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ModelT = TypeVar("ModelT")
+
+
+def as_values(data: Any) -> Dict[str, Any]:
+    """Данные для записи из dict или Pydantic-модели (только заданные поля)"""
+    if isinstance(data, BaseModel):
+        return data.model_dump(exclude_unset=True)
+    return dict(data)
+
+
+async def update_returning(
+    session: AsyncSession, model: Type[ModelT], item_id: Any, values: Dict[str, Any]
+) -> Optional[ModelT]:
+    """UPDATE по первичному ключу, возвращающий обновленный объект"""
+    if session.get_bind().dialect.update_returning:
+        result = await session.execute(
+            update(model)
+            .where(model.id == item_id)
+            .values(**values)
+            .returning(model)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    await session.execute(update(model).where(model.id == item_id).values(**values))
+    return await session.get(model, item_id, populate_existing=True)
+
+
+async def delete_returning(
+    session: AsyncSession, model: Type[Any], item_id: Any
+) -> bool:
+    """DELETE по первичному ключу; True, если строка была удалена"""
+    if session.get_bind().dialect.delete_returning:
+        result = await session.execute(
+            delete(model).where(model.id == item_id).returning(model.id)
+        )
+        return result.scalar_one_or_none() is not None
+
+    result = await session.execute(delete(model).where(model.id == item_id))
+    return result.rowcount > 0
@@ -1,87 +1,160 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import Select, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User, UserCreate, UserUpdate
+from app.repositories.bulk import bulk_insert
+from app.repositories.loaders import apply_load
+from app.repositories.pagination import apply_keyset
+from app.repositories.returning import as_values, delete_returning, update_returning
 
 
 class UserRepository:
 
-    async def get_by_id(self, session: AsyncSession, user_id: UUID) -> Optional[User]:
-        query = select(User).where(User.id == user_id)
-        result = await session.execute(query)
-        return result.scalar_one_or_none()
-
-    async def get_by_filter(
-        self, session: AsyncSession, count: int, page: int, **kwargs
-    ) -> List[User]:
-        offset = (page - 1) * count
-
-        query = select(User)
+    @staticmethod
+    def _apply_filters(query: Select, **kwargs) -> Select:
         if "username" in kwargs:
             query = query.where(User.username == kwargs["username"])
         if "email" in kwargs:
             query = query.where(User.email == kwargs["email"])
         if "description" in kwargs:
             query = query.where(User.description == kwargs["description"])
+        if kwargs.get("search"):
+            query = query.where(User.username.ilike(f"%{kwargs['search']}%"))
+        return query
+
+    async def get_by_id(
+        self, session: AsyncSession, user_id: UUID, load: Optional[str] = None
+    ) -> Optional[User]:
+        query = apply_load(select(User).where(User.id == user_id), User, load)
+        result = await session.execute(query)
+        return result.scalar_one_or_none()
 
-        query = query.offset(offset).limit(count)
+    async def get_by_ids(self, session: AsyncSession, user_ids: List[UUID]) -> List[User]:
+        """Пользователи по списку ID одним запросом"""
+        if not user_ids:
+            return []
+        result = await session.execute(select(User).where(User.id.in_(user_ids)))
+        return list(result.scalars().all())
+
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        load: Optional[str] = None,
+        **kwargs,
+    ) -> List[User]:
+        query = self._paginate(
+            self._apply_filters(select(User), **kwargs), count, page, cursor
+        )
+        query = apply_load(query, User, load)
 
         result = await session.execute(query)
         users = result.scalars().all()
         return list(users)
 
+    async def get_page_with_count(
+        self,
+        session: AsyncSession,
+        count: int,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        load: Optional[str] = None,
+        **kwargs,
+    ) -> Tuple[List[User], int]:
+        """Страница и общее количество за один запрос (COUNT(*) OVER ())"""
+        query = self._paginate(
+            self._apply_filters(select(User, func.count().over()), **kwargs),
+            count,
+            page,
+            cursor,
+        )
+        query = apply_load(query, User, load)
+
+        rows = (await session.execute(query)).all()
+        if not rows:
+            # за пределами последней страницы оконная функция ничего не вернет
+            return [], await self.get_total_count(session, **kwargs)
+        if cursor:
+            # курсор отсекает уже пройденные строки, окно видит только остаток
+            return [row[0] for row in rows], await self.get_total_count(
+                session, **kwargs
+            )
+        return [row[0] for row in rows], rows[0][1]
+
+    @staticmethod
+    def _paginate(
+        query: Select, count: int, page: int, cursor: Optional[str]
+    ) -> Select:
+        query = apply_keyset(query, User, cursor)
+        if not cursor:
+            query = query.offset((page - 1) * count)
+        return query.limit(count)
+
     async def create(self, session: AsyncSession, user_data: UserCreate) -> User:
         user_dict = user_data.dict()
         db_user = User(**user_dict)
 
+        # id и created_at вычисляются на стороне Python, а сессии создаются
+        # с expire_on_commit=False, поэтому повторный SELECT (refresh) не нужен
         session.add(db_user)
         await session.commit()
-        await session.refresh(db_user)
 
         return db_user
 
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        users_data: List[UserCreate],
+        returning: bool = False,
+        **kwargs,
+    ) -> List[UUID]:
+        """Массовое создание пользователей пачками; commit - на вызывающем"""
+        return await bulk_insert(session, User, users_data, returning=returning, **kwargs)
+
     async def update(
         self, session: AsyncSession, user_id: UUID, user_data: UserUpdate
     ) -> Optional[User]:
-        existing_user = await self.get_by_id(session, user_id)
-        if not existing_user:
-            return None
-
-        update_data = user_data.dict(exclude_unset=True)
+        update_data = as_values(user_data)
 
         if not update_data:
-            return existing_user
+            return await self.get_by_id(session, user_id)
 
-        query = update(User).where(User.id == user_id).values(**update_data)
-
-        await session.execute(query)
+        updated_user = await update_returning(session, User, user_id, update_data)
         await session.commit()
-        return await self.get_by_id(session, user_id)
+        return updated_user
 
     async def delete(self, session: AsyncSession, user_id: UUID) -> bool:
-        existing_user = await self.get_by_id(session, user_id)
-        if not existing_user:
-            return False
-
-        query = delete(User).where(User.id == user_id)
-
-        await session.execute(query)
+        deleted = await delete_returning(session, User, user_id)
         await session.commit()
 
-        return True
+        return deleted
 
     async def get_total_count(self, session: AsyncSession, **kwargs) -> int:
-        query = select(func.count(User.id))
-
-        if "username" in kwargs:
-            query = query.where(User.username == kwargs["username"])
-        if "email" in kwargs:
-            query = query.where(User.email == kwargs["email"])
-        if "description" in kwargs:
-            query = query.where(User.description == kwargs["description"])
+        query = self._apply_filters(select(func.count(User.id)), **kwargs)
 
         result = await session.execute(query)
         return result.scalar_one()
+
+    async def get_estimated_count(self, session: AsyncSession) -> int:
+        """Оценка размера таблицы по статистике планировщика PostgreSQL.
+
+        Для других СУБД и для еще не проанализированной таблицы
+        выполняется точный COUNT.
+        """
+        if session.get_bind().dialect.name == "postgresql":
+            result = await session.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:table)"
+                ),
+                {"table": User.__tablename__},
+            )
+            estimate = result.scalar_one_or_none()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return await self.get_total_count(session)
@@ -0,0 +1,206 @@
+"""Полнотекстовый поиск пользователей.
+
+PostgreSQL: GIN-индексы pg_trgm по username, email и description
+(подстрочный поиск ILIKE и ранжирование через similarity) и B-tree индекс
+lower(username) text_pattern_ops для поиска по префиксу.
+SQLite: FTS5-таблица users_fts с триграммным токенайзером и ранжированием
+bm25 (ключ - users_fts_keys.key_id) и индекс lower(username) для префикса.
+Поиск по префиксу на обеих СУБД без учета регистра. Если FTS5-таблицы
+нет (БД создана через create_all без ensure_index), поиск на SQLite
+выполняется через LIKE.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models import User
+
+# Триграммный индекс не может искать строки короче трех символов
+MIN_TRIGRAM_LENGTH = 3
+
+POSTGRES_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_username_trgm "
+    "ON users USING gin (username gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm "
+    "ON users USING gin (email gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_description_trgm "
+    "ON users USING gin (description gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_username_prefix "
+    "ON users (lower(username) text_pattern_ops)",
+]
+
+# users.id - UUID, а неявный rowid такой таблицы может измениться при VACUUM,
+# поэтому FTS5 ссылается на явный INTEGER-ключ из users_fts_keys, а
+# содержимое берет из представления users_fts_content
+SQLITE_INDEX_DDL = [
+    "CREATE TABLE IF NOT EXISTS users_fts_keys ("
+    "key_id INTEGER PRIMARY KEY, user_id CHAR(32) NOT NULL UNIQUE)",
+    "CREATE VIEW IF NOT EXISTS users_fts_content AS "
+    "SELECT k.key_id, u.username, u.email, u.description "
+    "FROM users_fts_keys k JOIN users u ON u.id = k.user_id",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "username, email, description, "
+    "content='users_fts_content', content_rowid='key_id', tokenize='trigram')",
+    "CREATE INDEX IF NOT EXISTS ix_users_username_lower ON users (lower(username))",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts_keys(user_id) VALUES (new.id); "
+    "INSERT INTO users_fts(rowid, username, email, description) "
+    "SELECT key_id, new.username, new.email, new.description "
+    "FROM users_fts_keys WHERE user_id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, username, email, description) "
+    "SELECT 'delete', key_id, old.username, old.email, old.description "
+    "FROM users_fts_keys WHERE user_id = old.id; "
+    "DELETE FROM users_fts_keys WHERE user_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, username, email, description) "
+    "SELECT 'delete', key_id, old.username, old.email, old.description "
+    "FROM users_fts_keys WHERE user_id = old.id; "
+    "UPDATE users_fts_keys SET user_id = new.id WHERE user_id = old.id; "
+    "INSERT INTO users_fts(rowid, username, email, description) "
+    "SELECT key_id, new.username, new.email, new.description "
+    "FROM users_fts_keys WHERE user_id = new.id; END",
+    "INSERT INTO users_fts_keys(user_id) SELECT id FROM users",
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+]
+
+users_fts = table("users_fts", column("rowid"))
+users_fts_keys = table("users_fts_keys", column("key_id"), column("user_id"))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _sqlite_has_table(executor, name: str) -> bool:
+    result = await executor.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name").bindparams(name=name)
+    )
+    return result.first() is not None
+
+
+class UserSearchRepository:
+
+    @staticmethod
+    async def ensure_index(conn: AsyncConnection) -> None:
+        """Создание поисковых индексов для текущей СУБД (идемпотентно).
+
+        На SQLite без таблицы users (схема еще не создана) ничего не делает.
+        """
+        if conn.dialect.name == "postgresql":
+            ddl = POSTGRES_INDEX_DDL
+        else:
+            if not await _sqlite_has_table(conn, "users"):
+                return
+            if await _sqlite_has_table(conn, "users_fts_keys"):
+                return
+            ddl = SQLITE_INDEX_DDL
+        for statement in ddl:
+            await conn.execute(text(statement))
+
+    async def search(
+        self, session: AsyncSession, query: str, limit: int = 20
+    ) -> List[Tuple[User, float]]:
+        """Поиск подстроки в username, email и description с ранжированием.
+
+        Возвращает пары (пользователь, релевантность), лучшие совпадения первыми.
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return await self._search_postgres(session, query, limit)
+        if (
+            dialect == "sqlite"
+            and len(query) >= MIN_TRIGRAM_LENGTH
+            and await _sqlite_has_table(session, "users_fts")
+        ):
+            return await self._search_fts5(session, query, limit)
+        return await self._search_like(session, query, limit)
+
+    async def search_prefix(
+        self, session: AsyncSession, prefix: str, limit: int = 20
+    ) -> List[User]:
+        """Поиск по началу username без учета регистра, по индексу lower(username)"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+
+        username = func.lower(User.username)
+        if session.get_bind().dialect.name == "postgresql":
+            condition = username.like(f"{_escape_like(prefix)}%", escape="\\")
+        else:
+            # диапазон по индексу ix_users_username_lower
+            condition = (username >= prefix) & (username < prefix + "\U0010ffff")
+
+        result = await session.execute(
+            select(User).where(condition).order_by(User.username).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def _search_postgres(
+        session: AsyncSession, query: str, limit: int
+    ) -> List[Tuple[User, float]]:
+        pattern = f"%{_escape_like(query)}%"
+        rank = func.greatest(
+            func.similarity(User.username, query),
+            func.similarity(User.email, query),
+            func.similarity(func.coalesce(User.description, ""), query),
+        ).label("rank")
+        result = await session.execute(
+            select(User, rank)
+            .where(
+                or_(
+                    User.username.ilike(pattern, escape="\\"),
+                    User.email.ilike(pattern, escape="\\"),
+                    User.description.ilike(pattern, escape="\\"),
+                )
+            )
+            .order_by(rank.desc(), User.username)
+            .limit(limit)
+        )
+        return [(row[0], float(row[1])) for row in result.all()]
+
+    @staticmethod
+    async def _search_fts5(
+        session: AsyncSession, query: str, limit: int
+    ) -> List[Tuple[User, float]]:
+        # фраза в кавычках: триграммы ищутся как подстрока, без синтаксиса FTS5
+        phrase = '"' + query.replace('"', '""') + '"'
+        rank = literal_column("bm25(users_fts)")
+        result = await session.execute(
+            select(User, rank)
+            .select_from(users_fts)
+            .join(users_fts_keys, users_fts_keys.c.key_id == users_fts.c.rowid)
+            .join(User, User.id == users_fts_keys.c.user_id)
+            .where(text("users_fts MATCH :phrase").bindparams(phrase=phrase))
+            .order_by(rank)
+            .limit(limit)
+        )
+        # bm25 тем меньше, чем лучше совпадение
+        return [(row[0], -float(row[1])) for row in result.all()]
+
+    @staticmethod
+    async def _search_like(
+        session: AsyncSession, query: str, limit: int
+    ) -> List[Tuple[User, float]]:
+        pattern = f"%{_escape_like(query)}%"
+        result = await session.execute(
+            select(User)
+            .where(
+                or_(
+                    User.username.ilike(pattern, escape="\\"),
+                    User.email.ilike(pattern, escape="\\"),
+                    User.description.ilike(pattern, escape="\\"),
+                )
+            )
+            .order_by(User.username)
+            .limit(limit)
+        )
+        return [(user, 0.0) for user in result.scalars().all()]
@@ -0,0 +1,210 @@
+"""Статистика по count_product за период на NumPy.
+
+Значения периода читаются одним запросом пачками и складываются в
+колоночные массивы (день периода, количество продукции). Вся статистика
+считается векторно по этим массивам: перцентили и стандартное отклонение,
+агрегаты и гистограммы по дням через bincount, топ заказов через
+argpartition. Для топа хранятся только кандидаты из каждой пачки, поэтому
+идентификаторы заказов всего периода в памяти не держатся.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_session
+from app.models.database_models import DailyOrderReport
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FETCH_CHUNK_ROWS = 100_000
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class ReportColumns:
+    start_date: date
+    days: int
+    day_index: "np.ndarray"
+    count_product: "np.ndarray"
+    top_counts: "np.ndarray"
+    top_order_ids: List[Any]
+
+
+def _top_indices(values: "np.ndarray", n: int) -> "np.ndarray":
+    """Индексы n наибольших значений по убыванию (argpartition, без полной сортировки)"""
+    if n <= 0 or values.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if values.size > n:
+        candidates = np.argpartition(values, -n)[-n:]
+    else:
+        candidates = np.arange(values.size)
+    return candidates[np.argsort(values[candidates], kind="stable")[::-1]]
+
+
+class AnalyticsService:
+
+    @staticmethod
+    async def fetch_columns(
+        session: AsyncSession,
+        start_date: date,
+        end_date: date,
+        top_n: int = 10,
+        chunk_rows: int = FETCH_CHUNK_ROWS,
+    ) -> ReportColumns:
+        """Чтение (report_at, order_id, count_product) за период в массивы"""
+        if np is None:
+            raise RuntimeError("Для аналитики нужен пакет numpy (pip install numpy)")
+
+        query = (
+            select(
+                DailyOrderReport.report_at,
+                DailyOrderReport.order_id,
+                DailyOrderReport.count_product,
+            )
+            .where(DailyOrderReport.report_at.between(start_date, end_date))
+            .execution_options(yield_per=chunk_rows)
+        )
+        start_ordinal = start_date.toordinal()
+        day_chunks, count_chunks = [], []
+        top_counts = np.empty(0, dtype=np.int64)
+        top_ids: List[Any] = []
+
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            size = len(rows)
+            day_chunks.append(
+                np.fromiter((row[0].toordinal() for row in rows), dtype=np.int64, count=size)
+                - start_ordinal
+            )
+            counts = np.fromiter((row[2] or 0 for row in rows), dtype=np.int64, count=size)
+            count_chunks.append(counts)
+
+            # кандидаты в топ: лучшие из пачки плюс текущий топ
+            best = _top_indices(counts, top_n)
+            merged_counts = np.concatenate([top_counts, counts[best]])
+            merged_ids = top_ids + [rows[i][1] for i in best]
+            keep = _top_indices(merged_counts, top_n)
+            top_counts = merged_counts[keep]
+            top_ids = [merged_ids[i] for i in keep]
+
+        empty = np.empty(0, dtype=np.int64)
+        return ReportColumns(
+            start_date=start_date,
+            days=(end_date - start_date).days + 1,
+            day_index=np.concatenate(day_chunks) if day_chunks else empty,
+            count_product=np.concatenate(count_chunks) if count_chunks else empty,
+            top_counts=top_counts,
+            top_order_ids=top_ids,
+        )
+
+    @staticmethod
+    def compute_stats(
+        columns: ReportColumns,
+        bins: int = 10,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> Dict[str, Any]:
+        """Сводная статистика по колонкам периода"""
+        values = columns.count_product
+        day_index = columns.day_index
+        days = columns.days
+        labels = [f"p{q:g}" for q in percentiles]
+
+        if values.size == 0:
+            return {
+                "overall": {"count": 0, "sum": 0},
+                "histogram_edges": [],
+                "daily": [],
+                "top_orders": [],
+            }
+
+        p_values = np.percentile(values, percentiles)
+        overall = {
+            "count": int(values.size),
+            "sum": int(values.sum()),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": int(values.min()),
+            "max": int(values.max()),
+            **{label: float(v) for label, v in zip(labels, p_values)},
+        }
+
+        # агрегаты по дням одним проходом bincount
+        day_counts = np.bincount(day_index, minlength=days)
+        day_sums = np.bincount(day_index, weights=values, minlength=days)
+        day_squares = np.bincount(day_index, weights=values.astype(np.float64) ** 2, minlength=days)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            day_means = np.where(day_counts > 0, day_sums / day_counts, 0.0)
+            day_std = np.sqrt(
+                np.maximum(np.where(day_counts > 0, day_squares / day_counts, 0.0) - day_means**2, 0.0)
+            )
+
+        # перцентили по дням: сортировка по (день, значение) и интерполяция
+        # внутри каждого дня так же, как в np.percentile
+        sorted_values = values[np.lexsort((values, day_index))].astype(np.float64)
+        day_starts = np.concatenate([[0], np.cumsum(day_counts)[:-1]])
+        day_percentiles = {}
+        for label, q in zip(labels, percentiles):
+            position = (q / 100.0) * np.maximum(day_counts - 1, 0)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            safe = day_counts > 0
+            low_values = np.where(safe, sorted_values[np.minimum(day_starts + low, values.size - 1)], 0.0)
+            high_values = np.where(safe, sorted_values[np.minimum(day_starts + high, values.size - 1)], 0.0)
+            day_percentiles[label] = low_values + (high_values - low_values) * (position - low)
+
+        # гистограммы по дням с общими границами корзин
+        edges = np.histogram_bin_edges(values, bins=bins)
+        bin_index = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, bins - 1)
+        histograms = np.bincount(day_index * bins + bin_index, minlength=days * bins).reshape(days, bins)
+
+        daily = []
+        for day in np.flatnonzero(day_counts):
+            daily.append({
+                "date": (columns.start_date + timedelta(days=int(day))).isoformat(),
+                "total_orders": int(day_counts[day]),
+                "total_products": int(day_sums[day]),
+                "mean": float(day_means[day]),
+                "std": float(day_std[day]),
+                **{label: float(day_percentiles[label][day]) for label in labels},
+                "histogram": histograms[day].tolist(),
+            })
+
+        return {
+            "overall": overall,
+            "histogram_edges": edges.tolist(),
+            "daily": daily,
+            "top_orders": [
+                {"order_id": str(order_id), "count_product": int(count)}
+                for order_id, count in zip(columns.top_order_ids, columns.top_counts)
+            ],
+        }
+
+    @staticmethod
+    async def report_stats(
+        start_date: date,
+        end_date: date,
+        bins: int = 10,
+        top_n: int = 10,
+    ) -> Dict[str, Any]:
+        async for session in get_async_session():
+            try:
+                columns = await AnalyticsService.fetch_columns(session, start_date, end_date, top_n)
+                stats = AnalyticsService.compute_stats(columns, bins)
+                return {
+                    "status": "success",
+                    "period": {"start": start_date, "end": end_date},
+                    **stats,
+                }
+            except Exception as e:
+                logger.error(f"Ошибка расчета статистики: {e}")
+                return {"status": "error", "message": str(e)}
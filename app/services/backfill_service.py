@@ -0,0 +1,151 @@
+"""Пересборка отчетов за диапазон дат.
+
+Диапазон делится на дни, каждый день - отдельная задача asyncio со своей
+сессией и транзакцией: заказы дня читаются одним запросом, отчеты пишутся
+пачками INSERT (ReportRepository.write_daily_reports). Число одновременно
+обрабатываемых дней ограничено семафором, чтобы не занять весь пул
+соединений и не перегрузить БД.
+
+Готовые дни записываются в файл контрольной точки. Повторный запуск на тот
+же диапазон пропускает их и досчитывает только оставшиеся и упавшие дни.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal, use_primary
+from app.models.database_models import DailyOrderReport
+from app.repositories.report_repository import ReportRepository
+from app.services.report_cache import report_cache
+
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "4"))
+BACKFILL_CHUNK_SIZE = int(os.getenv("BACKFILL_CHUNK_SIZE", "1000"))
+BACKFILL_CHECKPOINT = os.getenv("BACKFILL_CHECKPOINT", "./backfill_checkpoint.json")
+
+
+def date_range(start_date: date, end_date: date) -> List[date]:
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+class ReportBackfillService:
+    """Параллельная генерация отчетов по дням"""
+
+    def __init__(
+        self,
+        concurrency: int = BACKFILL_CONCURRENCY,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        checkpoint_path: Optional[str] = BACKFILL_CHECKPOINT,
+        replace: bool = True,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ):
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        # replace=False - дни, где отчеты уже есть, пропускаются
+        self.replace = replace
+        self.session_factory = session_factory
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, start_date: date, end_date: date, done: Set[date]) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "start": start_date.isoformat(),
+                    "end": end_date.isoformat(),
+                    "done": sorted(day.isoformat() for day in done),
+                    "updated_at": datetime.now().isoformat(),
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _done_days(self, start_date: date, end_date: date) -> Set[date]:
+        checkpoint = self.load_checkpoint()
+        if not checkpoint:
+            return set()
+        if (checkpoint["start"], checkpoint["end"]) != (start_date.isoformat(), end_date.isoformat()):
+            return set()
+        return {date.fromisoformat(day) for day in checkpoint["done"]}
+
+    async def backfill_day(self, report_date: date) -> Optional[int]:
+        """Отчеты за один день; None - день пропущен (отчеты уже есть)"""
+        async with self.session_factory() as session:
+            use_primary(session)
+            if not self.replace:
+                existing = await session.execute(
+                    select(func.count(DailyOrderReport.id))
+                    .where(DailyOrderReport.report_at == report_date)
+                )
+                if existing.scalar():
+                    return None
+            created = await ReportRepository.write_daily_reports(
+                session, report_date, replace=self.replace, chunk_size=self.chunk_size
+            )
+        report_cache.bump(report_date)
+        return created
+
+    async def run(self, start_date: date, end_date: date, resume: bool = True) -> Dict[str, Any]:
+        if end_date < start_date:
+            raise ValueError("end_date must not be earlier than start_date")
+
+        done = self._done_days(start_date, end_date) if resume else set()
+        pending = [day for day in date_range(start_date, end_date) if day not in done]
+        resumed_days = len(done)
+        if done:
+            print(f"Продолжение: {len(done)} дней уже готово, осталось {len(pending)}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        reports = 0
+        skipped: List[str] = []
+        failed: Dict[str, str] = {}
+        started = time.perf_counter()
+
+        async def worker(report_date: date) -> None:
+            nonlocal reports
+            async with semaphore:
+                try:
+                    created = await self.backfill_day(report_date)
+                except Exception as e:
+                    failed[report_date.isoformat()] = str(e)
+                    print(f"Ошибка пересборки отчета за {report_date}: {e}")
+                    return
+            if created is None:
+                skipped.append(report_date.isoformat())
+            else:
+                reports += created
+            done.add(report_date)
+            self._save_checkpoint(start_date, end_date, done)
+
+        await asyncio.gather(*(worker(day) for day in pending))
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"Пересборка {start_date} - {end_date}: {len(pending) - len(failed)} дней, "
+            f"{reports} отчетов, ошибок {len(failed)}, {elapsed:.1f} с"
+        )
+        return {
+            "start": start_date,
+            "end": end_date,
+            "days": len(pending) - len(failed),
+            "resumed_days": resumed_days,
+            "reports": reports,
+            "skipped": sorted(skipped),
+            "failed": failed,
+            "seconds": round(elapsed, 3),
+        }
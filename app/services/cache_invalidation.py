@@ -0,0 +1,64 @@
+"""Инвалидация кэша CacheService по доменным событиям.
+
+Подписчик получает user.updated, user.deleted и product.updated пачками
+(см. EventConsumer) и сбрасывает соответствующие записи одним DEL на пачку.
+Событие product.updated с полным снимком продукции не удаляет запись, а
+перезаписывает ее через конвейер, чтобы следующий запрос не был промахом.
+Благодаря этому TTL записей можно держать большим, не отдавая
+устаревшие данные.
+"""
+
+from typing import Any, Dict, List
+
+from app.services.cache_service import PRODUCT_CACHE_TTL, CacheService, cache_service
+
+# поля, без которых событие продукции не считается полным снимком
+PRODUCT_SNAPSHOT_FIELDS = ("name", "price", "quantity")
+
+
+class CacheInvalidator:
+    """Пакетный сброс и обновление записей кэша по событиям"""
+
+    def __init__(self, cache: CacheService = cache_service):
+        self.cache = cache
+
+    async def handle_user_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        user_ids = {event["user_id"] for event in events if event.get("user_id")}
+        evicted = self.cache.evict_many("user", user_ids)
+
+        counts = 0
+        if any(event.get("event_type") == "user.deleted" for event in events):
+            counts = self.cache.invalidate_counts("users:")
+
+        print(f"[CacheInvalidator] {len(user_ids)} user(s) evicted from {len(events)} event(s)")
+        return {"evicted": evicted, "counts": counts}
+
+    async def handle_product_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        # в пачке важно только последнее событие по каждой продукции
+        latest: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            if event.get("product_id"):
+                latest[str(event["product_id"])] = event
+
+        snapshots = {
+            product_id: {
+                key: value for key, value in event.items()
+                if key not in ("event_type", "timestamp")
+            }
+            for product_id, event in latest.items()
+            if all(field in event for field in PRODUCT_SNAPSHOT_FIELDS)
+        }
+        stale = [product_id for product_id in latest if product_id not in snapshots]
+
+        refreshed = self.cache.refresh_many("product", snapshots, PRODUCT_CACHE_TTL)
+        evicted = self.cache.evict_many("product", stale)
+
+        print(
+            f"[CacheInvalidator] products: {refreshed} refreshed, "
+            f"{len(stale)} evicted from {len(events)} event(s)"
+        )
+        return {"refreshed": refreshed, "evicted": evicted}
+
+
+# Глобальный экземпляр
+cache_invalidator = CacheInvalidator()
@@ -1,9 +1,26 @@
 """Сервис для кэширования данных с инвалидацией"""
 
+from app.monitoring.metrics import record_cache_lookup
 from app.redis.client import get_redis
 from datetime import datetime
 import json
-from typing import Any, Optional, Dict, List
+import os
+import time
+from typing import Any, Optional, Dict, Iterable, List
+
+# Записи сбрасывают пути записи (UserController, ProductController,
+# InventorySyncer) и подписчик событий (cache_invalidation), поэтому
+# TTL - только страховка от пропущенной инвалидации
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", str(24 * 3600)))
+PRODUCT_CACHE_TTL = int(os.getenv("PRODUCT_CACHE_TTL", str(6 * 3600)))
+# ключей в одной команде DEL / одном конвейере
+CACHE_EVICTION_CHUNK = int(os.getenv("CACHE_EVICTION_CHUNK", "500"))
+# префиксы записей кэша; остальные ключи базы (остатки stock:*, аренды,
+# поколения отчетов) кэшем не являются
+CACHE_PREFIXES = ("user", "product", "count", "report")
+# поколения COUNT по областям (count_gen:users:); как и report_gen:*, не
+# удаляются вместе с кэшем, иначе старые значения снова станут видны
+COUNT_GENERATION_PREFIX = "count_gen"
 
 class CacheService:
     """Сервис для работы с кэшем Redis"""
@@ -17,7 +34,7 @@ class CacheService:
     
     def cache_user_data(self, user_id: str, user_data: Dict[str, Any]) -> bool:
         """
-        Кэширование данных пользователя на 1 час
+        Кэширование данных пользователя на USER_CACHE_TTL
         
         Args:
             user_id: ID пользователя
@@ -30,17 +47,16 @@ class CacheService:
             key = self._generate_key("user", user_id)
             # Сериализуем данные в JSON
             serialized_data = json.dumps(user_data, ensure_ascii=False)
-            # Сохраняем на 1 час (3600 секунд)
-            result = self.redis.setex(key, 3600, serialized_data)
+            result = self.redis.setex(key, USER_CACHE_TTL, serialized_data)
             
             # Также сохраняем метаданные для инвалидации
             meta_key = f"{key}:meta"
             meta_data = {
                 "cached_at": datetime.now().isoformat(),
-                "ttl": 3600,
+                "ttl": USER_CACHE_TTL,
                 "type": "user"
             }
-            self.redis.setex(meta_key, 3600, json.dumps(meta_data))
+            self.redis.setex(meta_key, USER_CACHE_TTL, json.dumps(meta_data))
             
             return result
         except Exception as e:
@@ -57,9 +73,11 @@ class CacheService:
         Returns:
             dict or None: Данные пользователя или None если не найдено
         """
+        started = time.perf_counter()
         try:
             key = self._generate_key("user", user_id)
             cached_data = self.redis.get(key)
+            record_cache_lookup("user", bool(cached_data), started)
             
             if cached_data:
                 # Десериализуем из JSON
@@ -100,7 +118,7 @@ class CacheService:
     
     def cache_product_data(self, product_id: str, product_data: Dict[str, Any]) -> bool:
         """
-        Кэширование данных продукции на 10 минут
+        Кэширование данных продукции на PRODUCT_CACHE_TTL
         
         Args:
             product_id: ID продукции
@@ -113,17 +131,16 @@ class CacheService:
             key = self._generate_key("product", product_id)
             # Сериализуем данные в JSON
             serialized_data = json.dumps(product_data, ensure_ascii=False)
-            # Сохраняем на 10 минут (600 секунд)
-            result = self.redis.setex(key, 600, serialized_data)
+            result = self.redis.setex(key, PRODUCT_CACHE_TTL, serialized_data)
             
             # Также сохраняем метаданные
             meta_key = f"{key}:meta"
             meta_data = {
                 "cached_at": datetime.now().isoformat(),
-                "ttl": 600,
+                "ttl": PRODUCT_CACHE_TTL,
                 "type": "product"
             }
-            self.redis.setex(meta_key, 600, json.dumps(meta_data))
+            self.redis.setex(meta_key, PRODUCT_CACHE_TTL, json.dumps(meta_data))
             
             return result
         except Exception as e:
@@ -140,9 +157,11 @@ class CacheService:
         Returns:
             dict or None: Данные продукции или None если не найдено
         """
+        started = time.perf_counter()
         try:
             key = self._generate_key("product", product_id)
             cached_data = self.redis.get(key)
+            record_cache_lookup("product", bool(cached_data), started)
             
             if cached_data:
                 # Десериализуем из JSON
@@ -164,12 +183,108 @@ class CacheService:
             bool: True если успешно, False если ошибка
         """
         try:
-            # Обновляем кэш с тем же TTL (10 минут)
             return self.cache_product_data(product_id, product_data)
         except Exception as e:
             print(f"Error updating product cache: {e}")
             return False
     
+    def evict_many(self, prefix: str, identifiers: Iterable[str]) -> int:
+        """
+        Пакетное удаление записей prefix:<id> вместе с метаданными
+        
+        Ключи удаляются командами DEL по CACHE_EVICTION_CHUNK штук,
+        то есть за один запрос к Redis на пачку.
+        
+        Returns:
+            int: Количество удаленных ключей
+        """
+        keys = []
+        for identifier in identifiers:
+            key = self._generate_key(prefix, identifier)
+            keys.extend([key, f"{key}:meta"])
+        
+        deleted = 0
+        try:
+            for start in range(0, len(keys), CACHE_EVICTION_CHUNK):
+                deleted += self.redis.delete(*keys[start:start + CACHE_EVICTION_CHUNK])
+        except Exception as e:
+            print(f"Error evicting {prefix} cache: {e}")
+        return deleted
+    
+    def refresh_many(self, prefix: str, items: Dict[str, Dict[str, Any]], ttl: int) -> int:
+        """
+        Пакетная перезапись записей prefix:<id> свежими данными через конвейер
+        
+        Returns:
+            int: Количество обновленных записей
+        """
+        meta = json.dumps({"cached_at": datetime.now().isoformat(), "ttl": ttl, "type": prefix})
+        entries = list(items.items())
+        try:
+            for start in range(0, len(entries), CACHE_EVICTION_CHUNK):
+                pipe = self.redis.pipeline(transaction=False)
+                for identifier, data in entries[start:start + CACHE_EVICTION_CHUNK]:
+                    key = self._generate_key(prefix, identifier)
+                    pipe.setex(key, ttl, json.dumps(data, ensure_ascii=False, default=str))
+                    pipe.setex(f"{key}:meta", ttl, meta)
+                pipe.execute()
+        except Exception as e:
+            print(f"Error refreshing {prefix} cache: {e}")
+            return 0
+        return len(entries)
+    
+    def _count_key(self, name: str) -> str:
+        """Ключ COUNT с поколением его области (часть имени до ':' включительно)"""
+        scope = name.split(":", 1)[0] + ":" if ":" in name else name
+        generation = self.redis.get(f"{COUNT_GENERATION_PREFIX}:{scope}")
+        return self._generate_key("count", f"{name}:{generation or 0}")
+    
+    def invalidate_counts(self, name_prefix: str) -> int:
+        """
+        Сброс закэшированных COUNT области name_prefix сменой поколения:
+        старые ключи перестают читаться и истекают по TTL, поиск ключей не нужен
+        
+        Args:
+            name_prefix: Область счетчиков (например, "users:")
+        """
+        try:
+            self.redis.incr(f"{COUNT_GENERATION_PREFIX}:{name_prefix}")
+            return 1
+        except Exception as e:
+            print(f"Error invalidating cached counts: {e}")
+            return 0
+    
+    def cache_count(self, name: str, value: int, ttl: int = 30) -> bool:
+        """
+        Кэширование результата COUNT на короткое время
+        
+        Args:
+            name: Имя счетчика (область + фильтры, например "users:<поиск>")
+            value: Значение счетчика
+            ttl: Время жизни в секундах
+        """
+        try:
+            return self.redis.setex(self._count_key(name), ttl, value)
+        except Exception as e:
+            print(f"Error caching count: {e}")
+            return False
+    
+    def get_cached_count(self, name: str) -> Optional[int]:
+        """
+        Получение закэшированного значения COUNT
+        
+        Args:
+            name: Имя счетчика (область + фильтры)
+        """
+        started = time.perf_counter()
+        try:
+            cached = self.redis.get(self._count_key(name))
+            record_cache_lookup("count", cached is not None, started)
+            return int(cached) if cached is not None else None
+        except Exception as e:
+            print(f"Error getting cached count: {e}")
+            return None
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Получение статистики по кэшу
@@ -203,13 +318,16 @@ class CacheService:
     
     def clear_all_cache(self) -> bool:
         """
-        Очистка всего кэша
+        Очистка всех записей кэша (ключи с префиксами CACHE_PREFIXES)
         
         Returns:
             bool: True если успешно
         """
         try:
-            self.redis.flushdb()
+            for prefix in CACHE_PREFIXES:
+                keys = self.redis.keys(f"{prefix}:*")
+                for start in range(0, len(keys), CACHE_EVICTION_CHUNK):
+                    self.redis.delete(*keys[start:start + CACHE_EVICTION_CHUNK])
             return True
         except Exception as e:
             print(f"Error clearing cache: {e}")
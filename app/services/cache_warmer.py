@@ -0,0 +1,141 @@
+"""Прогрев кэша CacheService после деплоя или очистки.
+
+Загружает в кэш самые заказываемые продукты (заказы за CACHE_WARMUP_DAYS,
+сгруппированные по product_id) и недавно активных пользователей (с
+заказами за тот же период). Записи читаются пачками по ID одним запросом
+и пишутся в Redis конвейером; между пачками делается пауза, чтобы прогрев
+не нагружал БД. Результат содержит длительность и покрытие: сколько
+записей прогрето и какая доля заказов за период приходится на прогретые
+продукты.
+
+Запуск:
+    python scripts/warm_cache.py --products 500 --users 1000
+или при старте приложения (CACHE_WARMUP_ON_STARTUP=1).
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.db.session import AsyncSessionLocal
+from app.models.database_models import ProductResponse, UserResponse
+from app.repositories.order_repository import OrderRepository
+from app.repositories.product_repository import ProductRepository
+from app.redis.lock import LeaseLock
+from app.repositories.user_repository import UserRepository
+from app.services.cache_service import (
+    PRODUCT_CACHE_TTL,
+    USER_CACHE_TTL,
+    CacheService,
+    cache_service,
+)
+
+CACHE_WARMUP_PRODUCTS = int(os.getenv("CACHE_WARMUP_PRODUCTS", "500"))
+CACHE_WARMUP_USERS = int(os.getenv("CACHE_WARMUP_USERS", "1000"))
+CACHE_WARMUP_DAYS = int(os.getenv("CACHE_WARMUP_DAYS", "30"))
+CACHE_WARMUP_CHUNK_SIZE = int(os.getenv("CACHE_WARMUP_CHUNK_SIZE", "200"))
+# пауза между пачками чтения, секунды
+CACHE_WARMUP_PAUSE = float(os.getenv("CACHE_WARMUP_PAUSE", "0.05"))
+CACHE_WARMUP_ON_STARTUP = os.getenv("CACHE_WARMUP_ON_STARTUP", "0") == "1"
+# аренда прогрева при старте: из нескольких воркеров греет кэш только один
+CACHE_WARMUP_LOCK_TTL = int(os.getenv("CACHE_WARMUP_LOCK_TTL", "300"))
+
+# фоновая задача прогрева при старте (ссылка, чтобы ее не собрал GC)
+_startup_task: Optional[asyncio.Task] = None
+
+
+class CacheWarmer:
+    """Предзагрузка горячих продуктов и пользователей в кэш"""
+
+    def __init__(
+        self,
+        products: int = CACHE_WARMUP_PRODUCTS,
+        users: int = CACHE_WARMUP_USERS,
+        days: int = CACHE_WARMUP_DAYS,
+        chunk_size: int = CACHE_WARMUP_CHUNK_SIZE,
+        pause: float = CACHE_WARMUP_PAUSE,
+        cache: CacheService = cache_service,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.products = products
+        self.users = users
+        self.days = days
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.cache = cache
+        self.session_factory = session_factory
+        self.order_repository = OrderRepository()
+        self.product_repository = ProductRepository()
+        self.user_repository = UserRepository()
+
+    def _chunks(self, ids: List[UUID]):
+        for start in range(0, len(ids), self.chunk_size):
+            yield ids[start:start + self.chunk_size]
+
+    async def _warm(self, session, ids: List[UUID], load, serialize, prefix: str, ttl: int) -> int:
+        cached = 0
+        for index, chunk in enumerate(self._chunks(ids)):
+            if index and self.pause:
+                await asyncio.sleep(self.pause)
+            rows = await load(session, chunk)
+            cached += self.cache.refresh_many(
+                prefix, {str(row.id): serialize(row) for row in rows}, ttl
+            )
+        return cached
+
+    async def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        since = (now or datetime.now()) - timedelta(days=self.days)
+
+        async with self.session_factory() as session:
+            top = await self.order_repository.get_top_products(session, self.products, since)
+            total_orders = await self.order_repository.count_since(session, since)
+            product_ids = [product_id for product_id, _ in top]
+            products_cached = await self._warm(
+                session, product_ids, self.product_repository.get_by_ids,
+                lambda p: ProductResponse.model_validate(p).model_dump(mode="json"),
+                "product", PRODUCT_CACHE_TTL,
+            )
+
+            user_ids = await self.order_repository.get_recent_user_ids(session, since, self.users)
+            users_cached = await self._warm(
+                session, user_ids, self.user_repository.get_by_ids,
+                lambda u: UserResponse.model_validate(u).model_dump(mode="json"),
+                "user", USER_CACHE_TTL,
+            )
+
+        covered_orders = sum(count for _, count in top)
+        result = {
+            "duration": round(time.perf_counter() - started, 3),
+            "since": since.isoformat(),
+            "products": {"candidates": len(product_ids), "cached": products_cached},
+            "users": {"candidates": len(user_ids), "cached": users_cached},
+            "order_coverage": round(covered_orders / total_orders, 4) if total_orders else 0.0,
+        }
+        print(
+            f"[CacheWarmer] {products_cached} products, {users_cached} users in "
+            f"{result['duration']}s, order coverage {result['order_coverage']:.1%}"
+        )
+        return result
+
+
+async def warm_cache_on_startup() -> None:
+    """Хук старта приложения: прогрев в фоне, не задерживая запуск"""
+    global _startup_task
+    if not CACHE_WARMUP_ON_STARTUP:
+        return
+    # аренду не освобождаем: воркеры, стартовавшие позже, тоже пропустят прогрев
+    if not LeaseLock("cache_warmup", ttl=CACHE_WARMUP_LOCK_TTL).acquire():
+        print("[CacheWarmer] Warm-up is running in another worker")
+        return
+
+    async def warm():
+        try:
+            await CacheWarmer().run()
+        except Exception as e:
+            print(f"[CacheWarmer] Warm-up failed: {e}")
+
+    _startup_task = asyncio.create_task(warm())
@@ -1,41 +1,110 @@
-import asyncio
-from typing import Dict, Any
-from datetime import datetime
+"""Обработчики доменных событий из RabbitMQ.
+
+Вместо ожиданий обработчики выполняют реальные побочные эффекты:
+прогревают кэш, обновляют дневные сводки заказов в Redis и
+поколения кэша отчетов. Все операции идемпотентны по отношению к кэшу,
+кроме счетчиков сводки - они увеличиваются на каждое доставленное событие.
+Сброс кэша по изменениям - в cache_invalidation.
+"""
+
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List
+
+from app.services.cache_service import cache_service
+from app.services.report_cache import report_cache
+
+ORDER_ROLLUP_TTL = int(os.getenv("ORDER_ROLLUP_TTL", str(3 * 24 * 3600)))
+
+
+def rollup_key(report_date: date, field: str) -> str:
+    return f"rollup:orders:{report_date.isoformat()}:{field}"
+
+
+def _event_date(event: Dict[str, Any]) -> date:
+    timestamp = event.get("timestamp")
+    try:
+        return datetime.fromisoformat(timestamp).date() if timestamp else date.today()
+    except (TypeError, ValueError):
+        return date.today()
+
+
+def get_order_rollup(report_date: date) -> Dict[str, Any]:
+    """Сводка заказов за день, накопленная обработчиком order.created"""
+    count, amount = cache_service.redis.mget(
+        [rollup_key(report_date, "count"), rollup_key(report_date, "amount_cents")]
+    )
+    return {
+        "date": report_date.isoformat(),
+        "orders": int(count or 0),
+        "total_amount": int(amount or 0) / 100,
+    }
 
 
 class EventHandlers:
     @staticmethod
     async def handle_user_created(event: Dict[str, Any]):
-        print(f"User created event: {event}")
-        
+        """Кладет нового пользователя в кэш и сбрасывает кэш COUNT"""
         user_id = event.get("user_id")
-        username = event.get("username")
-        email = event.get("email")
-        
-        print(f"Processing new user: {username} ({email})")
-        await asyncio.sleep(1)
-        print(f"User {username} processing completed at {datetime.now()}")
-    
+        if not user_id:
+            raise ValueError("user.created event without user_id")
+
+        cache_service.cache_user_data(
+            user_id,
+            {
+                "id": user_id,
+                "username": event.get("username"),
+                "email": event.get("email"),
+                "created_at": event.get("timestamp"),
+            },
+        )
+        # закэшированные COUNT по пользователям (UserController, count_mode=cached)
+        cache_service.invalidate_counts("users:")
+        print(f"[Events] User {event.get('username')} cached")
+
     @staticmethod
     async def handle_order_created(event: Dict[str, Any]):
-        print(f"Order created event: {event}")
-        
-        order_id = event.get("order_id")
-        user_id = event.get("user_id")
-        total_amount = event.get("total_amount")
-        
-        print(f"Processing order {order_id} for user {user_id}")
-        await asyncio.sleep(2)
-        print(f"Order {order_id} processing completed")
-    
+        await EventHandlers.handle_orders_created([event])
+
     @staticmethod
-    async def handle_product_updated(event: Dict[str, Any]):
-        print(f"Product updated event: {event}")
-        
-        product_id = event.get("product_id")
-        product_name = event.get("name")
-        new_price = event.get("price")
-        
-        print(f"Product {product_name} updated, new price: {new_price}")
-        await asyncio.sleep(0.5)
-        print(f"Product {product_id} update processed")
\ No newline at end of file
+    async def handle_orders_created(events: List[Dict[str, Any]]):
+        """Обновляет дневные сводки пачкой: одно увеличение на дату и товар.
+
+        События с нечисловыми суммой или количеством пропускаются.
+        """
+        count = defaultdict(int)
+        amount_cents = defaultdict(int)
+        product_quantity = defaultdict(int)
+        skipped = 0
+        for event in events:
+            try:
+                amount = round(float(event.get("total_amount") or 0) * 100)
+                quantity = int(event.get("quantity") or 0)
+            except (AttributeError, TypeError, ValueError):
+                skipped += 1
+                print(f"[Events] Malformed order.created event skipped: {event!r}")
+                continue
+            day = _event_date(event)
+            count[day] += 1
+            amount_cents[day] += amount
+            if event.get("product_id"):
+                product_quantity[(day, event["product_id"])] += quantity
+
+        redis = cache_service.redis
+        for day in count:
+            for field, value in (("count", count[day]), ("amount_cents", amount_cents[day])):
+                key = rollup_key(day, field)
+                redis.incrby(key, value)
+                redis.expire(key, ORDER_ROLLUP_TTL)
+            # новые заказы меняют отчеты за этот день
+            report_cache.bump(day)
+        for (day, product_id), quantity in product_quantity.items():
+            key = rollup_key(day, f"product:{product_id}")
+            redis.incrby(key, quantity)
+            redis.expire(key, ORDER_ROLLUP_TTL)
+
+        print(
+            f"[Events] {len(events) - skipped} orders rolled up into {len(count)} day(s)"
+            + (f", {skipped} skipped" if skipped else "")
+        )
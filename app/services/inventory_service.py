@@ -1,66 +1,180 @@
-from typing import Dict, Any, List, Optional
+"""Складские остатки поверх общего хранилища в Redis (app.redis.stock).
+
+Остатки общие для всех воркеров API и потребителей очередей; проверка и
+списание выполняются атомарно на стороне Redis. Остаток продукта
+загружается из products.quantity при первом обращении, а изменения
+попадают в БД через журнал инвентаря (app.services.inventory_sync).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import UUID
-from datetime import datetime
+
+from app.db.session import AsyncSessionLocal
+from app.redis.stock import StockResult, StockStore
+from app.repositories.product_repository import ProductRepository
+
+
+def _uuid(value: Union[UUID, str]) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
 
 
 class InventoryService:
-    def __init__(self):
-        self.inventory = {}
-        self.inventory_logs = []
-        
-        self.products = {
-            UUID("223e4567-e89b-12d3-a456-426614174001"): {"name": "Ноутбук Dell XPS 13", "quantity": 35, "is_available": True},
-            UUID("223e4567-e89b-12d3-a456-426614174002"): {"name": "Смартфон iPhone 15 Pro", "quantity": 40, "is_available": True},
-            UUID("223e4567-e89b-12d3-a456-426614174003"): {"name": "Наушники Sony WH-1000XM5", "quantity": 50, "is_available": True},
-        }
-        
-        self.inventory = self.products.copy()
-    
+    def __init__(self, store: Optional[StockStore] = None, session_factory=AsyncSessionLocal):
+        self.store = store or StockStore()
+        self.session_factory = session_factory
+        self.product_repository = ProductRepository()
+
     async def initialize(self):
         return self
-    
+
+    async def _seed(self, product_ids: List[UUID]) -> List[UUID]:
+        """Загрузить из БД остатки, которых нет в Redis; вернуть ID, которых нет и в БД"""
+        async with self.session_factory() as session:
+            products = await self.product_repository.get_by_ids(session, product_ids)
+        for product in products:
+            self.store.seed(product.id, product.quantity or 0)
+        found = {product.id for product in products}
+        return [product_id for product_id in product_ids if product_id not in found]
+
+    async def _apply(self, operation, product_ids: List[UUID]) -> StockResult:
+        """Выполнить операцию; если остаток еще не загружен - загрузить и повторить"""
+        result = operation()
+        if result.status == "missing":
+            missing = [pid for pid, qty in self.store.get_many(product_ids).items() if qty is None]
+            if not await self._seed(missing):
+                result = operation()
+        return result
+
+    async def get_quantity(self, product_id: UUID) -> Optional[int]:
+        product_id = _uuid(product_id)
+        quantity = self.store.get(product_id)
+        if quantity is None and not await self._seed([product_id]):
+            quantity = self.store.get(product_id)
+        return quantity
+
+    async def get_inventory_status(self, product_id: UUID) -> Dict[str, Any]:
+        quantity = await self.get_quantity(product_id)
+        return {
+            "product_id": str(product_id),
+            "quantity": quantity or 0,
+            "is_available": bool(quantity),
+            "exists": quantity is not None
+        }
+
     async def check_availability(self, product_id: UUID, requested_quantity: int) -> bool:
-        if product_id not in self.inventory:
-            return False
-        product = self.inventory[product_id]
-        return product["is_available"] and product["quantity"] >= requested_quantity
-    
+        quantity = await self.get_quantity(product_id)
+        return quantity is not None and quantity >= requested_quantity
+
     async def update_quantity(self, product_id: UUID, quantity_change: int, reason: str) -> Dict[str, Any]:
         try:
-            if product_id not in self.inventory:
-                self.inventory[product_id] = {"name": f"Product {product_id}", "quantity": 0, "is_available": True}
-            
-            product = self.inventory[product_id]
-            current_quantity = product["quantity"]
-            new_quantity = current_quantity + quantity_change
-            
-            if new_quantity < 0:
-                return {"success": False, "error": f"Insufficient stock. Current: {current_quantity}, Change: {quantity_change}"}
-            
-            product["quantity"] = new_quantity
-            product["is_available"] = new_quantity > 0
-            
-            self.inventory_logs.append({
-                "product_id": product_id,
-                "old_quantity": current_quantity,
-                "new_quantity": new_quantity,
-                "quantity_change": quantity_change,
-                "reason": reason,
-                "timestamp": datetime.utcnow().isoformat()
-            })
-            
+            product_id = _uuid(product_id)
+            result = await self._apply(
+                lambda: self.store.adjust(product_id, quantity_change, reason), [product_id]
+            )
+
+            if result.status == "missing":
+                return {"success": False, "error": f"Product {product_id} not found", "product_id": str(product_id)}
+            if result.status == "insufficient":
+                return {"success": False, "error": f"Insufficient stock. Current: {result.available}, Change: {quantity_change}"}
+
             return {
                 "success": True,
                 "product_id": str(product_id),
-                "old_quantity": current_quantity,
-                "new_quantity": new_quantity,
+                "old_quantity": result.old_quantities[product_id],
+                "new_quantity": result.quantities[product_id],
                 "change": quantity_change,
                 "reason": reason,
                 "message": "Inventory updated"
             }
-            
+
         except Exception as e:
             return {"success": False, "error": str(e), "product_id": str(product_id)}
-    
+
+    async def restock(self, product_id: UUID, quantity: int, reason: str = "restock") -> Dict[str, Any]:
+        return await self.update_quantity(product_id=product_id, quantity_change=quantity, reason=reason)
+
+    async def reserve_items(
+        self,
+        items: Iterable[Tuple[Union[UUID, str], int]],
+        order_id: Optional[Union[UUID, str]] = None,
+        reason: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Зарезервировать все позиции заказа [(product_id, количество)] или ни одной"""
+        reason = reason or f"reservation_for_order_{order_id}"
+        totals: Dict[UUID, int] = {}
+        for product_id, quantity in items:
+            product_id = _uuid(product_id)
+            totals[product_id] = totals.get(product_id, 0) + quantity
+
+        try:
+            result = await self._apply(
+                lambda: self.store.reserve(totals, reason),
+                list(totals),
+            )
+        except Exception as e:
+            return {"success": False, "error": str(e), "order_id": str(order_id) if order_id else None}
+
+        if result.status == "missing":
+            return {
+                "success": False,
+                "error": f"Product {result.product_id} not found",
+                "product_id": str(result.product_id),
+                "order_id": str(order_id) if order_id else None
+            }
+        if result.status == "insufficient":
+            return {
+                "success": False,
+                "error": f"Insufficient stock for {result.product_id}. Available: {result.available}, requested: {totals[result.product_id]}",
+                "product_id": str(result.product_id),
+                "order_id": str(order_id) if order_id else None
+            }
+        return {
+            "success": True,
+            "order_id": str(order_id) if order_id else None,
+            "quantities": {str(pid): quantity for pid, quantity in result.quantities.items()},
+            "message": "Inventory reserved"
+        }
+
+    async def release_items(
+        self, items: Iterable[Tuple[Union[UUID, str], int]], reason: str
+    ) -> List[Dict[str, Any]]:
+        """Вернуть позиции на склад (отмена заказа или откат резерва)"""
+        return [
+            await self.restock(product_id, quantity, reason=reason)
+            for product_id, quantity in items
+        ]
+
+    async def change_reservation(
+        self,
+        held: Iterable[Tuple[Union[UUID, str], int]],
+        needed: Iterable[Tuple[Union[UUID, str], int]],
+        order_id: Union[UUID, str]
+    ) -> Dict[str, Any]:
+        """Перевести резерв заказа с позиций held на needed.
+
+        Резервируется только недостающая разница (все или ничего), излишек
+        возвращается на склад после успешного резерва.
+        """
+        delta: Dict[UUID, int] = {}
+        for items, sign in ((needed, 1), (held, -1)):
+            for product_id, quantity in items:
+                product_id = _uuid(product_id)
+                delta[product_id] = delta.get(product_id, 0) + sign * quantity
+
+        extra = [(pid, change) for pid, change in delta.items() if change > 0]
+        surplus = [(pid, -change) for pid, change in delta.items() if change < 0]
+        if extra:
+            reservation = await self.reserve_items(extra, order_id)
+            if not reservation["success"]:
+                return reservation
+        await self.release_items(surplus, reason=f"reservation_update_for_order_{order_id}")
+        return {
+            "success": True,
+            "order_id": str(order_id),
+            "reserved": {str(pid): quantity for pid, quantity in extra},
+            "released": {str(pid): quantity for pid, quantity in surplus},
+            "message": "Reservation updated"
+        }
+
     async def reserve_product(self, product_id: UUID, quantity: int, order_id: UUID) -> Dict[str, Any]:
-        return await self.update_quantity(product_id=product_id, quantity_change=-quantity, reason=f"reservation_for_order_{order_id}")
\ No newline at end of file
+        return await self.reserve_items([(product_id, quantity)], order_id)
@@ -0,0 +1,149 @@
+"""Перенос журнала остатков из Redis в БД.
+
+InventoryService меняет остатки в Redis и дописывает каждое изменение в
+журнал stock:log. Синхронизатор пачками забирает журнал и в одной
+транзакции:
+
+- вставляет записи в inventory_logs (уже сохраненные id пропускаются,
+  поэтому повторная обработка пачки после сбоя безопасна);
+- записывает в products.quantity последний новый остаток каждого продукта
+  из пачки - абсолютное значение, а не приращение, тоже идемпотентно.
+
+После коммита записи этих продуктов удаляются из кэша CacheService: в них
+хранится остаток.
+
+Пачка подтверждается в Redis только после коммита. Если БД отвергает
+пачку из-за данных (PERMANENT_ERRORS: нарушение ограничений, битая
+запись, удаленный продукт), записи сохраняются по одной, а отвергнутые откладываются в
+stock:log:dead (StockStore.dead_letters) - одна плохая запись не
+останавливает перенос. Сбои соединения не откладывают ничего: пачка
+повторяется на следующем проходе. Проход выполняется под
+арендой LeaseLock, поэтому синхронизатор можно запускать в каждом воркере:
+журнал разбирает только один из них.
+
+Запуск: фоновая задача приложения (INVENTORY_SYNC_ON_STARTUP=1, по
+умолчанию) или python scripts/sync_inventory.py.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.db.session import AsyncSessionLocal
+from app.redis.lock import LeaseLock
+from app.redis.stock import StockStore
+from app.repositories.inventory_log_repository import InventoryLogRepository
+from app.repositories.product_repository import ProductRepository
+from app.services.cache_service import cache_service
+
+INVENTORY_SYNC_BATCH_SIZE = int(os.getenv("INVENTORY_SYNC_BATCH_SIZE", "500"))
+# пауза между проходами, когда журнал пуст, секунды
+INVENTORY_SYNC_INTERVAL = float(os.getenv("INVENTORY_SYNC_INTERVAL", "1.0"))
+INVENTORY_SYNC_ON_STARTUP = os.getenv("INVENTORY_SYNC_ON_STARTUP", "1") == "1"
+INVENTORY_SYNC_LOCK_TTL = int(os.getenv("INVENTORY_SYNC_LOCK_TTL", "60"))
+
+# ошибки, при которых повтор той же записи не поможет; StaleDataError -
+# UPDATE остатка продукта, которого уже нет в таблице
+PERMANENT_ERRORS = (IntegrityError, DataError, StaleDataError, KeyError, TypeError, ValueError)
+
+
+class InventorySyncer:
+    """Синхронизация остатков и журнала инвентаря из Redis в БД"""
+
+    def __init__(
+        self,
+        store: Optional[StockStore] = None,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = INVENTORY_SYNC_BATCH_SIZE,
+        interval: float = INVENTORY_SYNC_INTERVAL,
+    ):
+        self.store = store or StockStore()
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.log_repository = InventoryLogRepository()
+        self.product_repository = ProductRepository()
+
+    async def _save(self, entries) -> int:
+        async with self.session_factory() as session:
+            ids = [UUID(entry["id"]) for entry in entries]
+            existing = await self.log_repository.get_existing_ids(session, ids)
+
+            quantities: Dict[UUID, int] = {}
+            rows = []
+            for log_id, entry in zip(ids, entries):
+                product_id = UUID(entry["product_id"])
+                quantities[product_id] = entry["new_quantity"]
+                if log_id in existing:
+                    continue
+                rows.append({
+                    "id": log_id,
+                    "product_id": product_id,
+                    "old_quantity": entry["old_quantity"],
+                    "new_quantity": entry["new_quantity"],
+                    "quantity_change": entry["quantity_change"],
+                    "reason": entry["reason"],
+                    "created_at": datetime.fromisoformat(entry["created_at"]),
+                })
+
+            await self.log_repository.bulk_create(session, rows)
+            await self.product_repository.set_quantities(session, quantities)
+            await session.commit()
+        cache_service.evict_many("product", [str(product_id) for product_id in quantities])
+        return len(rows)
+
+    async def _save_each(self, entries) -> int:
+        """Сохранить записи по одной, отвергнутые БД - в dead-letter"""
+        saved = 0
+        for entry in entries:
+            try:
+                saved += await self._save([entry])
+            except PERMANENT_ERRORS as e:
+                print(f"[InventorySync] Entry {entry.get('id')} moved to dead letters: {e}")
+                self.store.dead_letter(entry, str(e))
+        return saved
+
+    async def sync_once(self) -> int:
+        """Перенести одну пачку журнала; вернуть число обработанных записей"""
+        lock = LeaseLock("inventory_sync", ttl=INVENTORY_SYNC_LOCK_TTL, redis=self.store.redis)
+        if not lock.acquire():
+            return 0
+        try:
+            entries = self.store.drain_log(self.batch_size)
+            if not entries:
+                return 0
+            try:
+                await self._save(entries)
+            except PERMANENT_ERRORS as e:
+                print(f"[InventorySync] Batch rejected, saving entries one by one: {e}")
+                await self._save_each(entries)
+            self.store.ack_log()
+            return len(entries)
+        finally:
+            lock.release()
+
+    async def sync_all(self) -> int:
+        """Разобрать журнал до конца (перед остановкой или из скрипта)"""
+        total = 0
+        while True:
+            synced = await self.sync_once()
+            if not synced:
+                return total
+            total += synced
+
+    async def run(self) -> None:
+        """Фоновый цикл: пачки подряд, пока журнал не пуст, затем пауза"""
+        print("[InventorySync] Started")
+        while True:
+            try:
+                synced = await self.sync_once()
+            except Exception as e:
+                print(f"[InventorySync] Sync failed: {e}")
+                synced = 0
+            if synced < self.batch_size:
+                await asyncio.sleep(self.interval)
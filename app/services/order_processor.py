@@ -3,6 +3,7 @@ from uuid import UUID, uuid4
 from datetime import datetime
 
 from app.models.message_models import OrderMessage, OrderStatus
+from app.repositories.pagination import decode_cursor
 
 
 class OrderProcessor:
@@ -14,11 +15,13 @@ class OrderProcessor:
         print("OrderProcessor initialized")
         return self
     
-    async def create_order(self, order_data: OrderMessage) -> Dict[str, Any]:
+    async def create_order(
+        self, order_data: OrderMessage, order_id: Optional[UUID] = None
+    ) -> Dict[str, Any]:
         try:
             total_amount = sum(item.price * item.quantity for item in order_data.items)
             
-            order_id = uuid4()
+            order_id = order_id or uuid4()
             
             order = {
                 "id": order_id,
@@ -79,6 +82,17 @@ class OrderProcessor:
                 order["notes"] = order_data.notes
             if order_data.status:
                 order["status"] = order_data.status.value
+            if order_data.items:
+                order["items"] = order_data.items
+                order["total_amount"] = sum(item.price * item.quantity for item in order_data.items)
+                self.order_items[order_data.order_id] = [
+                    {
+                        "product_id": item.product_id,
+                        "quantity": item.quantity,
+                        "price": item.price
+                    }
+                    for item in order_data.items
+                ]
             
             order["updated_at"] = datetime.utcnow()
             
@@ -133,6 +147,18 @@ class OrderProcessor:
                 "order_id": str(order_id)
             }
     
+    async def list_orders(
+        self, limit: int, offset: int = 0, cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Заказы от новых к старым; курсор - как в app.repositories.pagination"""
+        orders = sorted(self.orders.values(), key=lambda o: (o["created_at"], o["id"]), reverse=True)
+        if cursor:
+            position = decode_cursor(cursor)
+            orders = [o for o in orders if (o["created_at"], o["id"]) < position]
+        else:
+            orders = orders[offset:]
+        return orders[:limit]
+    
     async def get_order(self, order_id: UUID) -> Optional[Dict[str, Any]]:
         if order_id not in self.orders:
             return None
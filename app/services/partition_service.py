@@ -0,0 +1,92 @@
+"""Обслуживание месячных секций daily_order_reports (PostgreSQL).
+
+Запускается ежедневно по cron: заранее создает секции на months_ahead
+месяцев вперед, чтобы вставки не попадали в DEFAULT-секцию, и
+отсоединяет или удаляет секции старше срока хранения. Удаление секции -
+это DROP TABLE без построчного DELETE, поэтому его стоимость не зависит
+от числа строк.
+
+Если таблица не секционирована (SQLite, миграция еще не применена),
+сервис ничего не делает.
+"""
+
+import os
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import (
+    create_partition,
+    detach_partition,
+    drop_partition,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+    plan_partitions,
+)
+from app.db.session import AsyncSessionLocal, use_primary
+from app.models.database_models import DailyOrderReport
+from app.services.report_cache import report_cache
+from app.services.retention_service import RETENTION_DAYS
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+
+class ReportPartitionManager:
+    """Создание будущих и удаление истекших секций отчетов"""
+
+    table = DailyOrderReport.__tablename__
+
+    def __init__(
+        self,
+        months_ahead: int = PARTITION_MONTHS_AHEAD,
+        retention_days: Optional[int] = RETENTION_DAYS,
+        detach_only: bool = False,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ):
+        self.months_ahead = months_ahead
+        self.retention_days = retention_days
+        self.detach_only = detach_only
+        self.session_factory = session_factory
+
+    async def run(self, today: Optional[date] = None, dry_run: bool = False) -> Dict[str, Any]:
+        today = today or date.today()
+        cutoff = today - timedelta(days=self.retention_days) if self.retention_days else None
+        result = {"partitioned": False, "created": [], "expired": [], "cutoff": cutoff}
+
+        async with self.session_factory() as session:
+            use_primary(session)
+            if not await is_partitioned(session, self.table):
+                print(f"Таблица {self.table} не секционирована, пропуск")
+                return result
+            result["partitioned"] = True
+
+            to_create, expired = plan_partitions(
+                await list_partitions(session, self.table), today, self.months_ahead, cutoff
+            )
+            result["created"] = [partition_name(self.table, start) for start in to_create]
+            result["expired"] = [partition.name for partition in expired]
+            if dry_run:
+                return result
+
+            # каждая секция - отдельная транзакция: ошибка одной не откатывает остальные
+            for start in to_create:
+                name = await create_partition(session, self.table, start)
+                await session.commit()
+                print(f"Создана секция {name}")
+
+            for partition in expired:
+                if self.detach_only:
+                    await detach_partition(session, self.table, partition)
+                else:
+                    await drop_partition(session, self.table, partition)
+                await session.commit()
+                print(
+                    f"Секция {partition.name} ({partition.start} - {partition.end}) "
+                    f"{'отсоединена' if self.detach_only else 'удалена'}"
+                )
+
+        if expired:
+            report_cache.bump()
+        return result
@@ -3,11 +3,13 @@ from uuid import UUID, uuid4
 from datetime import datetime
 
 from app.models.message_models import ProductMessage
+from app.services.rabbitmq_service import RabbitMQService
 
 
 class ProductProcessor:
-    def __init__(self):
+    def __init__(self, rabbitmq: Optional[RabbitMQService] = None):
         self.products = {}
+        self.rabbitmq = rabbitmq or RabbitMQService()
     
     async def initialize(self):
         print("ProductProcessor initialized")
@@ -110,6 +112,22 @@ class ProductProcessor:
             product["is_available"] = product_data.quantity > 0
             product["updated_at"] = datetime.utcnow()
             
+            # полный снимок: подписчик обновит кэш, а не просто сбросит его
+            try:
+                await self.rabbitmq.publish_event("product.updated", {
+                    "event_type": "product.updated",
+                    "product_id": str(product_data.product_id),
+                    "name": product["name"],
+                    "description": product["description"],
+                    "price": float(product["price"]),
+                    "quantity": product["quantity"],
+                    "category": product["category"],
+                    "is_available": product["is_available"],
+                    "timestamp": product["updated_at"].isoformat()
+                })
+            except Exception as e:
+                print(f"Failed to send RabbitMQ event: {e}")
+            
             return {
                 "success": True,
                 "product_id": str(product_data.product_id),
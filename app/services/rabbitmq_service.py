@@ -6,63 +6,64 @@ from app.rabbitmq.producer import RabbitMQProducer
 
 
 class RabbitMQService:
-    """Сервис для работы с RabbitMQ через FastStream"""
-    
+    """Сервис публикации доменных событий в topic-обменник RabbitMQ"""
+
     def __init__(self):
         self.producer = RabbitMQProducer()
         self.is_connected = False
-    
+
     async def connect(self):
         """Подключение к RabbitMQ"""
         try:
-            await self.producer.start()
+            await self.producer.connect()
             self.is_connected = True
-            print("RabbitMQ connected via FastStream")
+            print("RabbitMQ connected")
             return True
         except Exception as e:
             print(f"RabbitMQ connection error: {e}")
             return False
-    
+
     async def disconnect(self):
         """Отключение от RabbitMQ"""
         if self.is_connected:
-            await self.producer.stop()
+            await self.producer.close()
             self.is_connected = False
-    
+
+    async def publish_event(self, routing_key: str, event_data: Dict[str, Any]):
+        """Публикация события с ключом маршрутизации routing_key (user.created, ...)"""
+        if not self.is_connected and not await self.connect():
+            raise ConnectionError("RabbitMQ not available")
+
+        await self.producer.publish_event(routing_key, event_data)
+
     async def publish_order_created(self, order_data: Dict[str, Any]):
         """Публикация события создания заказа"""
-        if not self.is_connected:
-            await self.connect()
-        
         event_data = {
             "event_type": "order.created",
             **order_data,
             "timestamp": datetime.now().isoformat()
         }
-        
+
         try:
-            await self.producer.publish_order(event_data)
+            await self.publish_event("order.created", event_data)
             print(f"Order created event published: {order_data.get('order_id')}")
             return True
         except Exception as e:
             print(f"Failed to publish order event: {e}")
             return False
-    
+
     async def publish_user_event(self, event_type: str, user_data: Dict[str, Any]):
         """Публикация события пользователя"""
-        if not self.is_connected:
-            await self.connect()
-        
         event_data = {
             "event_type": event_type,
             **user_data,
             "timestamp": datetime.now().isoformat()
         }
-        
+
         try:
-            await self.producer.publish_user_event(event_data)
+            await self.publish_event(event_type, event_data)
             print(f"User event published: {event_type}")
             return True
         except Exception as e:
             print(f"Failed to publish user event: {e}")
-            return False
\ No newline at end of file
+            return False
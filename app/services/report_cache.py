@@ -0,0 +1,98 @@
+"""Кэш результатов отчетных эндпоинтов с инвалидацией по поколениям.
+
+Ключ результата включает имя эндпоинта, дату и два счетчика поколений:
+общий (report_gen:global) и счетчик даты (report_gen:<date>). Генерация
+отчета увеличивает счетчик своей даты, удаление старых отчетов - общий
+счетчик. Старые записи после этого просто перестают читаться и истекают по
+TTL, поэтому инвалидация не требует поиска и удаления ключей.
+
+Отчеты за прошлые даты после генерации не меняются и живут долго, для
+сегодняшней даты TTL короткий.
+"""
+
+import json
+import os
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.monitoring.metrics import record_cache_lookup
+from app.services.cache_service import cache_service
+
+REPORT_CACHE_PAST_TTL = int(os.getenv("REPORT_CACHE_PAST_TTL", str(7 * 24 * 3600)))
+REPORT_CACHE_TODAY_TTL = int(os.getenv("REPORT_CACHE_TODAY_TTL", "30"))
+
+GLOBAL_GENERATION = "report_gen:global"
+
+
+def _date_generation_key(report_date: date) -> str:
+    return f"report_gen:{report_date.isoformat()}"
+
+
+class ReportResultCache:
+    """Кэш результатов отчетов в Redis"""
+
+    def __init__(self, redis=None):
+        self._redis = redis
+
+    @property
+    def redis(self):
+        # без явного клиента берем текущий клиент cache_service при каждом
+        # обращении, а не тот, что был при импорте модуля
+        return self._redis if self._redis is not None else cache_service.redis
+
+    def ttl_for(self, report_date: date) -> int:
+        return REPORT_CACHE_TODAY_TTL if report_date >= date.today() else REPORT_CACHE_PAST_TTL
+
+    def _result_key(self, endpoint: str, report_date: date) -> str:
+        global_gen, date_gen = self.redis.mget(
+            [GLOBAL_GENERATION, _date_generation_key(report_date)]
+        )
+        return f"report:{endpoint}:{report_date.isoformat()}:{global_gen or 0}.{date_gen or 0}"
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        report_date: date,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Результат из кэша или из compute().
+
+        Ключ вычисляется до compute(): если поколение сменится во время
+        расчета, результат запишется под устаревший ключ и не будет прочитан.
+        Исключения из compute() пробрасываются и не кэшируются.
+        """
+        started = time.perf_counter()
+        try:
+            key = self._result_key(endpoint, report_date)
+            cached = self.redis.get(key)
+            record_cache_lookup("report", bool(cached), started)
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            print(f"Error getting cached report: {e}")
+            return await compute()
+
+        value = await compute()
+        if value.get("status", "success") == "success":
+            try:
+                self.redis.setex(
+                    key,
+                    self.ttl_for(report_date),
+                    json.dumps(value, ensure_ascii=False, default=str),
+                )
+            except Exception as e:
+                print(f"Error caching report: {e}")
+        return value
+
+    def bump(self, report_date: Optional[date] = None) -> None:
+        """Новое поколение для даты или (без даты) для всех отчетов"""
+        key = _date_generation_key(report_date) if report_date else GLOBAL_GENERATION
+        try:
+            self.redis.incr(key)
+        except Exception as e:
+            print(f"Error bumping report cache generation: {e}")
+
+
+# Глобальный экземпляр
+report_cache = ReportResultCache()
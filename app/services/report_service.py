@@ -6,6 +6,7 @@ from sqlalchemy import func, select
 
 from app.db.session import get_async_session
 from app.repositories.report_repository import ReportRepository
+from app.services.report_cache import report_cache
 from app.models.database_models import DailyOrderReport
 
 logger = logging.getLogger(__name__)
@@ -23,23 +24,12 @@ class ReportService:
         
         async for session in get_async_session():
             try:
-                orders = await ReportRepository.get_orders_by_date(session, report_date)
-                
-                reports_generated = 0
-                for order in orders:
-                    count_product = await ReportRepository.get_order_product_count(
-                        session, order.id
-                    )
-                    
-                    await ReportRepository.create_daily_report(
-                        session=session,
-                        report_at=report_date,
-                        order_id=order.id,
-                        count_product=count_product
-                    )
-                    
-                    reports_generated += 1
+                # замена строк за дату: повторная генерация не создает дублей
+                reports_generated = await ReportRepository.write_daily_reports(
+                    session, report_date, replace=True
+                )
                 
+                report_cache.bump(report_date)
                 logger.info(f"Сгенерировано {reports_generated} отчетов за {report_date}")
                 return {
                     "status": "success",
@@ -54,6 +44,12 @@ class ReportService:
     
     @staticmethod
     async def get_daily_report(report_date: date) -> Dict[str, Any]:
+        return await report_cache.get_or_compute(
+            "daily", report_date, lambda: ReportService._load_daily_report(report_date)
+        )
+    
+    @staticmethod
+    async def _load_daily_report(report_date: date) -> Dict[str, Any]:
         async for session in get_async_session():
             try:
                 reports = await ReportRepository.get_daily_reports(session, report_date)
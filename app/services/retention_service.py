@@ -0,0 +1,163 @@
+"""Очистка отчетов старше срока хранения.
+
+Сначала целиком удаляются секции daily_order_reports, лежащие до границы
+хранения (PostgreSQL с секционированием по report_at): DROP секции не
+порождает построчный WAL и мертвые строки. Оставшиеся строки удаляются
+пачками по диапазонам первичного ключа, каждая пачка в своей короткой
+транзакции, с паузой между пачками, чтобы не мешать рабочей нагрузке и
+репликам.
+
+После каждой пачки прогресс пишется в файл контрольной точки. Повторный
+запуск с той же границей продолжает удаление с последнего id, а не
+просматривает индекс заново с начала.
+"""
+
+import asyncio
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import drop_partition, expired_partitions
+from app.db.session import AsyncSessionLocal, use_primary
+from app.models.database_models import DailyOrderReport
+from app.repositories.report_repository import ReportRepository
+from app.services.report_cache import report_cache
+
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "5000"))
+RETENTION_PAUSE = float(os.getenv("RETENTION_PAUSE", "0.2"))
+RETENTION_CHECKPOINT = os.getenv("RETENTION_CHECKPOINT", "./retention_checkpoint.json")
+
+REPORTS_TABLE = DailyOrderReport.__tablename__
+
+
+class ReportRetentionService:
+    """Удаление отчетов старше days_old дней"""
+
+    def __init__(
+        self,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        pause: float = RETENTION_PAUSE,
+        checkpoint_path: Optional[str] = RETENTION_CHECKPOINT,
+        drop_partitions: bool = True,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.checkpoint_path = checkpoint_path
+        self.drop_partitions = drop_partitions
+        self.session_factory = session_factory
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, state: Dict[str, Any]) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self) -> None:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    async def count_expired(self, cutoff: date) -> int:
+        async with self.session_factory() as session:
+            result = await use_primary(session).execute(
+                select(func.count()).where(DailyOrderReport.report_at < cutoff)
+            )
+            return result.scalar()
+
+    async def run(
+        self,
+        days_old: int = RETENTION_DAYS,
+        max_batches: Optional[int] = None,
+        dry_run: bool = False,
+        today: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Один проход очистки; max_batches ограничивает длительность запуска"""
+        cutoff = (today or date.today()) - timedelta(days=days_old)
+
+        dropped: List[str] = []
+        if self.drop_partitions:
+            async with self.session_factory() as session:
+                use_primary(session)
+                for partition in await expired_partitions(session, REPORTS_TABLE, cutoff):
+                    dropped.append(partition.name)
+                    if not dry_run:
+                        await drop_partition(session, REPORTS_TABLE, partition)
+                        await session.commit()
+                        print(f"Удалена секция {partition.name} ({partition.start} - {partition.end})")
+
+        if dry_run:
+            return {
+                "cutoff": cutoff,
+                "dry_run": True,
+                "partitions": dropped,
+                "rows": await self.count_expired(cutoff),
+            }
+
+        checkpoint = self.load_checkpoint()
+        if checkpoint and checkpoint["cutoff"] == cutoff.isoformat():
+            last_id = UUID(checkpoint["last_id"])
+            deleted, batches = checkpoint["deleted"], checkpoint["batches"]
+            print(f"Продолжение очистки с id {last_id} (уже удалено {deleted})")
+        else:
+            last_id, deleted, batches = None, 0, 0
+
+        run_deleted = 0
+        run_batches = 0
+        finished = False
+        async with self.session_factory() as session:
+            use_primary(session)
+            while max_batches is None or run_batches < max_batches:
+                count, batch_last = await ReportRepository.delete_batch(
+                    session, cutoff, last_id, self.batch_size
+                )
+                await session.commit()
+                if batch_last is None:
+                    finished = True
+                    break
+
+                last_id = batch_last
+                deleted += count
+                run_deleted += count
+                batches += 1
+                run_batches += 1
+                self._save_checkpoint({
+                    "cutoff": cutoff.isoformat(),
+                    "last_id": str(last_id),
+                    "deleted": deleted,
+                    "batches": batches,
+                    "updated_at": datetime.now().isoformat(),
+                })
+                if self.pause:
+                    await asyncio.sleep(self.pause)
+
+        if finished:
+            self._clear_checkpoint()
+        if run_deleted or dropped:
+            # удаление затрагивает много дат - сбрасываем кэш всех отчетов
+            report_cache.bump()
+
+        print(
+            f"Очистка до {cutoff}: удалено {deleted} строк за {batches} пачек, "
+            f"секций удалено {len(dropped)}{'' if finished else ' (не завершено)'}"
+        )
+        return {
+            "cutoff": cutoff,
+            "deleted": deleted,
+            "batches": batches,
+            "partitions_dropped": dropped,
+            "finished": finished,
+        }
@@ -0,0 +1,72 @@
+"""Однократное выполнение фоновых задач по ключу (задача, дата).
+
+run_once защищает задачу от повторного запуска репликами планировщика и
+воркеров и от наложения запусков на следующий тик cron:
+
+1. если ключ выполнения task_done:<task>:<date> уже есть, задача пропускается;
+2. иначе берется аренда LeaseLock task:<task>:<date>; не удалось - задачу
+   прямо сейчас выполняет другой воркер;
+3. под блокировкой ключ выполнения проверяется повторно, затем задача
+   выполняется, а аренда продлевается в фоне, пока задача работает;
+4. успешный результат записывает ключ выполнения на TASK_DEDUP_TTL.
+
+Ошибка задачи ключ не записывает, поэтому следующий запуск ее повторит.
+"""
+
+import asyncio
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict
+
+from app.redis.client import get_redis
+from app.redis.lock import LOCK_TTL_SECONDS, LeaseLock
+
+TASK_DEDUP_TTL = int(os.getenv("TASK_DEDUP_TTL", str(3 * 24 * 3600)))
+
+
+def dedup_key(task: str, run_date: date) -> str:
+    return f"task_done:{task}:{run_date.isoformat()}"
+
+
+async def _keep_alive(lock: LeaseLock) -> None:
+    while True:
+        await asyncio.sleep(lock.ttl / 3)
+        if not lock.extend():
+            print(f"[TaskGuard] Lease {lock.key} lost")
+            return
+
+
+async def run_once(
+    task: str,
+    run_date: date,
+    func: Callable[[], Awaitable[Dict[str, Any]]],
+    ttl: int = LOCK_TTL_SECONDS,
+    redis=None,
+) -> Dict[str, Any]:
+    """Выполнить func() не более одного раза для (task, run_date)"""
+    redis = redis if redis is not None else get_redis()
+    key = dedup_key(task, run_date)
+    if redis.get(key):
+        return {"status": "duplicate", "task": task, "date": run_date.isoformat()}
+
+    lock = LeaseLock(f"task:{task}:{run_date.isoformat()}", ttl=ttl, redis=redis)
+    if not lock.acquire():
+        return {"status": "locked", "task": task, "date": run_date.isoformat()}
+
+    heartbeat = asyncio.create_task(_keep_alive(lock))
+    try:
+        if redis.get(key):
+            return {"status": "duplicate", "task": task, "date": run_date.isoformat()}
+
+        result = await func()
+        if result.get("status", "success") == "success":
+            redis.set(
+                key,
+                json.dumps({"finished_at": datetime.now().isoformat(), "token": lock.token}),
+                ex=TASK_DEDUP_TTL,
+            )
+        return result
+    finally:
+        heartbeat.cancel()
+        lock.release()
@@ -154,8 +154,8 @@ def test_ttl_functionality():
     requests.post(f"{BASE_URL}/api/v1/cache/products/temp_456", json=test_product)
     
     print("Данные закэшированы с разным TTL:")
-    print("  - Пользователь: 1 час (3600 секунд)")
-    print("  - Продукт: 10 минут (600 секунд)")
+    print("  - Пользователь: USER_CACHE_TTL (по умолчанию 24 часа)")
+    print("  - Продукт: PRODUCT_CACHE_TTL (по умолчанию 6 часов)")
     
     # Проверяем TTL
     response = requests.get(f"{BASE_URL}/api/v1/cache/users/temp_123")
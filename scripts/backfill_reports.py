@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Пересборка отчетов за диапазон дат параллельно по дням.
+
+Пример:
+    python scripts/backfill_reports.py --start 2024-01-01 --end 2024-12-31 --concurrency 8
+    python scripts/backfill_reports.py --start 2024-01-01 --end 2024-12-31 --skip-existing
+"""
+import sys
+import os
+import argparse
+import asyncio
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.backfill_service import (
+    BACKFILL_CHECKPOINT,
+    BACKFILL_CHUNK_SIZE,
+    BACKFILL_CONCURRENCY,
+    ReportBackfillService,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY, help="дней одновременно")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", default=BACKFILL_CHECKPOINT)
+    parser.add_argument("--no-resume", action="store_true", help="игнорировать контрольную точку")
+    parser.add_argument(
+        "--skip-existing", action="store_true",
+        help="не трогать дни, где отчеты уже есть (по умолчанию они пересобираются)",
+    )
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    service = ReportBackfillService(
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        replace=not args.skip_existing,
+    )
+    result = await service.run(args.start, args.end, resume=not args.no_resume)
+
+    print(f"Дней обработано: {result['days']} (из контрольной точки: {result['resumed_days']})")
+    print(f"Создано отчетов: {result['reports']}")
+    if result["skipped"]:
+        print(f"Пропущено дней с готовыми отчетами: {len(result['skipped'])}")
+    if result["failed"]:
+        for day, error in result["failed"].items():
+            print(f"ОШИБКА {day}: {error}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""Офлайн-бенчмарк API, кэша и обработки событий.
+
+Все выполняется в одном процессе и не требует сервисов: приложение
+Litestar (app.main.create_app) вызывается через AsyncTestClient, вместо Redis - MockRedis, вместо
+RabbitMQ - локальная заглушка брокера, доставляющая события подпискам
+EventConsumer с подтверждениями как у aio_pika. БД - временный файл SQLite
+(или --database-url), перед прогоном заполняется данными.
+
+Для каждого сценария считаются p50/p99/среднее и пропускная способность.
+Результаты сохраняются в JSON; --compare сравнивает прогон с прошлым и
+завершается с кодом 1, если p99 какого-либо сценария вырос больше
+--threshold.
+
+Пример:
+    python scripts/benchmark_suite.py --iterations 500 --concurrency 10
+    python scripts/benchmark_suite.py --only cache consumer \\
+        --output bench/new.json --compare bench/base.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCENARIOS = ("users", "products", "reports", "cache", "consumer")
+REPORT_DATE = date(2024, 1, 15)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0, "errors": errors, "p50_ms": 0.0, "p99_ms": 0.0,
+                "mean_ms": 0.0, "max_ms": 0.0, "throughput_per_s": 0.0}
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+        "throughput_per_s": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def measure(
+    operation: Callable[[int], Awaitable[bool]], iterations: int, concurrency: int
+) -> Dict[str, float]:
+    """Выполнить operation(i) iterations раз в concurrency потоков"""
+    samples: List[float] = []
+    errors = 0
+    counter = iter(range(iterations))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            ok = await operation(i)
+            samples.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started, errors)
+
+
+def measure_sync(operation: Callable[[int], object], iterations: int) -> Dict[str, float]:
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        op_started = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - op_started)
+    return summarize(samples, time.perf_counter() - started)
+
+
+class StubMessage:
+    """Сообщение заглушки брокера с интерфейсом подтверждений aio_pika"""
+
+    redelivered = False
+
+    def __init__(self, routing_key: str, body: bytes, on_settle: Callable[["StubMessage", bool], None]):
+        self.routing_key = routing_key
+        self.body = body
+        self.published_at = time.perf_counter()
+        self._on_settle = on_settle
+
+    async def ack(self):
+        self._on_settle(self, True)
+
+    async def nack(self, requeue: bool = True):
+        self._on_settle(self, False)
+
+    async def reject(self, requeue: bool = False):
+        self._on_settle(self, False)
+
+
+class LocalBroker:
+    """Заглушка topic-обменника: доставляет сообщения подпискам EventConsumer"""
+
+    def __init__(self, consumer):
+        self.consumer = consumer
+        self.samples: List[float] = []
+        self.errors = 0
+        self._pending: set = set()
+
+    def _settle(self, message: StubMessage, ok: bool) -> None:
+        self.samples.append(time.perf_counter() - message.published_at)
+        self.errors += not ok
+
+    def publish(self, routing_key: str, event: dict) -> None:
+        from app.services.event_consumer import topic_matches
+
+        body = json.dumps(event).encode()
+        for subscription in self.consumer.subscriptions:
+            if topic_matches(subscription.routing_key, routing_key):
+                message = StubMessage(routing_key, body, self._settle)
+                task = asyncio.create_task(self.consumer._on_message(subscription, message))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    async def drain(self) -> None:
+        while self._pending:
+            await asyncio.gather(*list(self._pending))
+        await self.consumer.flush()
+
+
+def configure_environment(database_url: Optional[str]) -> None:
+    """БД и Redis для прогона; вызывается до импорта модулей app"""
+    if database_url is None:
+        database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+
+    import app.redis.client as redis_client
+
+    redis_client._redis_client = redis_client.MockRedis()
+
+
+async def seed(engine, users: int, products: int, orders: int, rng: random.Random):
+    from sqlalchemy import insert
+
+    from app.models import Address, Base, Order, Product, User
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        user_rows = [
+            {"id": uuid4(), "username": f"bench_{i}", "email": f"bench_{i}@example.com"}
+            for i in range(users)
+        ]
+        address_rows = [
+            {"id": uuid4(), "user_id": row["id"], "street": "Main", "city": "Kazan",
+             "province": "TA", "zip_code": "420000", "country": "RU"}
+            for row in user_rows
+        ]
+        product_rows = [
+            {"id": uuid4(), "name": f"Product {i}", "description": "", "price": 10.0 + i,
+             "quantity": rng.randint(0, 100)}
+            for i in range(products)
+        ]
+        start = datetime.combine(REPORT_DATE, datetime.min.time())
+        order_rows = []
+        for _ in range(orders):
+            owner = rng.randrange(users)
+            order_rows.append({
+                "id": uuid4(),
+                "user_id": user_rows[owner]["id"],
+                "address_id": address_rows[owner]["id"],
+                "product_id": rng.choice(product_rows)["id"],
+                "quantity": rng.randint(1, 5),
+                "created_at": start + timedelta(seconds=rng.randrange(86400)),
+            })
+
+        for model, rows in ((User, user_rows), (Address, address_rows),
+                            (Product, product_rows), (Order, order_rows)):
+            await conn.execute(insert(model), rows)
+
+    return [row["id"] for row in user_rows]
+
+
+async def bench_users(client, user_ids, args, rng):
+    created = []
+
+    async def create(i):
+        response = await client.post(
+            "/api/users/", json={"username": f"new_{i}_{uuid4().hex[:8]}", "email": f"new_{i}@example.com"}
+        )
+        if response.status_code < 300:
+            created.append(response.json()["user"]["id"])
+        return response.status_code < 300
+
+    async def get(i):
+        return (await client.get(f"/api/users/{rng.choice(user_ids)}")).status_code == 200
+
+    async def listing(i):
+        return (await client.get(f"/api/users/?per_page=20&page={i % 5 + 1}")).status_code == 200
+
+    async def update(i):
+        response = await client.put(f"/api/users/{created[i % len(created)]}", json={"description": f"v{i}"})
+        return response.status_code == 200
+
+    async def remove(i):
+        return (await client.delete(f"/api/users/{created[i]}")).status_code == 200
+
+    results = {"users.create": await measure(create, args.iterations, args.concurrency)}
+    results["users.get"] = await measure(get, args.iterations, args.concurrency)
+    results["users.list"] = await measure(listing, args.iterations, args.concurrency)
+    if not created:
+        # обновлять и удалять нечего - не выдаем пустые замеры за результат
+        print("[users] no users were created, update/delete skipped")
+        return results
+    results["users.update"] = await measure(update, args.iterations, args.concurrency)
+    results["users.delete"] = await measure(remove, len(created), args.concurrency)
+    return results
+
+
+async def bench_products(client, args):
+    async def listing(i):
+        response = await client.get(f"/api/v1/products/?limit=50&offset={i % 4 * 50}")
+        return response.status_code == 200
+
+    async def listing_not_modified(i):
+        response = await client.get("/api/v1/products/?limit=50", headers={"If-None-Match": etag})
+        return response.status_code == 304
+
+    results = {"products.list": await measure(listing, args.iterations, args.concurrency)}
+    etag = (await client.get("/api/v1/products/?limit=50")).headers["etag"]
+    results["products.list_304"] = await measure(listing_not_modified, args.iterations, args.concurrency)
+    return results
+
+
+async def bench_reports(client, args):
+    from app.services.report_cache import report_cache
+    from app.services.report_service import ReportService
+
+    async def generate(i):
+        result = await ReportService.generate_daily_order_report(REPORT_DATE)
+        return result["status"] == "success"
+
+    async def summary(i):
+        response = await client.get(f"/report/summary?report_date={REPORT_DATE.isoformat()}")
+        return response.status_code == 200
+
+    async def summary_uncached(i):
+        report_cache.bump(REPORT_DATE)
+        return await summary(i)
+
+    # генерация за одну дату заменяет строки отчета, поэтому последовательно
+    results = {"reports.generate": await measure(generate, args.report_iterations, 1)}
+    results["reports.summary"] = await measure(summary, args.iterations, 1)
+    results["reports.summary_uncached"] = await measure(summary_uncached, args.report_iterations, 1)
+    return results
+
+
+def bench_cache(args, rng):
+    from app.services.cache_service import cache_service
+
+    payload = {"name": "Product", "price": 10.0, "quantity": 5, "description": "x" * 200}
+    keys = [str(uuid4()) for _ in range(256)]
+    return {
+        "cache.set": measure_sync(lambda i: cache_service.cache_product_data(keys[i % 256], payload), args.iterations),
+        "cache.get_hit": measure_sync(lambda i: cache_service.get_cached_product(keys[i % 256]), args.iterations),
+        "cache.get_miss": measure_sync(lambda i: cache_service.get_cached_product(f"missing-{i}"), args.iterations),
+    }
+
+
+async def bench_consumer(args):
+    from app.services.event_consumer import EventConsumer, register_default_handlers
+
+    results = {}
+    for routing_key, make_event in (
+        ("user.created", lambda i: {"user_id": str(uuid4()), "username": f"u{i}", "email": f"u{i}@example.com"}),
+        ("order.created", lambda i: {"order_id": str(uuid4()), "product_id": str(uuid4()), "quantity": 1,
+                                     "total_amount": 9.99, "timestamp": datetime.now().isoformat()}),
+        ("product.updated", lambda i: {"product_id": str(uuid4()), "name": "P", "price": 1.0, "quantity": 1}),
+    ):
+        broker = LocalBroker(register_default_handlers(EventConsumer()))
+        started = time.perf_counter()
+        for i in range(args.events):
+            broker.publish(routing_key, make_event(i))
+        await broker.drain()
+        results[f"consumer.{routing_key}"] = summarize(
+            broker.samples, time.perf_counter() - started, broker.errors
+        )
+    return results
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    import logging
+
+    from litestar.testing import AsyncTestClient
+
+    from app.db.session import engine
+    from app.main import create_app
+
+    engine.echo = False
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    user_ids = await seed(engine, args.users, args.products, args.orders, rng)
+    app = create_app()
+
+    results = {}
+    async with AsyncTestClient(app=app) as client:
+        if "users" in args.only:
+            results.update(await bench_users(client, user_ids, args, rng))
+        if "products" in args.only:
+            results.update(await bench_products(client, args))
+        if "reports" in args.only:
+            results.update(await bench_reports(client, args))
+    if "cache" in args.only:
+        results.update(bench_cache(args, rng))
+    if "consumer" in args.only:
+        results.update(await bench_consumer(args))
+
+    await engine.dispose()
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path: str, threshold: float) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n{'сценарий':<28} {'p99 было':>10} {'p99 стало':>10} {'изменение':>10}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous["p99_ms"]:
+            continue
+        change = current["p99_ms"] / previous["p99_ms"] - 1
+        flag = "  РЕГРЕССИЯ" if change > threshold else ""
+        print(f"{name:<28} {previous['p99_ms']:>10.3f} {current['p99_ms']:>10.3f} {change:>+10.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=200, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--report-iterations", type=int, default=20, help="генераций отчета")
+    parser.add_argument("--events", type=int, default=2000, help="событий на ключ маршрутизации")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=5000, help="заказов за дату отчета")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="по умолчанию временный файл SQLite")
+    parser.add_argument("--output", default=f"benchmark-results/{datetime.now():%Y%m%d-%H%M%S}.json")
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимый рост p99 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    results = asyncio.run(run(args))
+
+    print(f"\n{'сценарий':<28} {'n':>6} {'p50, ms':>9} {'p99, ms':>9} {'оп/с':>9} {'ошибки':>7}")
+    for name, stats in results.items():
+        print(
+            f"{name:<28} {stats['count']:>6} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+            f"{stats['throughput_per_s']:>9.1f} {stats['errors']:>7}"
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "meta": {
+                    "timestamp": datetime.now().isoformat(),
+                    "revision": git_revision(),
+                    "python": platform.python_version(),
+                    "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+                },
+                "results": results,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"\nРезультаты: {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
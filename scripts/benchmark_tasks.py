@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Пропускная способность задачи generate_daily_order_report.
+
+По умолчанию задачи выполняются в процессе через InMemoryBroker с
+ограничением --max-async-tasks - так видна стоимость самой задачи (БД,
+Redis-блокировка) без RabbitMQ. С --broker задачи отправляются в
+настоящий брокер app.tasks и ожидаются через хранилище результатов;
+воркеры нужно запустить отдельно (python worker.py ...).
+
+Каждая задача генерирует отчет за свой день, ключи дедупликации этих
+дней перед запуском сбрасываются. Данные: scripts/seed_data.py.
+
+Пример:
+    python scripts/benchmark_tasks.py --days 90 --max-async-tasks 1 10 50
+    python scripts/benchmark_tasks.py --days 90 --broker
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taskiq import InMemoryBroker
+
+from app.redis.client import get_redis
+from app.services.task_guard import dedup_key
+from app.tasks import broker, generate_daily_order_report
+
+TASK_NAME = "generate_daily_order_report"
+
+
+def report_dates(end: date, days: int):
+    return [end - timedelta(days=i) for i in range(days)]
+
+
+def reset_dedup(dates):
+    redis = get_redis()
+    redis.delete(*(dedup_key(TASK_NAME, day) for day in dates))
+
+
+async def run_batch(task, dates, timeout: float):
+    started = time.perf_counter()
+    kicked = await asyncio.gather(*(task.kiq(day.isoformat()) for day in dates))
+    results = await asyncio.gather(*(k.wait_result(timeout=timeout) for k in kicked))
+    elapsed = time.perf_counter() - started
+    statuses = {}
+    for result in results:
+        status = "exception" if result.is_err else result.return_value.get("status")
+        statuses[status] = statuses.get(status, 0) + 1
+    return elapsed, statuses
+
+
+def report(label, count, elapsed, statuses):
+    print(f"{label:<28} {count:6} задач {elapsed:8.2f} s {count / elapsed:8.1f} задач/с  {statuses}")
+
+
+async def bench_in_memory(dates, concurrency_levels, timeout):
+    for concurrency in concurrency_levels:
+        reset_dedup(dates)
+        memory_broker = InMemoryBroker(max_async_tasks=concurrency)
+        task = memory_broker.register_task(generate_daily_order_report.original_func, TASK_NAME)
+        await memory_broker.startup()
+        elapsed, statuses = await run_batch(task, dates, timeout)
+        await memory_broker.shutdown()
+        report(f"in-memory, {concurrency} async", len(dates), elapsed, statuses)
+
+
+async def bench_broker(dates, timeout):
+    reset_dedup(dates)
+    await broker.startup()
+    try:
+        elapsed, statuses = await run_batch(generate_daily_order_report, dates, timeout)
+    finally:
+        await broker.shutdown()
+    report("RabbitMQ + воркеры", len(dates), elapsed, statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30, help="число задач (по одной на день)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=1))
+    parser.add_argument("--max-async-tasks", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--broker", action="store_true", help="через RabbitMQ и запущенные воркеры")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    dates = report_dates(args.end, args.days)
+    if args.broker:
+        asyncio.run(bench_broker(dates, args.timeout))
+    else:
+        asyncio.run(bench_in_memory(dates, args.max_async_tasks, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,71 @@
 #!/usr/bin/env python3
+"""Очистка отчетов старше срока хранения пачками по диапазонам id.
+
+Пример:
+    python scripts/clean_old_reports.py --days 90 --batch-size 5000 --pause 0.2
+    python scripts/clean_old_reports.py --dry-run
+"""
 import sys
 import os
+import argparse
 import asyncio
 from datetime import date
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.repositories.report_repository import ReportRepository
-from app.db.session import get_async_session
+from app.services.retention_service import (
+    RETENTION_BATCH_SIZE,
+    RETENTION_CHECKPOINT,
+    RETENTION_DAYS,
+    RETENTION_PAUSE,
+    ReportRetentionService,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=RETENTION_PAUSE, help="пауза между пачками, с")
+    parser.add_argument("--max-batches", type=int, default=None, help="остановиться после N пачек")
+    parser.add_argument("--checkpoint", default=RETENTION_CHECKPOINT)
+    parser.add_argument("--no-partitions", action="store_true", help="не удалять секции целиком")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать")
+    return parser.parse_args()
 
 async def main():
+    args = parse_args()
     print("CRON: Очистка старых отчетов")
-    
+
     try:
-        async for session in get_async_session():
-            deleted = await ReportRepository.delete_old_reports(session, days_old=90)
-            
-            print(f"УДАЛЕНО: {deleted} старых отчетов (старше 90 дней)")
-            
-            with open("/var/log/cron_clean.log", "a") as f:
-                f.write(f"{date.today().isoformat()} | CLEANED | {deleted} reports\n")
-            
+        service = ReportRetentionService(
+            batch_size=args.batch_size,
+            pause=args.pause,
+            checkpoint_path=args.checkpoint,
+            drop_partitions=not args.no_partitions,
+        )
+        result = await service.run(args.days, max_batches=args.max_batches, dry_run=args.dry_run)
+
+        if args.dry_run:
+            print(
+                f"К УДАЛЕНИЮ: {result['rows']} отчетов старше {result['cutoff']}, "
+                f"секции: {', '.join(result['partitions']) or 'нет'}"
+            )
             sys.exit(0)
-            
+
+        print(f"УДАЛЕНО: {result['deleted']} старых отчетов (старше {args.days} дней)")
+
+        with open("/var/log/cron_clean.log", "a") as f:
+            f.write(
+                f"{date.today().isoformat()} | CLEANED | {result['deleted']} reports"
+                f" | {len(result['partitions_dropped'])} partitions"
+                f"{'' if result['finished'] else ' | PARTIAL'}\n"
+            )
+
+        sys.exit(0)
+
     except Exception as e:
         print(f"ОШИБКА: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
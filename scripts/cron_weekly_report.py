@@ -6,6 +6,7 @@ from datetime import date, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.services.analytics_service import AnalyticsService
 from app.services.report_service import ReportService
 
 async def main():
@@ -22,10 +23,15 @@ async def main():
             print(f"Охвачено дней: {result['days_count']}")
             
             if result["summary"]:
-                total_orders = sum(day["total_orders"] for day in result["summary"])
-                total_products = sum(day["total_products"] for day in result["summary"])
-                print(f"Всего заказов: {total_orders}")
-                print(f"Всего продукции: {total_products}")
+                stats = await AnalyticsService.report_stats(start_date, end_date, top_n=0)
+                overall = stats.get("overall", {})
+                print(f"Всего заказов: {overall.get('count', 0)}")
+                print(f"Всего продукции: {overall.get('sum', 0)}")
+                if overall.get("count"):
+                    print(
+                        f"Продукции на заказ: медиана {overall['p50']:.1f}, "
+                        f"p95 {overall['p95']:.1f}, std {overall['std']:.2f}"
+                    )
             
             with open("/var/log/cron_weekly_report.log", "a") as f:
                 f.write(f"{date.today().isoformat()} | WEEKLY | {result}\n")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Выгрузка daily_order_reports и orders в Parquet / Arrow IPC.
+
+Пример:
+    python scripts/export_reports.py --start 2024-01-01 --end 2024-01-31
+    python scripts/export_reports.py --dataset orders --incremental   # из cron
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.export_service import DATASETS, EXPORT_BATCH_SIZE, EXPORT_DIR, ReportExportService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dataset", choices=[*DATASETS, "all"], default="daily_order_reports"
+    )
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--output", default=EXPORT_DIR)
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument("--no-partition", action="store_true", help="один файл без каталогов по датам")
+    parser.add_argument(
+        "--incremental", action="store_true", help="только строки новее сохраненного водяного знака"
+    )
+    args = parser.parse_args()
+
+    service = ReportExportService(
+        root=args.output,
+        fmt=args.format,
+        partition=not args.no_partition,
+        batch_size=args.batch_size,
+    )
+    datasets = list(DATASETS) if args.dataset == "all" else [args.dataset]
+
+    try:
+        for name in datasets:
+            await service.export(name, args.start, args.end, incremental=args.incremental)
+    except Exception as e:
+        print(f"ОШИБКА: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Обслуживание месячных секций daily_order_reports.
+
+Создает секции на --months-ahead месяцев вперед и удаляет (или с
+--detach-only отсоединяет) секции старше --retention-days дней.
+
+Пример:
+    python scripts/manage_partitions.py --months-ahead 3 --retention-days 90
+    python scripts/manage_partitions.py --dry-run
+"""
+import sys
+import os
+import argparse
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.partition_service import PARTITION_MONTHS_AHEAD, ReportPartitionManager
+from app.services.retention_service import RETENTION_DAYS
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument(
+        "--retention-days", type=int, default=RETENTION_DAYS,
+        help="0 - не трогать старые секции",
+    )
+    parser.add_argument("--detach-only", action="store_true", help="отсоединять, а не удалять")
+    parser.add_argument("--dry-run", action="store_true", help="только показать план")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    print("CRON: Обслуживание секций отчетов")
+
+    try:
+        manager = ReportPartitionManager(
+            months_ahead=args.months_ahead,
+            retention_days=args.retention_days or None,
+            detach_only=args.detach_only,
+        )
+        result = await manager.run(dry_run=args.dry_run)
+
+        print(f"НОВЫЕ СЕКЦИИ: {', '.join(result['created']) or 'нет'}")
+        print(f"ИСТЕКШИЕ (до {result['cutoff']}): {', '.join(result['expired']) or 'нет'}")
+        sys.exit(0)
+
+    except Exception as e:
+        print(f"ОШИБКА: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Перенос журнала остатков из Redis в БД (inventory_logs и products.quantity).
+
+Пример:
+    python scripts/sync_inventory.py            # разобрать журнал и выйти
+    python scripts/sync_inventory.py --follow   # работать постоянно
+"""
+import sys
+import os
+import argparse
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.inventory_sync import (
+    INVENTORY_SYNC_BATCH_SIZE,
+    INVENTORY_SYNC_INTERVAL,
+    InventorySyncer,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=INVENTORY_SYNC_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=INVENTORY_SYNC_INTERVAL, help="пауза при пустом журнале, с")
+    parser.add_argument("--follow", action="store_true", help="не завершаться после разбора журнала")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    syncer = InventorySyncer(batch_size=args.batch_size, interval=args.interval)
+    if args.follow:
+        await syncer.run()
+    else:
+        synced = await syncer.sync_all()
+        print(f"Synced {synced} inventory log entries")
+        dead = syncer.store.dead_letter_length()
+        if dead:
+            print(f"Rejected entries in dead letters: {dead}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
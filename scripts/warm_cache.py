@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Прогрев кэша горячими продуктами и активными пользователями.
+
+Пример:
+    python scripts/warm_cache.py --products 500 --users 1000 --days 30
+    python scripts/warm_cache.py --chunk-size 100 --pause 0.2   # бережнее к БД
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cache_warmer import (
+    CACHE_WARMUP_CHUNK_SIZE,
+    CACHE_WARMUP_DAYS,
+    CACHE_WARMUP_PAUSE,
+    CACHE_WARMUP_PRODUCTS,
+    CACHE_WARMUP_USERS,
+    CacheWarmer,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=CACHE_WARMUP_PRODUCTS, help="топ-N продуктов по заказам")
+    parser.add_argument("--users", type=int, default=CACHE_WARMUP_USERS, help="недавно активных пользователей")
+    parser.add_argument("--days", type=int, default=CACHE_WARMUP_DAYS, help="период активности, дней")
+    parser.add_argument("--chunk-size", type=int, default=CACHE_WARMUP_CHUNK_SIZE)
+    parser.add_argument("--pause", type=float, default=CACHE_WARMUP_PAUSE, help="пауза между пачками, с")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    warmer = CacheWarmer(
+        products=args.products,
+        users=args.users,
+        days=args.days,
+        chunk_size=args.chunk_size,
+        pause=args.pause,
+    )
+    result = await warmer.run()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
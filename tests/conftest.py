@@ -1,4 +1,5 @@
 import pytest
+import pytest_asyncio
 import asyncio
 import sys
 import os
@@ -8,12 +9,19 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from litestar.testing import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from litestar import Litestar
+from litestar.di import Provide
+from litestar.testing import AsyncTestClient, TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.controllers.user_controller import UserController
+from app.db.query_counter import QueryCounter
 from app.main import app
 from app.models import Base
+from app.redis.client import MockRedis
 from app.repositories.user_repository import UserRepository
+from app.services.cache_service import CacheService, cache_service
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -104,3 +112,70 @@ def order_repository(session):
     repo.session = session
     return repo
 
+
+@pytest_asyncio.fixture
+async def async_engine():
+    """Отдельная in-memory БД для каждого теста"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def async_session(async_engine):
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    async with async_session_factory() as session:
+        yield session
+
+@pytest_asyncio.fixture
+async def user_client(async_engine):
+    """AsyncTestClient для UserController поверх in-memory БД"""
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def provide_session():
+        async with session_factory() as session:
+            yield session
+
+    app = Litestar(
+        route_handlers=[UserController],
+        dependencies={"session": Provide(provide_session)},
+    )
+    async with AsyncTestClient(app=app) as client:
+        yield client
+
+@pytest.fixture
+def max_queries(async_engine):
+    """Бюджет SQL-запросов на блок: with max_queries(3): ..."""
+    return lambda limit: QueryCounter(async_engine, max_queries=limit)
+
+
+@pytest_asyncio.fixture
+async def file_session_factory(tmp_path):
+    """Фабрика сессий на временном файле SQLite: у каждой сессии свое соединение"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+@pytest.fixture
+def mock_redis():
+    return MockRedis()
+
+@pytest.fixture
+def cache(mock_redis):
+    """Отдельный CacheService поверх MockRedis"""
+    service = CacheService()
+    service.redis = mock_redis
+    return service
+
+@pytest.fixture
+def shared_cache(monkeypatch, mock_redis):
+    """Глобальный cache_service поверх MockRedis (для кода, который берет синглтон)"""
+    monkeypatch.setattr(cache_service, "redis", mock_redis)
+    return cache_service
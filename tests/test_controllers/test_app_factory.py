@@ -0,0 +1,36 @@
+from litestar.testing import TestClient
+
+from app.main import create_app
+
+
+class TestAppFactory:
+    """Сборка приложения: контроллеры, зависимости, жизненный цикл"""
+
+    def test_all_controllers_are_mounted(self):
+        paths = {route.path for route in create_app().routes}
+
+        for path in [
+            "/api/users",
+            "/api/v1/products",
+            "/api/v1/cache/users/{user_id:str}",
+            "/api/v1/cache/products/{product_id:str}",
+            "/api/v1/cache/stats",
+            "/api/v1/reports/summary",
+            "/reports/daily/summary",
+            "/report/summary",
+            "/metrics",
+        ]:
+            assert path in paths
+
+    def test_orders_are_not_mounted(self):
+        """Заказы в памяти воркера не обслуживаются приложением"""
+        paths = {route.path for route in create_app().routes}
+
+        assert not any(path.startswith("/api/v1/orders") for path in paths)
+
+    def test_services_live_for_the_whole_worker(self):
+        with TestClient(app=create_app()) as client:
+            service = client.app.state.inventory_service
+
+            assert client.get("/health").status_code == 200
+            assert client.app.state.inventory_service is service
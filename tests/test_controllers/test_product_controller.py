@@ -0,0 +1,83 @@
+import pytest
+import pytest_asyncio
+from litestar import Litestar
+from litestar.di import Provide
+from litestar.testing import AsyncTestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.controllers.product_controller import ProductController
+
+
+@pytest_asyncio.fixture
+async def product_client(async_engine):
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def provide_session():
+        async with session_factory() as session:
+            yield session
+
+    app = Litestar(
+        route_handlers=[ProductController],
+        dependencies={"session": Provide(provide_session)},
+    )
+    async with AsyncTestClient(app=app) as client:
+        yield client
+
+
+class TestProductController:
+    """Продукты читаются и создаются через БД"""
+
+    @pytest.mark.asyncio
+    async def test_created_product_is_listed_and_found(self, product_client):
+        ids = []
+        for i in range(3):
+            response = await product_client.post(
+                "/api/v1/products/",
+                json={"name": f"P{i}", "description": "", "price": 10.0, "quantity": i},
+            )
+            assert response.status_code == 201
+            ids.append(response.json()["product_id"])
+
+        response = await product_client.get(f"/api/v1/products/{ids[1]}")
+        assert response.status_code == 200
+        assert response.json()["data"]["name"] == "P1"
+
+        first = (await product_client.get("/api/v1/products/", params={"limit": 2})).json()
+        second = (
+            await product_client.get(
+                "/api/v1/products/", params={"limit": 2, "cursor": first["next_cursor"]}
+            )
+        ).json()
+        assert {p["id"] for p in first["data"] + second["data"]} == set(ids)
+        assert second["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_update_refreshes_cache(self, product_client, shared_cache):
+        product_id = (
+            await product_client.post(
+                "/api/v1/products/",
+                json={"name": "Old", "description": "", "price": 10.0, "quantity": 1},
+            )
+        ).json()["product_id"]
+        shared_cache.cache_product_data(product_id, {"id": product_id, "name": "Old"})
+
+        response = await product_client.put(
+            f"/api/v1/products/{product_id}", json={"price": 12.5}
+        )
+
+        assert response.status_code == 200
+        cached = shared_cache.get_cached_product(product_id)
+        assert (cached["name"], cached["price"]) == ("Old", 12.5)
+        missing = await product_client.put(
+            "/api/v1/products/223e4567-e89b-12d3-a456-426614174000", json={"price": 1.0}
+        )
+        assert missing.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_invalid_product(self, product_client):
+        response = await product_client.post("/api/v1/products/", json={"name": "P"})
+        assert response.status_code == 400
+        assert (await product_client.get("/api/v1/products/not-a-uuid")).status_code == 404
+        assert (
+            await product_client.get("/api/v1/products/", params={"cursor": "bad"})
+        ).status_code == 400
@@ -1,6 +1,8 @@
 import pytest
 from litestar.testing import TestClient
 
+from app.repositories.user_search_repository import UserSearchRepository
+
 class TestUserController:
     """Tests for UserController"""
     
@@ -94,4 +96,43 @@ class TestUserRepository:
             
             print("User filtering - SUCCESS")
         finally:
-            loop.close()
\ No newline at end of file
+            loop.close()
+
+class TestUserCacheInvalidation:
+    """Запись пользователя сразу сбрасывает его кэш"""
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_evict_user(self, user_client, shared_cache):
+        user_id = (
+            await user_client.post("/api/users/", json={"username": "cached", "email": "c@example.com"})
+        ).json()["user"]["id"]
+        shared_cache.cache_user_data(user_id, {"id": user_id, "username": "cached"})
+        shared_cache.cache_count("users:", 1)
+
+        await user_client.put(f"/api/users/{user_id}", json={"username": "renamed"})
+        assert shared_cache.get_cached_user(user_id) is None
+        assert shared_cache.get_cached_count("users:") == 1
+
+        shared_cache.cache_user_data(user_id, {"id": user_id, "username": "renamed"})
+        await user_client.delete(f"/api/users/{user_id}")
+        assert shared_cache.get_cached_user(user_id) is None
+        assert shared_cache.get_cached_count("users:") is None
+
+
+class TestUserSearchEndpoint:
+    """Поиск работает и на БД, созданной через create_all без FTS5"""
+
+    @pytest.mark.asyncio
+    async def test_search_without_fts_table(self, user_client, async_engine):
+        await user_client.post("/api/users/", json={"username": "abcdef", "email": "a@example.com"})
+        await user_client.post("/api/users/", json={"username": "zzz", "email": "z@example.com"})
+
+        response = await user_client.get("/api/users/search", params={"q": "abc"})
+
+        assert response.status_code == 200
+        assert [r["user"]["username"] for r in response.json()["results"]] == ["abcdef"]
+
+        async with async_engine.begin() as conn:
+            await UserSearchRepository.ensure_index(conn)
+        response = await user_client.get("/api/users/search", params={"q": "bcd"})
+        assert [r["user"]["username"] for r in response.json()["results"]] == ["abcdef"]
@@ -0,0 +1,81 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.session import make_routing_sessionmaker, use_primary
+from app.models import Base, User
+
+
+@pytest_asyncio.fixture
+async def engines(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+class TestRoutingSession:
+    """Тесты маршрутизации чтения на реплику"""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica(self, engines):
+        """Запись попадает в основную БД, чтение новой сессией - с реплики"""
+        primary, replica = engines
+        session_factory = make_routing_sessionmaker(primary, replica)
+
+        async with session_factory() as session:
+            session.add(User(username="routed", email="routed@example.com"))
+            await session.commit()
+
+        async with session_factory() as session:
+            users = (await session.execute(select(User))).scalars().all()
+            assert users == []
+
+        async with primary.connect() as conn:
+            rows = (await conn.execute(select(User.username))).all()
+            assert [row.username for row in rows] == ["routed"]
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_stays_on_primary(self, engines):
+        """После записи сессия читает из основной БД"""
+        primary, replica = engines
+        session_factory = make_routing_sessionmaker(primary, replica)
+
+        async with session_factory() as session:
+            session.add(User(username="pinned", email="pinned@example.com"))
+            await session.flush()
+            users = (await session.execute(select(User))).scalars().all()
+            assert [user.username for user in users] == ["pinned"]
+            await session.commit()
+
+        async with session_factory() as session:
+            use_primary(session)
+            users = (await session.execute(select(User))).scalars().all()
+            assert [user.username for user in users] == ["pinned"]
+
+    @pytest.mark.asyncio
+    async def test_for_update_and_writes_pin_primary(self, engines):
+        """SELECT FOR UPDATE и любая запись закрепляют сессию за основной БД"""
+        primary, replica = engines
+        session_factory = make_routing_sessionmaker(primary, replica)
+        async with session_factory() as session:
+            session.add(User(username="locked", email="locked@example.com"))
+            await session.commit()
+
+        async with session_factory() as session:
+            users = (
+                await session.execute(select(User).with_for_update())
+            ).scalars().all()
+            assert [user.username for user in users] == ["locked"]
+            assert session.info["use_primary"] is True
+
+        async with session_factory() as session:
+            session.add(User(username="second", email="second@example.com"))
+            await session.flush()
+            assert session.info["use_primary"] is True
+            await session.rollback()
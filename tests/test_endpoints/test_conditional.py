@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta
+from email.utils import format_datetime
+from uuid import uuid4
+
+import pytest
+from litestar import Request, Response, get
+from litestar.testing import create_test_client
+
+from app.endpoints.conditional import conditional_response, make_validator, table_validator
+from app.models.database_models import DailyOrderReport
+from app.repositories.report_repository import ReportRepository
+
+REPORT_DATE = date(2024, 4, 1)
+LAST_MODIFIED = datetime(2024, 4, 2, 12, 30)
+
+
+def make_client(calls):
+    validator = make_validator("test", ("a",), 1, last_modified=LAST_MODIFIED)
+
+    @get("/items")
+    async def items(request: Request) -> Response:
+        async def build() -> dict:
+            calls.append(1)
+            return {"items": [1, 2, 3]}
+
+        return await conditional_response(request, validator, build)
+
+    return create_test_client(route_handlers=[items])
+
+
+class TestConditionalRequests:
+    """ETag / Last-Modified и ответ 304"""
+
+    def test_etag_roundtrip(self):
+        calls = []
+        with make_client(calls) as client:
+            first = client.get("/items")
+            assert first.status_code == 200
+            assert first.json() == {"items": [1, 2, 3]}
+            etag = first.headers["etag"]
+            assert etag.startswith('W/"')
+
+            second = client.get("/items", headers={"If-None-Match": etag})
+            assert second.status_code == 304
+            assert second.content == b""
+            assert second.headers["etag"] == etag
+            assert calls == [1]
+
+            other = client.get("/items", headers={"If-None-Match": 'W/"other"'})
+            assert other.status_code == 200
+
+    def test_if_modified_since(self):
+        calls = []
+        with make_client(calls) as client:
+            last_modified = client.get("/items").headers["last-modified"]
+
+            assert client.get(
+                "/items", headers={"If-Modified-Since": last_modified}
+            ).status_code == 304
+
+            earlier = format_datetime(
+                datetime(2024, 1, 1).astimezone() - timedelta(days=1), usegmt=False
+            )
+            assert client.get(
+                "/items", headers={"If-Modified-Since": earlier}
+            ).status_code == 200
+
+            # If-None-Match важнее If-Modified-Since
+            assert client.get(
+                "/items",
+                headers={"If-None-Match": 'W/"other"', "If-Modified-Since": last_modified},
+            ).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_table_validator_tracks_changes(self, async_session):
+        async def validator():
+            return await table_validator(
+                async_session,
+                DailyOrderReport.created_at,
+                DailyOrderReport.report_at == REPORT_DATE,
+                tag="report",
+                params=(REPORT_DATE,),
+            )
+
+        empty = await validator()
+        assert empty.last_modified is None
+        assert empty == await validator()
+
+        await ReportRepository.bulk_create(
+            async_session,
+            [{"report_at": REPORT_DATE, "order_id": uuid4(), "count_product": 1}],
+        )
+        await async_session.commit()
+        filled = await validator()
+        assert filled.etag != empty.etag
+        assert filled.last_modified is not None
+        assert filled == await validator()
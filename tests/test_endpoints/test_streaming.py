@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from litestar.exceptions import HTTPException
+from litestar.response import Stream
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.endpoints.streaming import daily_report_response, daily_reports_query, iter_rows
+from app.repositories.report_repository import ReportRepository
+
+REPORT_DATE = date(2024, 3, 1)
+
+
+@pytest_asyncio.fixture
+async def session_factory(async_engine, async_session):
+    await ReportRepository.bulk_create(
+        async_session,
+        [
+            {"report_at": REPORT_DATE, "order_id": uuid4(), "count_product": i}
+            for i in range(25)
+        ],
+    )
+    await async_session.commit()
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class TestReportStreaming:
+    """Потоковая выгрузка отчетов"""
+
+    @pytest.mark.asyncio
+    async def test_ndjson_chunks(self, session_factory):
+        chunks = await collect(
+            iter_rows(daily_reports_query(REPORT_DATE), "ndjson", session_factory, chunk_rows=10)
+        )
+
+        assert len(chunks) == 3
+        lines = b"".join(chunks).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert sorted(row["count_product"] for row in rows) == list(range(25))
+        assert set(rows[0]) == {"id", "order_id", "count_product", "created_at"}
+
+    @pytest.mark.asyncio
+    async def test_csv_header_and_rows(self, session_factory):
+        chunks = await collect(
+            iter_rows(daily_reports_query(REPORT_DATE), "csv", session_factory)
+        )
+
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert rows[0] == ["id", "order_id", "count_product", "created_at"]
+        assert len(rows) == 26
+
+    @pytest.mark.asyncio
+    async def test_response_modes(self, session_factory, async_session):
+        page = await daily_report_response(
+            async_session, REPORT_DATE, "2024-03-01", offset=20, limit=10
+        )
+        assert page["total_reports"] == 25
+        assert len(page["reports"]) == 5
+
+        stream = await daily_report_response(async_session, REPORT_DATE, "2024-03-01", "csv")
+        assert isinstance(stream, Stream)
+
+        with pytest.raises(HTTPException):
+            await daily_report_response(async_session, date(2000, 1, 1), "2000-01-01", "ndjson")
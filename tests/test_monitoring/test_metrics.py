@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine, text
+from litestar import Controller, get
+from litestar.exceptions import NotFoundException
+from litestar.testing import create_test_client
+from prometheus_client import REGISTRY
+
+from app.db.instrumentation import instrument_engine
+from app.monitoring.metrics import MetricsMiddleware, metrics_handler
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class ItemController(Controller):
+    path = "/items"
+
+    @get("/{item_id:int}")
+    async def get_item(self, item_id: int) -> dict:
+        if item_id == 0:
+            raise NotFoundException()
+        return {"id": item_id}
+
+
+class TestMetrics:
+    """Метрики HTTP, БД и кэша"""
+
+    def test_requests_are_labelled_by_route_template(self):
+        route = "/items/{item_id:int}"
+        ok_before = sample("http_requests_total", method="GET", route=route, status="200")
+        missing_before = sample("http_requests_total", method="GET", route=route, status="404")
+
+        with create_test_client(
+            route_handlers=[ItemController, metrics_handler], middleware=[MetricsMiddleware]
+        ) as client:
+            assert client.get("/items/1").status_code == 200
+            assert client.get("/items/2").status_code == 200
+            assert client.get("/items/0").status_code == 404
+
+            response = client.get("/metrics")
+            assert response.status_code == 200
+            assert "http_request_duration_seconds_bucket" in response.text
+
+        assert sample("http_requests_total", method="GET", route=route, status="200") == ok_before + 2
+        assert sample("http_requests_total", method="GET", route=route, status="404") == missing_before + 1
+        assert sample("http_requests_in_progress", method="GET") == 0
+
+    def test_db_queries_are_counted(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine, "test")
+        instrument_engine(engine, "test")
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("select 2"))
+
+        assert sample("db_queries_total", engine="test", operation="SELECT") == 2
+        assert sample("db_query_duration_seconds_count", engine="test", operation="SELECT") == 2
+
+    def test_cache_hits_and_misses(self, cache):
+        hits = sample("cache_lookups_total", kind="product", result="hit")
+        misses = sample("cache_lookups_total", kind="product", result="miss")
+
+        cache.get_cached_product("p1")
+        cache.cache_product_data("p1", {"name": "Book"})
+        cache.get_cached_product("p1")
+
+        assert sample("cache_lookups_total", kind="product", result="hit") == hits + 1
+        assert sample("cache_lookups_total", kind="product", result="miss") == misses + 1
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+
+from litestar import get
+from litestar.testing import create_test_client
+from sqlalchemy import create_engine, text
+
+from app.db import instrumentation
+from app.db.instrumentation import capture_queries, instrument_engine
+from app.monitoring.profiling import ProfilingMiddleware
+
+engine = create_engine("sqlite://")
+instrument_engine(engine, "profiling")
+
+
+@get("/slow", sync_to_thread=False)
+def slow_handler() -> dict:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    return {"ok": True}
+
+
+def make_middleware(tmp_path, **options):
+    attrs = {"output_dir": str(tmp_path), "profiler": "cprofile", "sample_rate": 0, "token": ""}
+    attrs.update(options)
+    return type("TestProfilingMiddleware", (ProfilingMiddleware,), attrs)
+
+
+class TestProfiling:
+    """Профилирование запросов и журнал медленных запросов"""
+
+    def test_request_without_header_is_not_profiled(self, tmp_path):
+        with create_test_client(
+            route_handlers=[slow_handler], middleware=[make_middleware(tmp_path)]
+        ) as client:
+            response = client.get("/slow")
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert os.listdir(tmp_path) == []
+
+    def test_header_triggers_profile_with_queries(self, tmp_path):
+        with create_test_client(
+            route_handlers=[slow_handler], middleware=[make_middleware(tmp_path, token="secret")]
+        ) as client:
+            response = client.get("/slow", headers={"X-Profile": "secret"})
+
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+        assert response.headers["x-query-count"] == "2"
+        assert os.path.exists(tmp_path / f"{profile_id}.prof")
+
+        report = json.loads((tmp_path / f"{profile_id}.json").read_text())
+        assert report["route"] == "/slow"
+        assert report["status"] == 200
+        assert [q["sql"] for q in report["queries"]] == ["SELECT 1", "SELECT 2"]
+        assert all(q["engine"] == "profiling" for q in report["queries"])
+
+    def test_token_must_match(self, tmp_path):
+        with create_test_client(
+            route_handlers=[slow_handler], middleware=[make_middleware(tmp_path, token="secret")]
+        ) as client:
+            assert "x-profile-id" not in client.get("/slow", headers={"X-Profile": "1"}).headers
+            assert "x-profile-id" in client.get("/slow", headers={"X-Profile": "secret"}).headers
+
+    def test_header_ignored_without_token(self, tmp_path):
+        with create_test_client(
+            route_handlers=[slow_handler], middleware=[make_middleware(tmp_path)]
+        ) as client:
+            assert "x-profile-id" not in client.get("/slow", headers={"X-Profile": "1"}).headers
+        assert os.listdir(tmp_path) == []
+
+    def test_sampling(self, tmp_path):
+        with create_test_client(
+            route_handlers=[slow_handler], middleware=[make_middleware(tmp_path, sample_rate=1.0)]
+        ) as client:
+            assert "x-profile-id" in client.get("/slow").headers
+
+    def test_capture_is_scoped(self):
+        with engine.connect() as conn:
+            with capture_queries() as queries:
+                conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+        assert [q["sql"] for q in queries] == ["SELECT 1"]
+
+    def test_slow_query_log(self, monkeypatch, caplog):
+        monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0.000001)
+
+        with caplog.at_level(logging.WARNING, logger="app.db.slow_query"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT   3 WHERE :secret = 'x'"), {"secret": "p@ss"})
+
+        assert len(caplog.records) == 1
+        assert "[profiling]: SELECT 3" in caplog.records[0].getMessage()
+        assert "p@ss" not in caplog.text
+
+    def test_slow_query_log_disabled_by_default(self, caplog):
+        assert instrumentation.SLOW_QUERY_MS == 0
+
+        with caplog.at_level(logging.WARNING, logger="app.db.slow_query"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 4"))
+
+        assert caplog.records == []
@@ -0,0 +1,81 @@
+import pytest
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.db.query_counter import QueryCounter
+from app.models import Product, User, UserCreate
+from app.repositories.bulk import bulk_insert
+from app.repositories.product_repository import ProductRepository
+from app.repositories.report_repository import ReportRepository
+from app.repositories.user_repository import UserRepository
+
+
+class TestBulkCreate:
+    """Массовая вставка: один INSERT на пачку вместо запроса на строку"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_and_returning(self, async_engine, async_session):
+        rows = [
+            {"name": f"Item {i}", "description": "bulk", "price": float(i)}
+            for i in range(25)
+        ]
+
+        with QueryCounter(async_engine) as counter:
+            ids = await ProductRepository().bulk_create(
+                async_session, rows, returning=True, chunk_size=10
+            )
+        await async_session.commit()
+
+        assert counter.count == 3
+        assert len(ids) == len(set(ids)) == 25
+        names = dict(
+            (await async_session.execute(select(Product.id, Product.name))).all()
+        )
+        assert [names[product_id] for product_id in ids] == [row["name"] for row in rows]
+
+    @pytest.mark.asyncio
+    async def test_pydantic_rows_and_defaults(self, async_engine, async_session):
+        users = [
+            UserCreate(username=f"bulk_{i}", email=f"bulk_{i}@example.com")
+            for i in range(5)
+        ]
+
+        with QueryCounter(async_engine) as counter:
+            assert await UserRepository().bulk_create(async_session, users) == []
+        await async_session.commit()
+        assert counter.count == 1
+
+        created = (await async_session.execute(select(User))).scalars().all()
+        assert len(created) == 5
+        assert all(user.id and user.created_at for user in created)
+
+    @pytest.mark.asyncio
+    async def test_copy_falls_back_to_insert(self, async_session):
+        """На SQLite флаг use_copy игнорируется"""
+        ids = await bulk_insert(
+            async_session,
+            Product,
+            [{"name": "Copy", "description": "", "price": 1.0}],
+            returning=True,
+            use_copy=True,
+        )
+        assert len(ids) == 1
+
+    @pytest.mark.asyncio
+    async def test_report_bulk_create(self, async_engine, async_session):
+        report_at = date(2024, 1, 15)
+        rows = [
+            {"report_at": report_at, "order_id": uuid4(), "count_product": i}
+            for i in range(3)
+        ]
+
+        with QueryCounter(async_engine) as counter:
+            ids = await ReportRepository.bulk_create(async_session, rows, returning=True)
+        await async_session.commit()
+        assert len(ids) == 3
+        assert counter.statements[0].startswith("INSERT INTO daily_order_reports")
+
+        reports = await ReportRepository.get_daily_reports(async_session, report_at)
+        assert sorted(report.count_product for report in reports) == [0, 1, 2]
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models import Address, Order, Product, User
+from app.repositories.loaders import UnknownLoadProfileError
+from app.repositories.order_repository import OrderRepository
+from app.repositories.user_repository import UserRepository
+
+
+async def seed_graph(session, users: int):
+    product = Product(name="Book", description="Paper", price=10.0)
+    session.add(product)
+    for i in range(users):
+        user = User(username=f"graph_{users}_{i}", email=f"graph_{users}_{i}@example.com")
+        address = Address(
+            user=user, street="Main", city="Kazan", province="TA", zip_code="420000", country="RU"
+        )
+        session.add_all(
+            [
+                user,
+                address,
+                Address(
+                    user=user, street="Second", city="Kazan", province="TA", zip_code="420001", country="RU"
+                ),
+                Order(user=user, address=address, product=product, quantity=1),
+                Order(user=user, address=address, product=product, quantity=2),
+            ]
+        )
+    await session.commit()
+    session.expunge_all()
+
+
+class TestLoadProfiles:
+    """Профили загрузки: число запросов не зависит от числа строк"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("users", [2, 10])
+    async def test_user_details_profile(self, async_session, max_queries, users):
+        await seed_graph(async_session, users)
+
+        with max_queries(3):
+            loaded = await UserRepository().get_by_filter(async_session, 100, load="details")
+            assert all(len(user.addresses) == 2 for user in loaded)
+            assert all(len(user.orders) == 2 for user in loaded)
+
+    @pytest.mark.asyncio
+    async def test_order_summary_profile(self, async_session, max_queries):
+        await seed_graph(async_session, 5)
+
+        with max_queries(1):
+            orders = await OrderRepository().get_by_filter(async_session, 100, load="summary")
+            assert {order.product.name for order in orders} == {"Book"}
+            assert all(order.address.city == "Kazan" for order in orders)
+
+    @pytest.mark.asyncio
+    async def test_unloaded_relationship_raises(self, async_session):
+        await seed_graph(async_session, 1)
+
+        users = await UserRepository().get_by_filter(async_session, 10, load="addresses")
+        with pytest.raises(InvalidRequestError):
+            users[0].orders
+
+        with pytest.raises(UnknownLoadProfileError):
+            await UserRepository().get_by_filter(async_session, 10, load="everything")
+
+
+class TestUserEndpointQueryCounts:
+    """Число SQL-запросов на HTTP-запрос"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("users", [3, 15])
+    async def test_list_with_details(self, user_client, async_session, max_queries, users):
+        await seed_graph(async_session, users)
+
+        with max_queries(3):
+            response = await user_client.get(
+                "/api/users/",
+                params={"include": "details", "count_mode": "window", "per_page": 100},
+            )
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["users"]) == users
+        assert all(len(user["orders"]) == 2 for user in body["users"])
+
+    @pytest.mark.asyncio
+    async def test_get_user(self, user_client, async_session, max_queries):
+        await seed_graph(async_session, 1)
+        user_id = (await UserRepository().get_by_filter(async_session, 1))[0].id
+
+        with max_queries(3):
+            response = await user_client.get(f"/api/users/{user_id}", params={"include": "details"})
+        assert response.status_code == 200
+        assert len(response.json()["user"]["addresses"]) == 2
+
+        with max_queries(1):
+            response = await user_client.get(f"/api/users/{user_id}")
+        assert "addresses" not in response.json()["user"]
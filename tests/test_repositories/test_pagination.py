@@ -0,0 +1,59 @@
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.models import User
+from app.repositories.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+)
+from app.repositories.user_repository import UserRepository
+
+
+class TestKeysetPagination:
+    """Тесты курсорной пагинации"""
+
+    def test_cursor_roundtrip(self):
+        """Курсор однозначно восстанавливает (created_at, id)"""
+        created_at = datetime(2025, 1, 2, 3, 4, 5, 678)
+        item_id = uuid4()
+
+        assert decode_cursor(encode_cursor(created_at, item_id)) == (created_at, item_id)
+
+    def test_invalid_cursor(self):
+        """Поврежденный курсор дает InvalidCursorError"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_users_once(self, async_session):
+        """Проход по курсорам возвращает каждого пользователя ровно один раз"""
+        base_time = datetime(2025, 1, 1)
+        for i in range(7):
+            async_session.add(
+                User(
+                    username=f"page_user_{i}",
+                    email=f"page_user_{i}@example.com",
+                    # два пользователя с одинаковым created_at проверяют сортировку по id
+                    created_at=base_time + timedelta(minutes=i // 2),
+                )
+            )
+        await async_session.commit()
+
+        repository = UserRepository()
+        seen = []
+        cursor = None
+        while True:
+            users = await repository.get_by_filter(async_session, count=3, cursor=cursor)
+            seen.extend(user.username for user in users)
+            cursor = next_cursor(users, 3)
+            if cursor is None:
+                break
+
+        assert sorted(seen) == sorted(f"page_user_{i}" for i in range(7))
+        assert len(seen) == len(set(seen))
+
+        first_page = await repository.get_by_filter(async_session, count=3, page=1)
+        assert [user.username for user in first_page] == seen[:3]
@@ -0,0 +1,77 @@
+import pytest
+from uuid import uuid4
+
+from app.db.query_counter import QueryCounter
+from app.models import ProductUpdate, UserCreate, UserUpdate
+from app.repositories.product_repository import ProductRepository
+from app.repositories.user_repository import UserRepository
+
+
+class TestRepositoryQueryCounts:
+    """Каждая операция записи - один запрос к БД"""
+
+    @pytest.mark.asyncio
+    async def test_user_write_paths(self, async_engine, async_session):
+        repository = UserRepository()
+
+        with QueryCounter(async_engine) as counter:
+            user = await repository.create(
+                async_session, UserCreate(username="rt_user", email="rt@example.com")
+            )
+        assert counter.count == 1
+
+        with QueryCounter(async_engine) as counter:
+            updated = await repository.update(
+                async_session, user.id, UserUpdate(description="updated")
+            )
+        assert counter.count == 1
+        assert updated.description == "updated"
+        assert updated.username == "rt_user"
+
+        with QueryCounter(async_engine) as counter:
+            missing = await repository.update(
+                async_session, uuid4(), UserUpdate(description="nobody")
+            )
+        assert counter.count == 1
+        assert missing is None
+
+        with QueryCounter(async_engine) as counter:
+            assert await repository.delete(async_session, user.id) is True
+        assert counter.count == 1
+        assert await repository.delete(async_session, user.id) is False
+
+    @pytest.mark.asyncio
+    async def test_product_update_returns_fresh_row(self, async_engine, async_session):
+        repository = ProductRepository()
+        product = await repository.create(
+            async_session, {"name": "Lamp", "description": "Desk lamp", "price": 10.0}
+        )
+        await async_session.commit()
+
+        with QueryCounter(async_engine) as counter:
+            updated = await repository.update(
+                async_session, product.id, ProductUpdate(price=12.5)
+            )
+        assert counter.count == 1
+        assert updated is product
+        assert updated.price == 12.5
+        assert updated.name == "Lamp"
+
+    @pytest.mark.asyncio
+    async def test_emulated_returning(self, async_engine, async_session):
+        """Без поддержки RETURNING запись и чтение выполняются отдельно"""
+        async_engine.dialect.update_returning = False
+        async_engine.dialect.delete_returning = False
+        repository = ProductRepository()
+        product = await repository.create(
+            async_session, {"name": "Chair", "description": "Office", "price": 50.0}
+        )
+        await async_session.commit()
+
+        with QueryCounter(async_engine) as counter:
+            updated = await repository.update(async_session, product.id, {"price": 45.0})
+        assert counter.count == 2
+        assert updated.price == 45.0
+
+        assert await repository.delete(async_session, product.id) is True
+        assert await repository.delete(async_session, product.id) is False
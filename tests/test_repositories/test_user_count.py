@@ -0,0 +1,53 @@
+import pytest
+
+from app.models import User
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def repository():
+    return UserRepository()
+
+
+async def _add_users(session):
+    for name in ("alice", "alina", "bob", "boris", "carl"):
+        session.add(User(username=name, email=f"{name}@example.com"))
+    await session.commit()
+
+
+class TestUserCount:
+    """Тесты подсчета пользователей"""
+
+    @pytest.mark.asyncio
+    async def test_total_count_respects_search(self, async_session, repository):
+        """COUNT выполняется в БД с тем же фильтром, что и выборка"""
+        await _add_users(async_session)
+
+        assert await repository.get_total_count(async_session) == 5
+        assert await repository.get_total_count(async_session, search="ali") == 2
+        assert await repository.get_total_count(async_session, search="") == 5
+
+    @pytest.mark.asyncio
+    async def test_window_count_matches_exact(self, async_session, repository):
+        """Оконный режим возвращает страницу и общее количество одним запросом"""
+        await _add_users(async_session)
+
+        users, total = await repository.get_page_with_count(
+            async_session, count=1, page=1, search="bo"
+        )
+        assert total == 2
+        assert len(users) == 1
+        assert users[0].username.startswith("bo")
+
+        users, total = await repository.get_page_with_count(
+            async_session, count=10, page=5
+        )
+        assert users == []
+        assert total == 5
+
+    @pytest.mark.asyncio
+    async def test_estimated_count_falls_back_to_exact(self, async_session, repository):
+        """Вне PostgreSQL оценка совпадает с точным значением"""
+        await _add_users(async_session)
+
+        assert await repository.get_estimated_count(async_session) == 5
@@ -0,0 +1,68 @@
+import pytest
+import pytest_asyncio
+
+from app.models import User
+from app.repositories.user_search_repository import UserSearchRepository
+
+
+@pytest_asyncio.fixture
+async def search_session(async_engine, async_session):
+    async with async_engine.begin() as conn:
+        await UserSearchRepository.ensure_index(conn)
+    async_session.add_all(
+        [
+            User(username="anna_k", email="anna@example.com", description="Designer"),
+            User(username="annabel", email="bel@example.com", description=None),
+            User(username="ivan", email="ivan@mail.ru", description="likes anna's designs"),
+            User(username="petr", email="petr@example.com", description="Manager"),
+        ]
+    )
+    await async_session.commit()
+    return async_session
+
+
+class TestUserSearchRepository:
+    """Тесты поиска пользователей (FTS5 на SQLite)"""
+
+    @pytest.mark.asyncio
+    async def test_search_matches_all_fields(self, search_session):
+        """Подстрока ищется в username, email и description"""
+        results = await UserSearchRepository().search(search_session, "anna")
+
+        assert {user.username for user, _ in results} == {"anna_k", "annabel", "ivan"}
+        ranks = [rank for _, rank in results]
+        assert ranks == sorted(ranks, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_index_follows_updates(self, search_session):
+        """Триггеры поддерживают FTS-индекс в актуальном состоянии"""
+        user = (await UserSearchRepository().search(search_session, "petr"))[0][0]
+        user.description = "Senior engineer"
+        await search_session.commit()
+
+        results = await UserSearchRepository().search(search_session, "engineer")
+        assert [found.username for found, _ in results] == ["petr"]
+        assert await UserSearchRepository().search(search_session, "Manager") == []
+
+    @pytest.mark.asyncio
+    async def test_short_query_and_prefix(self, search_session):
+        """Короткие запросы и поиск по префиксу работают без триграмм"""
+        short = await UserSearchRepository().search(search_session, "iv")
+        assert [user.username for user, _ in short] == ["ivan"]
+
+        prefix = await UserSearchRepository().search_prefix(search_session, "ANNA")
+        assert [user.username for user in prefix] == ["anna_k", "annabel"]
+
+    @pytest.mark.asyncio
+    async def test_index_survives_vacuum_and_delete(self, async_engine, search_session):
+        """Индекс привязан к явному ключу, а не к rowid таблицы users"""
+        user = (await UserSearchRepository().search(search_session, "petr"))[0][0]
+        await search_session.delete(user)
+        await search_session.commit()
+        async with async_engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("VACUUM")
+
+        assert await UserSearchRepository().search(search_session, "petr") == []
+        results = await UserSearchRepository().search(search_session, "designer")
+        assert [found.username for found, _ in results] == ["anna_k"]
@@ -0,0 +1,64 @@
+import statistics
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.repositories.report_repository import ReportRepository
+from app.services.analytics_service import AnalyticsService
+
+DAY_VALUES = {
+    date(2024, 5, 1): [1, 2, 3, 4, 10],
+    date(2024, 5, 3): [5, 5, 7],
+}
+
+
+class TestAnalyticsService:
+    """Векторная статистика по отчетам"""
+
+    @pytest.mark.asyncio
+    async def test_stats_match_reference(self, async_session):
+        order_ids = {}
+        rows = []
+        for report_at, values in DAY_VALUES.items():
+            for value in values:
+                order_id = uuid4()
+                order_ids[order_id] = value
+                rows.append({"report_at": report_at, "order_id": order_id, "count_product": value})
+        rows.append({"report_at": date(2024, 6, 1), "order_id": uuid4(), "count_product": 99})
+        await ReportRepository.bulk_create(async_session, rows)
+        await async_session.commit()
+
+        columns = await AnalyticsService.fetch_columns(
+            async_session, date(2024, 5, 1), date(2024, 5, 3), top_n=3, chunk_rows=2
+        )
+        stats = AnalyticsService.compute_stats(columns, bins=3)
+
+        all_values = [v for values in DAY_VALUES.values() for v in values]
+        overall = stats["overall"]
+        assert overall["count"] == 8
+        assert overall["sum"] == sum(all_values)
+        assert overall["std"] == pytest.approx(statistics.pstdev(all_values))
+        assert overall["p50"] == pytest.approx(np.percentile(all_values, 50))
+
+        assert [day["date"] for day in stats["daily"]] == ["2024-05-01", "2024-05-03"]
+        for day, values in zip(stats["daily"], DAY_VALUES.values()):
+            assert day["total_products"] == sum(values)
+            assert day["std"] == pytest.approx(statistics.pstdev(values))
+            assert day["p90"] == pytest.approx(np.percentile(values, 90))
+            assert sum(day["histogram"]) == len(values)
+
+        assert [order["count_product"] for order in stats["top_orders"]] == [10, 7, 5]
+        top_id = stats["top_orders"][0]["order_id"]
+        assert {str(k): v for k, v in order_ids.items()}[top_id] == 10
+
+    @pytest.mark.asyncio
+    async def test_empty_period(self, async_session):
+        columns = await AnalyticsService.fetch_columns(
+            async_session, date(2020, 1, 1), date(2020, 1, 7)
+        )
+        stats = AnalyticsService.compute_stats(columns)
+        assert stats["overall"]["count"] == 0
+        assert stats["daily"] == [] and stats["top_orders"] == []
@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from app.models import Address, Order, Product, User
+from app.models.database_models import DailyOrderReport
+from app.services.backfill_service import ReportBackfillService
+
+START = date(2024, 2, 1)
+DAYS = 6
+
+
+@pytest_asyncio.fixture
+async def session_factory(file_session_factory):
+    # БД в файле: дни пишутся параллельными сессиями
+    async with file_session_factory() as session:
+        product = Product(name="Book", description="Paper", price=10.0)
+        user = User(username="backfill", email="backfill@example.com")
+        address = Address(
+            user=user, street="Main", city="Kazan", province="TA", zip_code="420000", country="RU"
+        )
+        session.add_all([product, user, address])
+        for day in range(DAYS):
+            created_at = datetime.combine(START + timedelta(days=day), datetime.min.time())
+            for i in range(day + 1):
+                session.add(
+                    Order(
+                        user=user, address=address, product=product, quantity=i + 1,
+                        created_at=created_at + timedelta(hours=i),
+                    )
+                )
+        await session.commit()
+
+    return file_session_factory
+
+
+async def reports_by_day(session_factory):
+    async with session_factory() as session:
+        rows = await session.execute(
+            select(DailyOrderReport.report_at, func.count(), func.sum(DailyOrderReport.count_product))
+            .group_by(DailyOrderReport.report_at)
+        )
+        return {day: (count, total) for day, count, total in rows.all()}
+
+
+class TestReportBackfillService:
+    """Пересборка отчетов за диапазон дат"""
+
+    @pytest.mark.asyncio
+    async def test_backfill_range_is_idempotent(self, tmp_path, session_factory):
+        service = ReportBackfillService(
+            concurrency=3,
+            checkpoint_path=str(tmp_path / "checkpoint.json"),
+            session_factory=session_factory,
+        )
+        end = START + timedelta(days=DAYS - 1)
+
+        result = await service.run(START, end)
+        assert result["days"] == DAYS
+        assert result["reports"] == sum(range(1, DAYS + 1))
+        assert result["failed"] == {}
+
+        expected = {
+            START + timedelta(days=day): (day + 1, sum(range(1, day + 2)))
+            for day in range(DAYS)
+        }
+        assert await reports_by_day(session_factory) == expected
+
+        # все дни в контрольной точке - повторный запуск ничего не делает
+        resumed = await service.run(START, end)
+        assert resumed["days"] == 0
+        assert resumed["resumed_days"] == DAYS
+
+        # без контрольной точки дни пересобираются без дублей
+        await service.run(START, end, resume=False)
+        assert await reports_by_day(session_factory) == expected
+
+    @pytest.mark.asyncio
+    async def test_skip_existing_days(self, session_factory):
+        await ReportBackfillService(
+            checkpoint_path=None, session_factory=session_factory
+        ).run(START, START)
+
+        service = ReportBackfillService(
+            checkpoint_path=None, replace=False, session_factory=session_factory
+        )
+        result = await service.run(START, START + timedelta(days=1))
+        assert result["skipped"] == [START.isoformat()]
+        assert result["reports"] == 2
@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.cache_invalidation import CacheInvalidator
+
+
+class TestCacheInvalidator:
+    """Пакетная инвалидация кэша по событиям"""
+
+    @pytest.mark.asyncio
+    async def test_user_events_evict_in_one_batch(self, cache):
+        for user_id in ("u1", "u2", "u3"):
+            cache.cache_user_data(user_id, {"id": user_id})
+        cache.cache_count("users:", 3)
+
+        result = await CacheInvalidator(cache).handle_user_events([
+            {"event_type": "user.updated", "user_id": "u1"},
+            {"event_type": "user.updated", "user_id": "u1"},
+            {"event_type": "user.deleted", "user_id": "u2"},
+        ])
+
+        assert result == {"evicted": 4, "counts": 1}
+        assert cache.get_cached_user("u1") is None
+        assert cache.get_cached_user("u2") is None
+        assert cache.get_cached_user("u3") == {"id": "u3"}
+
+    @pytest.mark.asyncio
+    async def test_product_snapshot_refreshes_partial_evicts(self, cache):
+        cache.cache_product_data("p1", {"name": "Old", "price": 1.0, "quantity": 1})
+        cache.cache_product_data("p2", {"name": "Other"})
+
+        result = await CacheInvalidator(cache).handle_product_events([
+            {"product_id": "p1", "name": "Mid", "price": 2.0, "quantity": 2},
+            {"product_id": "p1", "name": "New", "price": 3.0, "quantity": 3,
+             "event_type": "product.updated", "timestamp": "2024-01-01T00:00:00"},
+            {"product_id": "p2", "price": 5.0},
+        ])
+
+        assert result == {"refreshed": 1, "evicted": 2}
+        assert cache.get_cached_product("p1") == {
+            "product_id": "p1", "name": "New", "price": 3.0, "quantity": 3
+        }
+        assert cache.get_cached_product("p2") is None
+
+    def test_clear_all_keeps_non_cache_keys(self, cache, mock_redis):
+        cache.cache_user_data("u1", {"id": "u1"})
+        cache.cache_product_data("p1", {"name": "Book"})
+        cache.cache_count("users:", 1)
+        mock_redis.set("report:summary:2024-01-01:0.0", "{}")
+        for key in ("stock:p1", "stock:log", "report_gen:global"):
+            mock_redis.set(key, "1")
+
+        assert cache.clear_all_cache() is True
+
+        assert sorted(mock_redis.keys("*")) == ["report_gen:global", "stock:log", "stock:p1"]
+
+    def test_invalidate_counts_bumps_generation(self, cache, mock_redis, monkeypatch):
+        cache.cache_count("users:", 1)
+        cache.cache_count("users:anna", 2)
+        cache.cache_count("orders:", 3)
+        monkeypatch.setattr(mock_redis, "keys", None)
+
+        assert cache.invalidate_counts("users:") == 1
+
+        assert cache.get_cached_count("users:") is None
+        assert cache.get_cached_count("users:anna") is None
+        assert cache.get_cached_count("orders:") == 3
+        cache.cache_count("users:", 4)
+        assert cache.get_cached_count("users:") == 4
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from app.models import Address, Order, Product, User
+from app.services.cache_warmer import CacheWarmer
+
+NOW = datetime(2024, 5, 31, 12, 0)
+
+
+@pytest_asyncio.fixture
+async def session_factory(file_session_factory):
+    factory = file_session_factory
+
+    async with factory() as session:
+        products = [Product(name=f"P{i}", description="", price=i + 1.0, quantity=5) for i in range(4)]
+        users = [User(username=f"u{i}", email=f"u{i}@example.com") for i in range(3)]
+        addresses = [
+            Address(user=user, street="Main", city="Kazan", province="TA", zip_code="420000", country="RU")
+            for user in users
+        ]
+        session.add_all(products + users + addresses)
+        # P0 - 3 заказа, P1 - 2, P2 - 1 (все свежие); P3 - старый заказ u2
+        for product, user, address, days_ago in [
+            (0, 0, 0, 1), (0, 1, 1, 2), (0, 0, 0, 3), (1, 1, 1, 1), (1, 0, 0, 5), (2, 0, 0, 2),
+            (3, 2, 2, 90),
+        ]:
+            session.add(Order(
+                user=users[user], address=addresses[address], product=products[product],
+                created_at=NOW - timedelta(days=days_ago),
+            ))
+        await session.commit()
+
+    return factory, products, users
+
+
+class TestCacheWarmer:
+    """Прогрев кэша горячими продуктами и активными пользователями"""
+
+    @pytest.mark.asyncio
+    async def test_warms_top_products_and_active_users(self, session_factory, cache):
+        factory, products, users = session_factory
+        warmer = CacheWarmer(
+            products=2, users=10, days=30, chunk_size=1, pause=0,
+            cache=cache, session_factory=factory,
+        )
+
+        result = await warmer.run(now=NOW)
+
+        assert result["products"] == {"candidates": 2, "cached": 2}
+        assert result["users"] == {"candidates": 2, "cached": 2}
+        assert result["order_coverage"] == round(5 / 6, 4)
+
+        assert cache.get_cached_product(str(products[0].id))["name"] == "P0"
+        assert cache.get_cached_product(str(products[1].id))["name"] == "P1"
+        assert cache.get_cached_product(str(products[2].id)) is None
+        assert cache.get_cached_user(str(users[0].id))["username"] == "u0"
+        assert cache.get_cached_user(str(users[2].id)) is None
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.redis.client import MockRedis
+from app.services import event_handlers
+from app.services.cache_service import cache_service
+from app.services.event_consumer import EventConsumer, Subscription, topic_matches
+from app.services.event_handlers import EventHandlers, get_order_rollup
+
+DAY = date(2024, 3, 5)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = MockRedis()
+    monkeypatch.setattr(cache_service, "redis", redis)
+    return redis
+
+
+class TestEventConsumer:
+    """Маршрутизация, ограничение параллелизма и пачки"""
+
+    def test_topic_matches(self):
+        assert topic_matches("user.created", "user.created")
+        assert topic_matches("user.*", "user.deleted")
+        assert not topic_matches("user.*", "user.profile.updated")
+        assert topic_matches("user.#", "user.profile.updated")
+        assert topic_matches("#", "order.created")
+        assert not topic_matches("order.*", "user.created")
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_per_handler(self):
+        running = []
+        peak = []
+
+        async def handler(event):
+            running.append(event)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(event)
+
+        consumer = EventConsumer()
+        subscription = consumer.register("user.*", handler, concurrency=3)
+        await asyncio.gather(*(consumer.dispatch("user.created", {"n": i}) for i in range(10)))
+
+        assert max(peak) == 3
+        assert subscription.processed == 10
+
+    @pytest.mark.asyncio
+    async def test_batches_by_size_and_timeout(self):
+        batches = []
+
+        async def handler(events):
+            batches.append(len(events))
+
+        subscription = Subscription("order.created", handler, batch_size=4, batch_timeout=0.05)
+        for i in range(6):
+            await subscription.submit({"n": i})
+        assert batches == [4]
+
+        await asyncio.sleep(0.1)
+        assert batches == [4, 2]
+
+    @pytest.mark.asyncio
+    async def test_failed_handler_does_not_stop_others(self):
+        async def broken(event):
+            raise RuntimeError("boom")
+
+        calls = []
+
+        async def working(event):
+            calls.append(event)
+
+        consumer = EventConsumer()
+        failing = consumer.register("product.updated", broken, queue_name="a")
+        consumer.register("product.*", working, queue_name="b")
+
+        assert await consumer.dispatch("product.updated", {"product_id": "1"}) == 2
+        assert failing.failed == 1
+        assert calls == [{"product_id": "1"}]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_rejects_only_bad_events(self):
+        class Message:
+            redelivered = True
+
+            def __init__(self):
+                self.outcome = None
+
+            async def ack(self):
+                self.outcome = "ack"
+
+            async def nack(self, requeue):
+                self.outcome = "requeue" if requeue else "reject"
+
+        handled = []
+
+        async def handler(events):
+            if any(event.get("bad") for event in events):
+                raise ValueError("bad event")
+            handled.extend(event["n"] for event in events)
+
+        subscription = Subscription("order.created", handler, batch_size=3)
+        messages = [Message() for _ in range(3)]
+        for i, message in enumerate(messages):
+            await subscription.submit({"n": i, "bad": i == 1}, message)
+
+        assert handled == [0, 2]
+        assert [m.outcome for m in messages] == ["ack", "reject", "ack"]
+        assert (subscription.processed, subscription.failed) == (2, 1)
+
+
+class TestEventHandlers:
+    """Побочные эффекты обработчиков событий"""
+
+    @pytest.mark.asyncio
+    async def test_orders_rollup_and_report_generation(self, redis):
+        timestamp = f"{DAY.isoformat()}T10:00:00"
+        await EventHandlers.handle_orders_created([
+            {"product_id": "p1", "quantity": 2, "total_amount": 19.98, "timestamp": timestamp},
+            {"product_id": "p1", "quantity": 1, "total_amount": 9.99, "timestamp": timestamp},
+        ])
+        await EventHandlers.handle_order_created(
+            {"product_id": "p2", "quantity": 5, "total_amount": 0.5, "timestamp": timestamp}
+        )
+
+        assert get_order_rollup(DAY) == {"date": DAY.isoformat(), "orders": 3, "total_amount": 30.47}
+        assert redis.get(event_handlers.rollup_key(DAY, "product:p1")) == 3
+        assert redis.get(f"report_gen:{DAY.isoformat()}") == 2
+
+    @pytest.mark.asyncio
+    async def test_malformed_order_event_is_skipped(self, redis):
+        timestamp = f"{DAY.isoformat()}T10:00:00"
+        await EventHandlers.handle_orders_created([
+            {"product_id": "p1", "quantity": "two", "total_amount": 5, "timestamp": timestamp},
+            {"product_id": "p1", "quantity": 1, "total_amount": "n/a", "timestamp": timestamp},
+            {"product_id": "p1", "quantity": 1, "total_amount": 9.99, "timestamp": timestamp},
+        ])
+
+        assert get_order_rollup(DAY)["orders"] == 1
+        assert redis.get(event_handlers.rollup_key(DAY, "product:p1")) == 1
+
+    @pytest.mark.asyncio
+    async def test_user_created_caches_user_and_drops_counts(self, redis):
+        cache_service.cache_count("users:", 10)
+        await EventHandlers.handle_user_created(
+            {"user_id": "u1", "username": "alice", "email": "alice@example.com"}
+        )
+
+        assert cache_service.get_cached_user("u1")["username"] == "alice"
+        assert cache_service.get_cached_count("users:") is None
@@ -0,0 +1,86 @@
+import os
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.repositories.report_repository import ReportRepository
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds
+
+from app.services.export_service import ReportExportService
+
+
+async def add_reports(session, report_at, count, created_at=None):
+    await ReportRepository.bulk_create(
+        session,
+        [
+            {
+                "report_at": report_at,
+                "order_id": uuid4(),
+                "count_product": i,
+                "created_at": created_at or datetime.now(),
+            }
+            for i in range(count)
+        ],
+    )
+    await session.commit()
+
+
+@pytest_asyncio.fixture
+async def session_factory(async_engine):
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+class TestReportExportService:
+    """Экспорт отчетов в колоночные файлы"""
+
+    @pytest.mark.asyncio
+    async def test_partitioned_parquet(self, tmp_path, session_factory, async_session):
+        await add_reports(async_session, date(2024, 1, 1), 7)
+        await add_reports(async_session, date(2024, 1, 2), 5)
+        await add_reports(async_session, date(2024, 2, 1), 3)
+
+        service = ReportExportService(str(tmp_path), batch_size=4, session_factory=session_factory)
+        result = await service.export(
+            "daily_order_reports", date(2024, 1, 1), date(2024, 1, 31)
+        )
+
+        assert result["rows"] == 12
+        assert sorted(os.listdir(tmp_path / "daily_order_reports")) == [
+            "report_at=2024-01-01", "report_at=2024-01-02",
+        ]
+        partitioning = ds.partitioning(pa.schema([("report_at", pa.date32())]), flavor="hive")
+        table = ds.dataset(
+            tmp_path / "daily_order_reports", format="parquet", partitioning=partitioning
+        ).to_table()
+        assert table.num_rows == 12
+        assert set(table.column("report_at").to_pylist()) == {date(2024, 1, 1), date(2024, 1, 2)}
+        assert sorted(table.column("count_product").to_pylist()) == sorted(
+            list(range(7)) + list(range(5))
+        )
+
+    @pytest.mark.asyncio
+    async def test_incremental_append(self, tmp_path, session_factory, async_session):
+        await add_reports(async_session, date(2024, 1, 1), 3, datetime(2024, 1, 2, 1))
+        service = ReportExportService(
+            str(tmp_path), fmt="arrow", partition=False, session_factory=session_factory
+        )
+
+        first = await service.export("daily_order_reports", incremental=True)
+        assert first["rows"] == 3
+        assert service.load_state("daily_order_reports")["rows"] == 3
+
+        assert (await service.export("daily_order_reports", incremental=True))["rows"] == 0
+
+        await add_reports(async_session, date(2024, 1, 1), 2, datetime(2024, 1, 3, 1))
+        second = await service.export("daily_order_reports", incremental=True)
+        assert second["rows"] == 2
+        assert second["files"] != first["files"]
+
+        table = ds.dataset(tmp_path / "daily_order_reports", format="arrow").to_table()
+        assert table.num_rows == 5
+        assert service.load_state("daily_order_reports")["rows"] == 5
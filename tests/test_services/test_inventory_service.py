@@ -0,0 +1,193 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.models import InventoryLog, Product
+from app.redis import stock
+from app.redis.client import MockRedis
+from app.redis.stock import StockStore
+from app.services.inventory_service import InventoryService
+from app.services.inventory_sync import InventorySyncer
+
+
+@pytest_asyncio.fixture
+async def products(file_session_factory):
+    async with file_session_factory() as session:
+        items = [Product(name=f"P{i}", description="", price=10.0, quantity=q) for i, q in enumerate([10, 3])]
+        session.add_all(items)
+        await session.commit()
+    return items
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(stock, "_local_stock", stock._LocalStockStore())
+    return StockStore(redis=MockRedis())
+
+
+@pytest.fixture
+def service(store, file_session_factory):
+    return InventoryService(store=store, session_factory=file_session_factory)
+
+
+class TestInventoryService:
+    """Остатки в общем хранилище с атомарным резервом"""
+
+    @pytest.mark.asyncio
+    async def test_stock_is_seeded_from_db(self, service, store, products):
+        assert store.get(products[0].id) is None
+
+        result = await service.update_quantity(products[0].id, -4, "adjustment")
+
+        assert result["success"] is True
+        assert (result["old_quantity"], result["new_quantity"]) == (10, 6)
+        assert store.get(products[0].id) == 6
+
+    @pytest.mark.asyncio
+    async def test_reserve_is_all_or_nothing(self, service, store, products):
+        first, second = products
+
+        result = await service.reserve_items([(first.id, 2), (second.id, 4)], uuid4())
+
+        assert result["success"] is False
+        assert result["product_id"] == str(second.id)
+        assert store.get_many([first.id, second.id]) == {first.id: 10, second.id: 3}
+
+        result = await service.reserve_items([(first.id, 2), (second.id, 1), (second.id, 2)], uuid4())
+
+        assert result["success"] is True
+        assert store.get_many([first.id, second.id]) == {first.id: 8, second.id: 0}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reservations_do_not_oversell(self, service, products):
+        results = await asyncio.gather(*[
+            service.reserve_product(products[0].id, 1, uuid4()) for _ in range(25)
+        ])
+
+        assert sum(result["success"] for result in results) == 10
+        assert await service.get_quantity(products[0].id) == 0
+
+    @pytest.mark.asyncio
+    async def test_change_reservation_moves_only_the_difference(self, service, store, products):
+        first, second = products
+        order_id = uuid4()
+        await service.reserve_items([(first.id, 8)], order_id)
+
+        # 10 первых на складе нет, но заказу нужно лишь 2 сверх его 8
+        result = await service.change_reservation([(first.id, 8)], [(first.id, 10), (second.id, 1)], order_id)
+        assert result["success"] is True
+        assert store.get_many([first.id, second.id]) == {first.id: 0, second.id: 2}
+
+        result = await service.change_reservation([(first.id, 10), (second.id, 1)], [(second.id, 4)], order_id)
+        assert result["success"] is False
+        assert store.get_many([first.id, second.id]) == {first.id: 0, second.id: 2}
+
+        result = await service.change_reservation([(first.id, 10), (second.id, 1)], [(second.id, 3)], order_id)
+        assert result["released"] == {str(first.id): 10}
+        assert store.get_many([first.id, second.id]) == {first.id: 10, second.id: 0}
+
+    @pytest.mark.asyncio
+    async def test_unknown_product(self, service, products):
+        unknown = uuid4()
+
+        assert (await service.update_quantity(unknown, 5, "restock"))["success"] is False
+        assert (await service.reserve_items([(products[0].id, 1), (unknown, 1)], uuid4()))["success"] is False
+        assert await service.get_quantity(products[0].id) == 10
+        assert await service.check_availability(unknown, 1) is False
+
+
+class TestInventorySyncer:
+    """Перенос журнала остатков в БД"""
+
+    @pytest.mark.asyncio
+    async def test_log_is_applied_to_db(self, service, store, file_session_factory, products):
+        first, second = products
+        await service.reserve_items([(first.id, 4), (second.id, 1)], uuid4())
+        await service.restock(first.id, 2)
+
+        syncer = InventorySyncer(store=store, session_factory=file_session_factory, batch_size=2)
+        assert await syncer.sync_all() == 3
+        assert store.log_length() == 0
+
+        async with file_session_factory() as session:
+            quantities = dict((await session.execute(select(Product.id, Product.quantity))).all())
+            logs = (await session.execute(select(InventoryLog))).scalars().all()
+
+        assert quantities == {first.id: 8, second.id: 2}
+        assert sorted(log.quantity_change for log in logs) == [-4, -1, 2]
+
+    @pytest.mark.asyncio
+    async def test_synced_products_are_evicted_from_cache(
+        self, service, store, file_session_factory, products, shared_cache
+    ):
+        first, second = products
+        for product in products:
+            shared_cache.cache_product_data(str(product.id), {"quantity": product.quantity})
+
+        await service.restock(first.id, 1)
+        await InventorySyncer(store=store, session_factory=file_session_factory).sync_all()
+
+        assert shared_cache.get_cached_product(str(first.id)) is None
+        assert shared_cache.get_cached_product(str(second.id)) == {"quantity": 3}
+
+    @pytest.mark.asyncio
+    async def test_unacknowledged_batch_is_not_duplicated(self, service, store, file_session_factory, products):
+        await service.update_quantity(products[0].id, -1, "adjustment")
+        syncer = InventorySyncer(store=store, session_factory=file_session_factory)
+
+        # сбой после коммита, но до подтверждения пачки
+        entries = store.drain_log(10)
+        await syncer._save(entries)
+
+        assert await syncer.sync_all() == 1
+
+        async with file_session_factory() as session:
+            logs = (await session.execute(select(InventoryLog))).scalars().all()
+            product = await session.get(Product, products[0].id)
+
+        assert len(logs) == 1
+        assert product.quantity == 9
+
+    @pytest.mark.asyncio
+    async def test_rejected_entry_is_dead_lettered(self, service, store, file_session_factory, products):
+        await service.update_quantity(products[0].id, -1, "adjustment")
+        stock._local_stock.log.append(json.dumps({"id": "broken", "product_id": str(products[1].id)}))
+        await service.update_quantity(products[0].id, -2, "adjustment")
+
+        syncer = InventorySyncer(store=store, session_factory=file_session_factory)
+        assert await syncer.sync_all() == 3
+        assert store.log_length() == 0
+
+        assert store.dead_letter_length() == 1
+        assert store.dead_letters()[0]["entry"]["id"] == "broken"
+        async with file_session_factory() as session:
+            logs = (await session.execute(select(InventoryLog))).scalars().all()
+            product = await session.get(Product, products[0].id)
+        assert len(logs) == 2
+        assert product.quantity == 7
+
+
+    @pytest.mark.asyncio
+    async def test_entry_for_deleted_product_is_dead_lettered(
+        self, service, store, file_session_factory, products
+    ):
+        first, second = products
+        await service.update_quantity(first.id, -1, "adjustment")
+        await service.update_quantity(second.id, -1, "adjustment")
+        async with file_session_factory() as session:
+            await session.delete(await session.get(Product, second.id))
+            await session.commit()
+
+        syncer = InventorySyncer(store=store, session_factory=file_session_factory)
+        assert await syncer.sync_all() == 2
+        assert store.log_length() == 0
+
+        assert store.dead_letter_length() == 1
+        assert store.dead_letters()[0]["entry"]["product_id"] == str(second.id)
+        async with file_session_factory() as session:
+            product = await session.get(Product, first.id)
+        assert product.quantity == 9
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.report_cache import (
+    REPORT_CACHE_PAST_TTL,
+    REPORT_CACHE_TODAY_TTL,
+    ReportResultCache,
+)
+
+PAST = date(2024, 1, 10)
+
+
+@pytest.fixture
+def cache(mock_redis):
+    return ReportResultCache(mock_redis)
+
+
+def counting(value):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return dict(value)
+
+    return compute, calls
+
+
+class TestReportResultCache:
+    """Кэш отчетов с поколениями"""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_first_compute(self, cache):
+        compute, calls = counting({"total_reports": 3})
+
+        assert await cache.get_or_compute("summary", PAST, compute) == {"total_reports": 3}
+        assert await cache.get_or_compute("summary", PAST, compute) == {"total_reports": 3}
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_date_bump_only_affects_that_date(self, cache):
+        compute, calls = counting({"total_reports": 1})
+        other_day = PAST + timedelta(days=1)
+        await cache.get_or_compute("summary", PAST, compute)
+        await cache.get_or_compute("summary", other_day, compute)
+
+        cache.bump(PAST)
+        await cache.get_or_compute("summary", PAST, compute)
+        await cache.get_or_compute("summary", other_day, compute)
+        assert len(calls) == 3
+
+        cache.bump()
+        await cache.get_or_compute("summary", other_day, compute)
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, cache):
+        compute, calls = counting({"status": "error", "message": "db down"})
+        await cache.get_or_compute("daily", PAST, compute)
+        await cache.get_or_compute("daily", PAST, compute)
+        assert len(calls) == 2
+
+        async def failing():
+            raise LookupError("not found")
+
+        with pytest.raises(LookupError):
+            await cache.get_or_compute("daily", PAST, failing)
+
+    def test_ttl_depends_on_date(self, cache):
+        assert cache.ttl_for(PAST) == REPORT_CACHE_PAST_TTL
+        assert cache.ttl_for(date.today()) == REPORT_CACHE_TODAY_TTL
+
+    def test_default_client_follows_cache_service(self, shared_cache):
+        """Без явного клиента кэш берет текущий клиент cache_service"""
+        assert ReportResultCache().redis is shared_cache.redis
@@ -0,0 +1,169 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.partitions import (
+    add_months,
+    create_partition,
+    parse_bound,
+    partition_name,
+    plan_partitions,
+)
+from app.models.database_models import DailyOrderReport
+from app.repositories.report_repository import ReportRepository
+from app.services.partition_service import ReportPartitionManager
+from app.services.retention_service import ReportRetentionService
+
+TODAY = date(2024, 6, 1)
+
+
+@pytest_asyncio.fixture
+async def session_factory(async_engine, async_session):
+    rows = [
+        {"report_at": TODAY - timedelta(days=100 + i % 5), "order_id": uuid4(), "count_product": 1}
+        for i in range(23)
+    ] + [
+        {"report_at": TODAY - timedelta(days=i % 10), "order_id": uuid4(), "count_product": 1}
+        for i in range(7)
+    ]
+    await ReportRepository.bulk_create(async_session, rows)
+    await async_session.commit()
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def count_reports(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(func.count(DailyOrderReport.id)))).scalar()
+
+
+class TestReportRetentionService:
+    """Пакетная очистка старых отчетов"""
+
+    @pytest.mark.asyncio
+    async def test_dry_run(self, tmp_path, session_factory):
+        service = ReportRetentionService(
+            checkpoint_path=str(tmp_path / "checkpoint.json"), session_factory=session_factory
+        )
+        result = await service.run(90, dry_run=True, today=TODAY)
+
+        assert result["rows"] == 23
+        assert result["partitions"] == []
+        assert await count_reports(session_factory) == 30
+
+    @pytest.mark.asyncio
+    async def test_batches_resume_from_checkpoint(self, tmp_path, session_factory):
+        service = ReportRetentionService(
+            batch_size=5,
+            pause=0,
+            checkpoint_path=str(tmp_path / "checkpoint.json"),
+            session_factory=session_factory,
+        )
+
+        partial = await service.run(90, max_batches=2, today=TODAY)
+        assert partial == {
+            "cutoff": TODAY - timedelta(days=90),
+            "deleted": 10,
+            "batches": 2,
+            "partitions_dropped": [],
+            "finished": False,
+        }
+        assert service.load_checkpoint()["deleted"] == 10
+        assert await count_reports(session_factory) == 20
+
+        result = await service.run(90, today=TODAY)
+        assert result["finished"]
+        assert result["deleted"] == 23
+        assert result["batches"] == 5
+        assert service.load_checkpoint() is None
+        assert await count_reports(session_factory) == 7
+
+
+def test_parse_partition_bound():
+    partition = parse_bound(
+        "daily_order_reports_2024_01",
+        "FOR VALUES FROM ('2024-01-01') TO ('2024-02-01')",
+    )
+    assert (partition.start, partition.end) == (date(2024, 1, 1), date(2024, 2, 1))
+    assert parse_bound("daily_order_reports_default", "DEFAULT").is_default
+
+
+def test_plan_partitions():
+    partitions = [
+        parse_bound("r_2024_01", "FOR VALUES FROM ('2024-01-01') TO ('2024-02-01')"),
+        parse_bound("r_2024_05", "FOR VALUES FROM ('2024-05-01') TO ('2024-06-01')"),
+        parse_bound("r_2024_06", "FOR VALUES FROM ('2024-06-01') TO ('2024-07-01')"),
+        parse_bound("r_default", "DEFAULT"),
+    ]
+    to_create, expired = plan_partitions(partitions, date(2024, 6, 15), 2, date(2024, 3, 1))
+
+    assert to_create == [date(2024, 7, 1), date(2024, 8, 1)]
+    assert [p.name for p in expired] == ["r_2024_01"]
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert partition_name("daily_order_reports", date(2025, 2, 1)) == "daily_order_reports_2025_02"
+
+
+@pytest.mark.asyncio
+async def test_partition_manager_skips_unpartitioned(session_factory):
+    result = await ReportPartitionManager(session_factory=session_factory).run(today=TODAY)
+    assert result["partitioned"] is False
+    assert result["created"] == []
+
+
+class FakeResult:
+    def __init__(self, value=None, rowcount=0):
+        self.value = value
+        self.rowcount = rowcount
+
+    def scalar(self):
+        return self.value
+
+    scalar_one = scalar
+
+    def first(self):
+        return None if self.value is None else (self.value,)
+
+
+class FakePostgres:
+    """Соединение, которое записывает SQL и отвечает как PostgreSQL"""
+
+    def __init__(self, default_rows: bool):
+        self.default_rows = default_rows
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "to_regclass" in sql:
+            return FakeResult("exists" if "default" in params["name"] else None)
+        if "pg_get_partkeydef" in sql:
+            return FakeResult("RANGE (report_at)")
+        if sql.startswith("SELECT 1"):
+            return FakeResult(1 if self.default_rows else None)
+        return FakeResult(rowcount=2)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("default_rows", [False, True])
+async def test_create_partition_moves_default_rows(default_rows):
+    """Строки месяца из DEFAULT-секции переносятся в новую секцию"""
+    conn = FakePostgres(default_rows)
+
+    name = await create_partition(conn, "r", date(2024, 7, 1))
+
+    assert name == "r_2024_07"
+    ddl = [sql.split(" ")[0:3] for sql in conn.statements if not sql.startswith("SELECT")]
+    if default_rows:
+        assert ddl == [
+            ["ALTER", "TABLE", '"r"'],
+            ["CREATE", "TABLE", '"r_2024_07"'],
+            ["INSERT", "INTO", '"r_2024_07"'],
+            ["DELETE", "FROM", '"r_default"'],
+            ["ALTER", "TABLE", '"r"'],
+        ]
+        assert "DETACH" in conn.statements[4] and conn.statements[-1].endswith("DEFAULT")
+    else:
+        assert ddl == [["CREATE", "TABLE", '"r_2024_07"']]
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.redis.client import MockRedis
+from app.redis.lock import LeaseLock
+from app.services.task_guard import dedup_key, run_once
+
+RUN_DATE = date(2024, 5, 1)
+
+
+class TestLeaseLock:
+    """Аренда блокировки (локальный режим для MockRedis)"""
+
+    def test_acquire_release(self):
+        redis = MockRedis()
+        first = LeaseLock("report", ttl=60, redis=redis)
+        second = LeaseLock("report", ttl=60, redis=redis)
+
+        assert first.acquire()
+        assert not second.acquire()
+        # чужой токен не освобождает и не продлевает блокировку
+        assert not second.release()
+        assert not second.extend()
+        assert first.extend()
+        assert first.release()
+        assert second.acquire()
+        second.release()
+
+    def test_lease_expires(self):
+        redis = MockRedis()
+        first = LeaseLock("expiring", ttl=0, redis=redis)
+        assert first.acquire()
+        assert LeaseLock("expiring", ttl=60, redis=redis).acquire()
+        assert not first.release()
+
+
+class TestRunOnce:
+    """Дедупликация задач по (задача, дата)"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_execute_once(self):
+        redis = MockRedis()
+        calls = []
+
+        async def job():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"status": "success"}
+
+        results = await asyncio.gather(
+            *(run_once("report", RUN_DATE, job, redis=redis) for _ in range(3))
+        )
+        assert calls == [1]
+        assert sorted(r["status"] for r in results) == ["locked", "locked", "success"]
+
+        repeated = await run_once("report", RUN_DATE, job, redis=redis)
+        assert repeated["status"] == "duplicate"
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_failed_run_is_retried(self):
+        redis = MockRedis()
+
+        async def failing():
+            return {"status": "error", "message": "db down"}
+
+        assert (await run_once("report", RUN_DATE, failing, redis=redis))["status"] == "error"
+        assert redis.get(dedup_key("report", RUN_DATE)) is None
+
+        async def job():
+            return {"status": "success"}
+
+        assert (await run_once("report", RUN_DATE, job, redis=redis))["status"] == "success"
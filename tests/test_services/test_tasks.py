@@ -0,0 +1,55 @@
+import pytest
+from taskiq import InMemoryBroker
+from taskiq.exceptions import ResultGetError
+from taskiq.result import TaskiqResult
+
+from app.redis.client import MockRedis
+from app.redis.result_backend import RedisResultBackend
+from app.tasks import broker, generate_daily_order_report
+
+
+class TestTaskRegistry:
+    """Общий реестр задач taskiq"""
+
+    def test_tasks_registered_once(self):
+        assert set(broker.get_all_tasks()) == {"generate_daily_order_report", "my_scheduled_task"}
+
+    @pytest.mark.asyncio
+    async def test_result_backend_roundtrip(self):
+        backend = RedisResultBackend(ttl=60, redis=MockRedis())
+        assert not await backend.is_result_ready("task-1")
+        with pytest.raises(ResultGetError):
+            await backend.get_result("task-1")
+
+        await backend.set_result(
+            "task-1",
+            TaskiqResult(is_err=False, return_value={"status": "success"}, execution_time=0.1),
+        )
+        assert await backend.is_result_ready("task-1")
+        result = await backend.get_result("task-1")
+        assert result.return_value == {"status": "success"}
+
+    @pytest.mark.asyncio
+    async def test_report_task_runs_once_per_date(self, monkeypatch):
+        calls = []
+
+        async def fake_generate(report_date):
+            calls.append(report_date)
+            return {"status": "success", "date": report_date.isoformat()}
+
+        redis = MockRedis()
+        monkeypatch.setattr(
+            "app.tasks.ReportService.generate_daily_order_report", fake_generate
+        )
+        monkeypatch.setattr("app.services.task_guard.get_redis", lambda: redis)
+
+        memory_broker = InMemoryBroker()
+        task = memory_broker.register_task(
+            generate_daily_order_report.original_func, "generate_daily_order_report"
+        )
+        first = await (await task.kiq("2024-07-01")).wait_result()
+        second = await (await task.kiq("2024-07-01")).wait_result()
+
+        assert first.return_value["status"] == "success"
+        assert second.return_value["status"] == "duplicate"
+        assert len(calls) == 1